@@ -10,6 +10,10 @@ from flask_cors import CORS
 from config import Config
 from models import db
 from utils.seed_data import seed_data
+from utils.mission_timers import scheduler as mission_timers
+from utils.leaderboard import board as leaderboard
+from utils.change_feed import relay as change_feed_relay
+from utils.occupancy import index as occupancy_index
 from routes import (
     home_bp,
     rooms_bp,
@@ -18,6 +22,8 @@ from routes import (
     points_bp,
     user_bp,
     ranking_bp,
+    telemetry_bp,
+    changes_bp,
 )
 
 # Flask 애플리케이션 인스턴스 생성
@@ -29,7 +35,8 @@ app.config.from_object(Config)
 
 # CORS(Cross-Origin Resource Sharing) 활성화
 # 프론트엔드에서 다른 도메인으로 요청을 보낼 수 있도록 허용
-CORS(app)
+# 목록 API의 다음 페이지 커서 헤더와 멱등성 키 재응답 표시 헤더도 프론트엔드에서 읽을 수 있도록 노출
+CORS(app, expose_headers=['X-Next-Cursor', 'Link', 'Idempotent-Replayed'])
 
 # SQLAlchemy 데이터베이스 인스턴스를 Flask 앱에 연결
 # 이렇게 하면 db 객체를 사용하여 데이터베이스 작업을 수행할 수 있습니다
@@ -45,6 +52,24 @@ app.register_blueprint(mission_bp)  # 미션 관련 API
 app.register_blueprint(points_bp)   # 포인트 관련 API
 app.register_blueprint(user_bp)     # 사용자 관련 API
 app.register_blueprint(ranking_bp)  # 랭킹 관련 API
+app.register_blueprint(telemetry_bp)  # 디바이스 측정값 수집 API
+app.register_blueprint(changes_bp)  # 변경 피드(SSE) API
+
+# 미션 타이머 스케줄러 연결
+# 각 프로세스의 첫 요청에서 저장된 마감 시각으로 타이머를 다시 만들고 만료 스레드를 시작합니다
+mission_timers.init_app(app)
+
+# 포인트 리더보드 연결
+# 각 프로세스의 첫 요청에서 모든 사용자의 현재 포인트로 순위표를 만들고 동기화 스레드를 시작합니다
+leaderboard.init_app(app)
+
+# 변경 피드 워커 간 전달 연결
+# PostgreSQL이면 각 프로세스의 첫 요청에서 LISTEN 스레드를 시작해 모든 워커의 변경 이벤트를 받습니다
+change_feed_relay.init_app(app)
+
+# 강의실 재실 인원 인덱스 연결
+# 각 프로세스의 첫 요청에서 인덱스를 만들고, 다른 워커의 변경을 다시 읽는 스레드를 시작합니다
+occupancy_index.init_app(app)
 
 
 @app.route('/')
@@ -142,9 +167,13 @@ if __name__ == '__main__':
     print(f"  - GET  /api/home/savings")
     print(f"  - GET  /api/home/character")
     print(f"  - PUT  /api/devices/<id>/toggle")
+    print(f"  - PUT  /api/devices/toggle")
+    print(f"  - POST /api/devices/readings")
+    print(f"  - GET  /api/devices/<id>/power")
     print(f"  - GET  /api/character/progress")
     print(f"  - GET  /api/character/status")
     print(f"  - GET  /api/character/streak")
+    print(f"  - POST /api/character/streak/bulk")
     print(f"  - GET  /api/missions")
     print(f"  - GET  /api/missions/<id>")
     print(f"  - POST /api/missions/<id>/start")
@@ -159,11 +188,15 @@ if __name__ == '__main__':
     print(f"  - GET  /api/points/donate/categories")
     print(f"  - POST /api/points/donate")
     print(f"  - GET  /api/user/profile")
+    print(f"  - PUT  /api/user/profile")
     print(f"  - GET  /api/user/stats")
     print(f"  - GET  /api/user/activities")
     print(f"  - GET  /api/ranking")
     print(f"  - GET  /api/rooms")
     print(f"  - PUT  /api/rooms/<id>/select")
+    print(f"  - PUT  /api/rooms/occupancy")
+    print(f"  - GET  /api/changes")
+    print(f"  - GET  /api/changes/stream")
     
     # Flask 개발 서버 실행
     # host='0.0.0.0': 모든 네트워크 인터페이스에서 접근 가능
@@ -47,6 +47,14 @@ class Config:
     # False로 설정하면 객체 변경 추적을 비활성화하여 성능을 향상시킵니다
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # 전력 계측기 측정 주기 (초)
+    # 측정값 하나가 이 시간 동안의 평균 전력이라고 보고 전력량(Wh)을 추정합니다
+    TELEMETRY_INTERVAL_SECONDS = int(os.getenv('TELEMETRY_INTERVAL_SECONDS', '5'))
+    
+    # 미션 제한 시간 (초)
+    # 미션을 시작한 뒤 이 시간 안에 완료하지 않으면 'expired' 상태가 됩니다
+    MISSION_TIMER_SECONDS = int(os.getenv('MISSION_TIMER_SECONDS', '600'))
+    
     # SQLAlchemy 엔진 옵션
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,   # 연결이 살아있는지 확인 후 사용 (연결 끊김 방지)
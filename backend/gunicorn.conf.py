@@ -0,0 +1,38 @@
+"""
+gunicorn 운영 설정 (gevent 워커)
+
+변경 피드 스트림(/api/changes/stream) 구독자는 연결을 계속 열어 두므로,
+sync / gthread 워커에서는 구독자마다 스레드 하나를 점유합니다.
+gevent 워커는 연결마다 greenlet을 사용하므로 워커 하나가 많은 유휴 구독자를 유지할 수 있습니다.
+
+psycopg2는 그대로 두면 쿼리를 기다리는 동안 워커의 모든 greenlet을 멈추므로,
+워커가 시작될 때 psycogreen으로 데이터베이스 대기를 gevent의 협력형 대기로 바꿉니다.
+
+실행:
+  cd backend
+  gunicorn -c gunicorn.conf.py app:app
+"""
+import multiprocessing
+import os
+
+# 바인드 주소 (기본값: 0.0.0.0:5001)
+bind = os.environ.get('BIND', '0.0.0.0:' + os.environ.get('PORT', '5001'))
+
+# 워커 프로세스 수 (기본값: CPU 코어 수)
+# 리더보드, 카탈로그, 강의실 인원 인덱스는 워커마다 따로 동기화되며,
+# 변경 피드는 PostgreSQL LISTEN / NOTIFY로 모든 워커의 이벤트를 받습니다
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+
+# 워커마다 greenlet으로 처리하는 최대 동시 연결 수
+worker_class = 'gevent'
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', '1000'))
+
+# gevent 워커에서는 요청 처리 시간이 아니라 워커가 응답하지 않는 시간의 제한 (오래 열린 SSE 연결은 끊지 않음)
+timeout = 30
+
+
+def post_fork(server, worker):
+    """워커 프로세스에서 psycopg2를 gevent 협력형 대기로 전환 (애플리케이션이 연결을 만들기 전)"""
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
@@ -64,6 +64,20 @@ class Device(db.Model):
     power_usage = db.Column(db.Float, nullable=True)  # 전력 사용량 (와트, 선택적)
     temperature = db.Column(db.Float, nullable=True)  # 온도 (섭씨, 선택적)
     type = db.Column(db.String(20), nullable=False)  # 디바이스 타입: 'light', 'heating', 'cooling'
+    last_reading_at = db.Column(db.DateTime, nullable=True)  # 마지막으로 반영된 측정 시각 (UTC)
+    # 디바이스가 설치된 강의실 (강의실별 디바이스 조회를 위해 인덱스 생성)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=True, index=True)
+
+    # API 필드 이름 → 컬럼 속성 이름 (fields= 파라미터로 일부 필드만 조회할 때 사용)
+    API_FIELDS = {
+        'id': 'id',
+        'name': 'name',
+        'status': 'status',
+        'icon': 'icon',
+        'powerUsage': 'power_usage',
+        'temperature': 'temperature',
+        'type': 'type',
+    }
 
     def to_dict(self):
         """
@@ -83,6 +97,101 @@ class Device(db.Model):
         }
 
 
+class DeviceReading(db.Model):
+    """
+    디바이스 측정값 모델
+
+    전력 계측기가 보고한 측정값을 그대로 쌓아두는 추가 전용(append-only) 테이블입니다.
+    대량 삽입(bulk insert)으로만 기록하며 수정하거나 삭제하지 않습니다.
+    집계할 측정값은 같은 값을 함께 넣는 DeviceReadingInbox에서 꺼내므로 이 테이블은 집계 작업이 갱신하지 않습니다.
+    """
+    __tablename__ = 'device_readings'
+    __table_args__ = (
+        # 디바이스별 시간 범위 조회용 인덱스
+        db.Index('ix_device_readings_device_recorded', 'device_id', 'recorded_at'),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    device_id = db.Column(db.Integer, db.ForeignKey('devices.id'), nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False)  # 측정 시각 (UTC)
+    watts = db.Column(db.Float, nullable=False)  # 전력 사용량 (와트)
+    temperature = db.Column(db.Float, nullable=True)  # 온도 (섭씨, 선택적)
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'deviceId': str(self.device_id),
+            'timestamp': self.recorded_at.isoformat(),
+            'watts': self.watts,
+            'temperature': self.temperature,
+        }
+
+
+class DeviceReadingInbox(db.Model):
+    """
+    집계 대기 측정값 모델
+
+    수집 API가 device_readings와 같은 트랜잭션에서 집계에 필요한 값만 함께 넣고,
+    집계 작업이 DELETE ... RETURNING으로 꺼내 반영합니다.
+    반영한 행은 바로 지워지므로 이 테이블에는 아직 집계되지 않은 측정값만 남습니다.
+    """
+    __tablename__ = 'device_reading_inbox'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    device_id = db.Column(db.Integer, nullable=False)  # 디바이스 ID
+    recorded_at = db.Column(db.DateTime, nullable=False)  # 측정 시각 (UTC)
+    watts = db.Column(db.Float, nullable=False)  # 전력 사용량 (와트)
+
+
+class PowerRollup(db.Model):
+    """
+    전력 사용량 집계(rollup) 모델
+
+    측정값을 분(minute)/시(hour)/일(day) 단위 구간으로 미리 합산해 둔 테이블입니다.
+    scope는 'device'(디바이스별), 'room'(강의실별), 'campus'(캠퍼스 전체)이며,
+    새로 도착한 측정값만 기존 구간 값에 더해 갱신합니다.
+    """
+    __tablename__ = 'power_rollups'
+    __table_args__ = (
+        db.UniqueConstraint(
+            'scope', 'scope_id', 'granularity', 'bucket_start',
+            name='uq_power_rollups_bucket',
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(10), nullable=False)  # 'device', 'room', 'campus'
+    scope_id = db.Column(db.Integer, nullable=False)  # 디바이스/강의실 ID (캠퍼스는 0)
+    granularity = db.Column(db.String(10), nullable=False)  # 'minute', 'hour', 'day'
+    bucket_start = db.Column(db.DateTime, nullable=False)  # 구간 시작 시각 (UTC)
+    sample_count = db.Column(db.Integer, default=0)  # 측정값 수
+    sum_watts = db.Column(db.Float, default=0.0)  # 측정값 전력 합계 (와트)
+    energy_wh = db.Column(db.Float, default=0.0)  # 추정 전력량 (와트시)
+
+    def to_dict(self):
+        return {
+            'bucketStart': self.bucket_start.isoformat(),
+            'granularity': self.granularity,
+            'sampleCount': self.sample_count,
+            'averageWatts': self.sum_watts / self.sample_count if self.sample_count else 0.0,
+            'energyWh': self.energy_wh,
+        }
+
+
+class RollupCursor(db.Model):
+    """
+    집계 작업 진행 위치 모델
+
+    집계 작업마다 한 행을 두고, 작업 중에는 이 행을 잠가 같은 작업이 동시에 실행되지 않도록 합니다.
+    last_reading_id는 작업이 마지막으로 처리한 기록 ID로, 진행 상황 확인용입니다.
+    처리할 기록은 작업마다 대기열(집계)이나 기록별 표시(원장 압축)로 찾으며 이 값부터 읽지 않습니다.
+    """
+    __tablename__ = 'rollup_cursors'
+
+    name = db.Column(db.String(50), primary_key=True)  # 집계 작업 이름
+    last_reading_id = db.Column(db.BigInteger, default=0)  # 마지막으로 처리한 기록 ID (진행 상황 확인용)
+
+
 class LocationStat(db.Model):
     __tablename__ = 'location_stats'
 
@@ -116,9 +225,17 @@ class SavingsStat(db.Model):
 
 
 class CharacterProgressModel(db.Model):
+    """
+    캐릭터 진행 모델
+
+    사용자당 한 행으로, 누적 완료 미션 수와 그로부터 계산한 레벨 상태를 저장합니다.
+    레벨 상태는 utils.character_progress에서 미션 완료 때마다 갱신합니다.
+    """
     __tablename__ = 'character_progress'
 
     id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, unique=True)
+    completed_missions = db.Column(db.Integer, default=0)  # 누적 완료 미션 수
     current_level = db.Column(db.Integer, default=1)
     next_level = db.Column(db.Integer, default=2)
     progress = db.Column(db.Float, default=0.0)
@@ -154,24 +271,22 @@ class StatusCardModel(db.Model):
 
 
 class StreakModel(db.Model):
+    """
+    연속 미션(스트릭) 모델
+
+    사용자당 한 행으로, 최근 활동일을 비트맵으로 저장합니다.
+    비트 i는 last_active_date로부터 i일 전에 미션을 완료했는지를 나타내며,
+    연속 일수는 비트맵 보관 기간과 관계없이 current_streak에 따로 셉니다.
+    응답 형식 변환과 비트 연산은 utils.streaks에서 처리합니다.
+    """
     __tablename__ = 'streaks'
 
     id = db.Column(db.Integer, primary_key=True)
-    days = db.Column(db.Integer, default=0)
-    completed_days = db.Column(db.String(100), default='')  # "1,2,3"
-    message = db.Column(db.String(100), default='')
-
-    def to_dict(self):
-        completed = (
-            [int(x) for x in self.completed_days.split(',') if x.strip()]
-            if self.completed_days
-            else []
-        )
-        return {
-            'days': self.days,
-            'completedDays': completed,
-            'message': self.message,
-        }
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, unique=True)
+    activity_bits = db.Column(db.BigInteger, nullable=True)  # 최근 62일 활동 비트맵
+    last_active_date = db.Column(db.Date, nullable=True)  # 마지막 활동일 (UTC, 비트 0의 날짜)
+    current_streak = db.Column(db.Integer, default=0)  # last_active_date까지의 연속 일수
+    longest_streak = db.Column(db.Integer, default=0)  # 최장 연속 일수
 
 
 class RankProgressModel(db.Model):
@@ -214,10 +329,15 @@ class Mission(db.Model):
     """
     미션 모델
     
-    사용자가 수행할 수 있는 에코 미션 정보를 저장합니다.
-    미션의 진행 상태, 포인트, 카테고리 등을 관리합니다.
+    사용자가 수행할 수 있는 에코 미션 정보(카탈로그)를 저장합니다.
+    미션의 포인트, 카테고리, 단계 수 등 모든 사용자에게 같은 정보만 관리하며,
+    사용자별 진행 상태는 UserMissionModel에 저장합니다.
     """
     __tablename__ = 'missions'
+    __table_args__ = (
+        # 카테고리별 미션 목록을 ID 순으로 커서 페이지네이션할 때 사용
+        db.Index('ix_missions_category_id', 'category', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)  # 기본키
     code = db.Column(db.String(50), unique=True, nullable=True)  # 미션 고유 코드 (선택적, 유니크)
@@ -226,81 +346,178 @@ class Mission(db.Model):
     # 카테고리: 'all', 'recycle', 'quiz', 'content', 'contest'
     category = db.Column(db.String(20), nullable=False)
     points = db.Column(db.Integer, default=0)  # 미션 완료 시 획득 포인트 (기본값: 0)
-    progress = db.Column(db.Float, default=0.0)  # 진행률 (0.0 ~ 100.0, 기본값: 0.0)
     total_steps = db.Column(db.Integer, default=1)  # 전체 단계 수 (기본값: 1)
-    current_step = db.Column(db.Integer, default=0)  # 현재 진행 단계 (기본값: 0)
-    # 상태: 'available' (사용 가능), 'in-progress' (진행 중), 'completed' (완료)
-    status = db.Column(db.String(20), default='available')
 
-    def to_dict(self):
+    # API 필드 이름 → 컬럼 속성 이름 (fields= 파라미터로 일부 필드만 조회할 때 사용)
+    API_FIELDS = {
+        'id': 'id',
+        'title': 'title',
+        'emoji': 'emoji',
+        'category': 'category',
+        'points': 'points',
+        'totalSteps': 'total_steps',
+    }
+
+    def to_dict(self, state=None):
         """
         미션 정보를 딕셔너리로 변환
         
+        Args:
+            state (dict | None): 사용자의 진행 상태 (progress, currentStep, status), 없으면 시작 전 상태
+        
         Returns:
             dict: 미션 정보 (카멜케이스로 변환된 키 사용)
         """
-        return {
+        data = {
             'id': str(self.id),
             'title': self.title,
             'emoji': self.emoji,
             'category': self.category,
             'points': self.points,
-            'progress': self.progress,
             'totalSteps': self.total_steps,  # 카멜케이스로 변환
-            'currentStep': self.current_step,  # 카멜케이스로 변환
-            'status': self.status,
         }
+        data.update(state or UserMissionModel.DEFAULT_STATE)
+        return data
+
+
+# 사용자 미션 상태별 부분 인덱스 조건
+# 조회할 때도 같은 조건문을 그대로 사용해야 데이터베이스가 부분 인덱스를 선택할 수 있습니다.
+USER_MISSION_STATUS_WHERE = {
+    'in-progress': "status = 'in-progress'",
+    'completed': "status = 'completed'",
+}
 
 
-class PointSummary(db.Model):
-    __tablename__ = 'point_summaries'
+class UserMissionModel(db.Model):
+    """
+    사용자별 미션 진행 상태 모델
+
+    사용자와 미션 한 쌍당 한 행이며, 미션을 시작하거나 완료할 때만 생성됩니다.
+    행이 없으면 시작 전('available') 상태입니다.
+    "진행 중인 미션", "완료한 미션" 조회는 상태별 부분 인덱스(PostgreSQL / SQLite)로 처리하며,
+    부분 인덱스를 지원하지 않는 데이터베이스에서는 일반 인덱스로 생성됩니다.
+    """
+    __tablename__ = 'user_missions'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'mission_id', name='uq_user_missions_user_mission'),
+        *(
+            db.Index(
+                f"ix_user_missions_{status.replace('-', '_')}",
+                'user_id',
+                'mission_id',
+                postgresql_where=db.text(where),
+                sqlite_where=db.text(where),
+            )
+            for status, where in USER_MISSION_STATUS_WHERE.items()
+        ),
+    )
+
+    # 진행 상태가 없는 미션의 기본값
+    DEFAULT_STATE = {'progress': 0.0, 'currentStep': 0, 'status': 'available'}
+
+    # API 필드 이름 → 컬럼 속성 이름
+    API_FIELDS = {
+        'progress': 'progress',
+        'currentStep': 'current_step',
+        'status': 'status',
+    }
 
     id = db.Column(db.Integer, primary_key=True)
-    current_points = db.Column(db.Integer, default=0)
-    weekly_increase = db.Column(db.Integer, default=0)
-    used_points = db.Column(db.Integer, default=0)
-    total_donated = db.Column(db.Integer, default=0)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    mission_id = db.Column(db.Integer, db.ForeignKey('missions.id'), nullable=False)
+    # 상태: 'in-progress' (진행 중), 'completed' (완료), 'expired' (제한 시간 초과)
+    status = db.Column(db.String(20), nullable=False)
+    progress = db.Column(db.Float, default=0.0)  # 진행률 (0.0 ~ 100.0)
+    current_step = db.Column(db.Integer, default=0)  # 현재 진행 단계
+    started_at = db.Column(db.DateTime, nullable=True)  # 시작 시각 (UTC)
+    completed_at = db.Column(db.DateTime, nullable=True)  # 마지막 완료 시각 (UTC)
+    # 진행 중인 미션의 마감 시각 (UTC), 재시작 시 utils.mission_timers가 이 값으로 타이머를 다시 만듦
+    deadline_at = db.Column(db.DateTime, nullable=True)
 
-    def to_dict(self):
-        return {
-            'currentPoints': self.current_points,
-            'weeklyIncrease': self.weekly_increase,
-            'usedPoints': self.used_points,
-            'totalDonated': self.total_donated,
-        }
 
+# 아직 스냅샷에 합산되지 않은 원장 기록 조건 (부분 인덱스와 잔액 / 압축 쿼리가 같은 조건문을 사용)
+POINT_LEDGER_UNCOMPACTED_WHERE = 'NOT compacted'
 
-class WeeklyActivityModel(db.Model):
-    __tablename__ = 'weekly_activities'
 
-    id = db.Column(db.Integer, primary_key=True)
-    day = db.Column(db.String(10), nullable=False)
-    points = db.Column(db.Integer, default=0)
+class PointLedgerEntry(db.Model):
+    """
+    포인트 원장 모델
 
-    def to_dict(self):
-        return {
-            'day': self.day,
-            'points': self.points,
-        }
+    포인트 적립 / 사용 / 기부를 한 건씩 추가만 하는(append-only) 기록입니다.
+    압축 작업이 스냅샷 합산 여부(compacted)를 표시하는 것 외에는 수정하거나 삭제하지 않으며,
+    잔액은 스냅샷(PointSnapshot)과 아직 합산되지 않은 기록으로 계산합니다.
+    """
+    __tablename__ = 'point_ledger'
+    __table_args__ = (
+        # 사용자별 기록을 ID 순으로 읽을 때 사용 (활동 내역)
+        db.Index('ix_point_ledger_user_id', 'user_id', 'id'),
+        # 아직 합산되지 않은 기록만 담는 부분 인덱스 (잔액 계산, 압축)
+        db.Index(
+            'ix_point_ledger_uncompacted',
+            'user_id',
+            'id',
+            postgresql_where=db.text(POINT_LEDGER_UNCOMPACTED_WHERE),
+            sqlite_where=db.text(POINT_LEDGER_UNCOMPACTED_WHERE),
+        ),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # 'earn' (적립), 'spend' (사용), 'donate' (기부)
+    amount = db.Column(db.Integer, nullable=False)  # 포인트 (항상 양수)
+    reason = db.Column(db.String(30), nullable=False)  # 사유 (예: 'mission', 'device_off', 'exchange')
+    ref = db.Column(db.String(50), nullable=True)  # 관련 항목 ID (미션, 디바이스, 아이템 등)
+    created_at = db.Column(db.DateTime, nullable=False)  # 기록 시각 (UTC)
+    # 스냅샷에 합산되었는지 여부
+    compacted = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
 
-class RecentActivityModel(db.Model):
-    __tablename__ = 'recent_activities'
+class PointSnapshot(db.Model):
+    """
+    포인트 잔액 스냅샷 모델
 
-    id = db.Column(db.Integer, primary_key=True)
-    emoji = db.Column(db.String(10), nullable=False)
-    title = db.Column(db.String(200), nullable=False)
-    date = db.Column(db.String(50), nullable=False)
-    points = db.Column(db.Integer, default=0)
+    사용자별로 합산 표시(compacted)된 원장 기록을 합산해 둔 값입니다.
+    utils.ledger의 압축(compaction) 작업이 주기적으로 아직 합산되지 않은 기록을 더해 갱신합니다.
+    """
+    __tablename__ = 'point_snapshots'
 
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'emoji': self.emoji,
-            'title': self.title,
-            'date': self.date,
-            'points': self.points,
-        }
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    last_entry_id = db.Column(db.BigInteger, default=0, nullable=False)  # 합산한 가장 큰 원장 ID (참고용)
+    earned_points = db.Column(db.Integer, default=0, nullable=False)  # 누적 적립 포인트
+    used_points = db.Column(db.Integer, default=0, nullable=False)  # 누적 사용 포인트
+    total_donated = db.Column(db.Integer, default=0, nullable=False)  # 누적 기부 포인트
+    week_start = db.Column(db.Date, nullable=True)  # week_earned가 속한 주의 월요일
+    week_earned = db.Column(db.Integer, default=0, nullable=False)  # 그 주의 적립 포인트
+    updated_at = db.Column(db.DateTime, nullable=True)  # 마지막 압축 시각 (UTC)
+
+
+class PointBalance(db.Model):
+    """
+    사용자별 현재 포인트 모델
+
+    원장에 기록을 추가할 때 같은 트랜잭션에서 함께 증감합니다.
+    교환 / 기부는 이 행에 조건부 UPDATE(current_points >= 차감액)를 실행해 잔액 확인과 차감을 한 번에 처리합니다.
+    """
+    __tablename__ = 'point_balances'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    current_points = db.Column(db.Integer, default=0, nullable=False)
+
+
+class PointDailyBucket(db.Model):
+    """
+    사용자별 일별 포인트 집계 모델
+
+    원장에 기록을 추가할 때 같은 트랜잭션에서 해당 날짜(UTC)의 행에 더합니다.
+    주간 차트는 이 테이블에서 7개 행만 읽습니다.
+    """
+    __tablename__ = 'point_daily_buckets'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # 날짜 (UTC)
+    earned_points = db.Column(db.Integer, default=0, nullable=False)  # 적립 포인트
+    used_points = db.Column(db.Integer, default=0, nullable=False)  # 사용 포인트
+    donated_points = db.Column(db.Integer, default=0, nullable=False)  # 기부 포인트
 
 
 class ExchangeItemModel(db.Model):
@@ -325,6 +542,36 @@ class ExchangeItemModel(db.Model):
         }
 
 
+# 아직 발급되지 않은 교환 코드 조건 (부분 인덱스와 발급 쿼리가 같은 조건문을 사용)
+EXCHANGE_CODE_AVAILABLE_WHERE = 'user_id IS NULL'
+
+
+class ExchangeCodeModel(db.Model):
+    """
+    교환 코드 모델 (바우처 / 기프티콘)
+
+    아이템별로 미리 만들어 둔 코드 재고입니다. 교환할 때 발급되지 않은 코드 하나에
+    사용자와 발급 시각을 기록하며, 발급되지 않은 코드는 아이템별 부분 인덱스로 찾습니다.
+    """
+    __tablename__ = 'exchange_codes'
+    __table_args__ = (
+        db.Index(
+            'ix_exchange_codes_available',
+            'item_id',
+            'id',
+            postgresql_where=db.text(EXCHANGE_CODE_AVAILABLE_WHERE),
+            sqlite_where=db.text(EXCHANGE_CODE_AVAILABLE_WHERE),
+        ),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    item_id = db.Column(db.Integer, db.ForeignKey('exchange_items.id'), nullable=False)
+    code = db.Column(db.String(100), unique=True, nullable=False)  # 교환 코드
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # 발급받은 사용자 (없으면 재고)
+    claimed_at = db.Column(db.DateTime, nullable=True)  # 발급 시각 (UTC)
+    created_at = db.Column(db.DateTime, nullable=False)  # 등록 시각 (UTC)
+
+
 class DonateCategoryModel(db.Model):
     __tablename__ = 'donate_categories'
 
@@ -370,6 +617,15 @@ class UserActivityModel(db.Model):
     points = db.Column(db.Integer, default=0)
     type = db.Column(db.String(10), nullable=False)  # earn/spend
 
+    API_FIELDS = {
+        'id': 'id',
+        'icon': 'icon',
+        'title': 'title',
+        'timeAgo': 'time_ago',
+        'points': 'points',
+        'type': 'type',
+    }
+
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -381,23 +637,18 @@ class UserActivityModel(db.Model):
         }
 
 
-class RankingEntryModel(db.Model):
-    __tablename__ = 'ranking_entries'
+class BuildingModel(db.Model):
+    """
+    건물 위치 모델
 
-    id = db.Column(db.Integer, primary_key=True)
-    rank = db.Column(db.Integer, nullable=False)
-    name = db.Column(db.String(50), nullable=False)
-    department = db.Column(db.String(100), nullable=False)
-    points = db.Column(db.Integer, default=0)
+    캠퍼스 지도 위 좌표(미터)로 건물 사이 거리를 계산하며,
+    가까운 빈자리 강의실을 찾을 때 다른 건물을 가까운 순으로 탐색하는 데 사용합니다.
+    """
+    __tablename__ = 'buildings'
 
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'rank': self.rank,
-            'name': self.name,
-            'department': self.department,
-            'points': self.points,
-        }
+    name = db.Column(db.String(100), primary_key=True)  # 건물 이름 (RoomModel.building과 같은 값)
+    pos_x = db.Column(db.Float, nullable=False)  # 캠퍼스 지도 x 좌표 (m)
+    pos_y = db.Column(db.Float, nullable=False)  # 캠퍼스 지도 y 좌표 (m)
 
 
 class RoomModel(db.Model):
@@ -409,7 +660,11 @@ class RoomModel(db.Model):
     signal_quality = db.Column(db.String(20), nullable=False)  # strong, medium, weak
     people_count = db.Column(db.Integer, default=0)
     congestion = db.Column(db.String(20), nullable=False)  # 여유, 보통, 혼잡
-    is_selected = db.Column(db.Boolean, default=False)
+    capacity = db.Column(db.Integer, default=40)  # 수용 인원
+    building = db.Column(db.String(100), nullable=True)  # 건물 이름 (예: '정보문화관')
+    floor = db.Column(db.Integer, nullable=True)  # 층
+    is_selected = db.Column(db.Boolean, default=False)  # 사용하지 않음 (선택 기록이 없는 사용자는 기본키가 가장 작은 강의실)
+    total_power_usage = db.Column(db.Float, default=0.0)  # 강의실 디바이스 전력 사용량 합계
 
     def to_dict(self):
         return {
@@ -422,5 +677,47 @@ class RoomModel(db.Model):
         }
 
 
+class TableVersion(db.Model):
+    """
+    테이블 버전 카운터 모델
+
+    쓰기 API가 테이블 데이터를 바꿀 때마다 version을 1씩 증가시킵니다.
+    조회 API는 이 값으로 ETag를 만들어 변경이 없으면 304를 반환합니다.
+    """
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(50), primary_key=True)  # 테이블 이름
+    version = db.Column(db.BigInteger, default=0, nullable=False)  # 변경될 때마다 1 증가
+    updated_at = db.Column(db.DateTime, nullable=True)  # 마지막 변경 시각 (UTC)
+
 
+class UserRoomSelection(db.Model):
+    """
+    사용자별 선택 강의실 모델
 
+    사용자마다 한 행만 가지며, 강의실 선택은 이 행 하나를 UPSERT하는 것으로 처리합니다.
+    (rooms 테이블 전체를 갱신하지 않음)
+    """
+    __tablename__ = 'user_room_selections'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    selected_at = db.Column(db.DateTime, nullable=True)  # 선택 시각 (UTC)
+
+
+class IdempotencyKey(db.Model):
+    """
+    멱등성 키 모델
+
+    Idempotency-Key 헤더로 보낸 쓰기 요청의 응답을 보관합니다.
+    같은 키로 다시 요청하면 처리하지 않고 보관된 응답을 그대로 반환합니다.
+    키는 (사용자, 메서드와 경로, 헤더 값)의 SHA-256이며, 만료된 행은 utils.idempotency purge로 정리합니다.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    key = db.Column(db.String(64), primary_key=True)  # 범위가 포함된 키의 SHA-256 (16진수)
+    request_hash = db.Column(db.String(64), nullable=False)  # 요청 본문의 SHA-256 (다른 요청에 키 재사용 확인용)
+    status_code = db.Column(db.Integer, nullable=True)  # 응답 상태 코드 (처리 중이면 NULL)
+    body = db.Column(db.Text, nullable=True)  # 응답 본문 (JSON)
+    created_at = db.Column(db.DateTime, nullable=False)  # 생성 시각 (UTC)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # 만료 시각 (UTC)
@@ -6,6 +6,8 @@ from routes.mission import mission_bp
 from routes.points import points_bp
 from routes.user import user_bp
 from routes.ranking import ranking_bp
+from routes.telemetry import telemetry_bp
+from routes.changes import changes_bp
 
 __all__ = [
     'home_bp',
@@ -15,4 +17,6 @@ __all__ = [
     'points_bp',
     'user_bp',
     'ranking_bp',
+    'telemetry_bp',
+    'changes_bp',
 ]
@@ -0,0 +1,134 @@
+"""
+변경 피드 관련 API 라우트
+
+디바이스, 강의실, 미션, 포인트 등 변경된 엔티티만 클라이언트에 전달합니다.
+앱은 목록 API를 주기적으로 다시 조회(polling)하는 대신 SSE 스트림을 구독하고,
+재연결 시 마지막으로 받은 순번(cursor)부터 이어서 받습니다.
+"""
+import json
+
+from flask import Blueprint, Response, jsonify, request
+
+from utils.change_feed import feed
+
+# Blueprint 생성
+changes_bp = Blueprint('changes', __name__)
+
+# 새 이벤트가 없을 때 연결 유지를 위해 주석 행을 보내는 간격 (초)
+HEARTBEAT_SECONDS = 15
+
+
+def _parse_cursor():
+    """
+    요청에서 cursor 값을 읽음
+
+    SSE 표준 재연결 헤더(Last-Event-ID)를 우선 사용하고, 없으면 cursor 쿼리 파라미터를 사용합니다.
+    둘 다 없으면 현재 시점부터 구독합니다.
+
+    Returns:
+        int | None: 순번, 다른 프로세스(또는 재시작 전)의 cursor이면 None
+
+    Raises:
+        ValueError: cursor 형식이 잘못된 경우
+    """
+    raw = request.headers.get('Last-Event-ID') or request.args.get('cursor')
+    if raw is None or raw == '':
+        return feed.last_seq
+    return feed.parse_cursor(raw)
+
+
+def _event_to_dict(event):
+    seq, entity, entity_id, data = event
+    return {
+        'cursor': feed.format_cursor(seq),
+        'entity': entity,
+        'id': entity_id,
+        'data': data,
+    }
+
+
+def _format_sse(event):
+    seq, entity, entity_id, data = event
+    payload = json.dumps({'id': entity_id, 'data': data}, ensure_ascii=False)
+    return f'id: {feed.format_cursor(seq)}\nevent: {entity}\ndata: {payload}\n\n'
+
+
+@changes_bp.route('/api/changes', methods=['GET'])
+def get_changes():
+    """
+    변경 이벤트 조회 (SSE를 사용할 수 없는 클라이언트용)
+
+    Query Parameters:
+        cursor (str, optional): 마지막으로 받은 cursor
+
+    Returns:
+        JSON: cursor 이후의 변경 이벤트
+            {
+                'cursor': '3fa2c1d0-42',
+                'reset': false,
+                'changes': [
+                    {'cursor': '3fa2c1d0-42', 'entity': 'device', 'id': '2', 'data': { ... }},
+                    ...
+                ]
+            }
+
+    Errors:
+        400: 잘못된 cursor
+    """
+    try:
+        cursor = _parse_cursor()
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    events = feed.since(cursor)
+    if events is None:
+        # 버퍼에서 밀려난 구간이 있으면 전체 데이터를 다시 조회해야 함
+        return jsonify({'cursor': feed.format_cursor(feed.last_seq), 'reset': True, 'changes': []})
+
+    return jsonify({
+        'cursor': feed.format_cursor(events[-1][0] if events else cursor),
+        'reset': False,
+        'changes': [_event_to_dict(e) for e in events],
+    })
+
+
+@changes_bp.route('/api/changes/stream', methods=['GET'])
+def stream_changes():
+    """
+    변경 이벤트 스트림 (Server-Sent Events)
+
+    각 이벤트의 event 필드는 엔티티 종류('device', 'room', 'location', 'mission', 'points', 'ranking', 'character'),
+    id 필드는 재연결 시 Last-Event-ID로 돌려보낼 cursor입니다.
+    cursor가 너무 오래되었거나 다른 프로세스(또는 재시작 전)의 cursor라서 이어서 보낼 수 없으면 'reset' 이벤트를 보냅니다.
+
+    Errors:
+        400: 잘못된 cursor
+    """
+    try:
+        cursor = _parse_cursor()
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    def generate(cursor):
+        # 클라이언트 재연결 대기 시간(ms) 안내
+        yield 'retry: 3000\n\n'
+        while True:
+            events = feed.since(cursor)
+            if events is None:
+                cursor = feed.last_seq
+                yield f'id: {feed.format_cursor(cursor)}\nevent: reset\ndata: {{}}\n\n'
+                continue
+            for event in events:
+                yield _format_sse(event)
+                cursor = event[0]
+            if not feed.wait(cursor, HEARTBEAT_SECONDS):
+                yield ': keep-alive\n\n'
+
+    return Response(
+        generate(cursor),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # 프록시(nginx) 버퍼링 비활성화
+        },
+    )
@@ -3,25 +3,33 @@
 
 캐릭터 진행률, 상태 카드, 연속 미션 일수 등을 제공하는 API 엔드포인트를 정의합니다.
 """
-from flask import Blueprint, jsonify
-from models import db, CharacterProgressModel, StatusCardModel, StreakModel
+from datetime import date
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select
+
+from models import db, StatusCardModel, User
+from utils.versioning import conditional
+from utils.character_progress import get_progress
+from utils.current_user import get_current_user_id, user_required
+from utils.streaks import MAX_BULK_USERS, get_streak, record_activities, streak_summary, today
 
 # Blueprint 생성
 character_bp = Blueprint('character', __name__)
 
 
 @character_bp.route('/api/character/progress', methods=['GET'])
+@user_required
 def get_character_progress():
-    """캐릭터 진행률"""
-    cp = CharacterProgressModel.query.first()
-    if not cp:
-        cp = CharacterProgressModel()
-        db.session.add(cp)
+    """캐릭터 진행률 (현재 사용자의 진행 행 하나만 조회)"""
+    cp = get_progress(get_current_user_id())
+    if cp.id is None:
         db.session.commit()
     return jsonify(cp.to_dict())
 
 
 @character_bp.route('/api/character/status', methods=['GET'])
+@conditional(StatusCardModel.__tablename__, cache_control='public, max-age=60')
 def get_character_status():
     """캐릭터 상태 카드"""
     cards = StatusCardModel.query.all()
@@ -29,14 +37,66 @@ def get_character_status():
 
 
 @character_bp.route('/api/character/streak', methods=['GET'])
+@user_required
 def get_character_streak():
-    """연속 미션 일수"""
-    streak = StreakModel.query.first()
-    if not streak:
-        streak = StreakModel()
-        db.session.add(streak)
-        db.session.commit()
-    return jsonify(streak.to_dict())
+    """
+    연속 미션 일수
+    
+    현재 사용자의 활동 비트맵에서 현재 연속 일수, 최장 연속 일수, 이번 주 완료 요일을 계산합니다.
+    
+    Returns:
+        JSON: {
+            'days': 3,
+            'longestStreak': 12,
+            'completedDays': [1, 2, 3],   # 이번 주 완료 요일 (1=월요일 ~ 7=일요일)
+            'message': '3일 연속 미션 완료했어요!'
+        }
+    """
+    streak = get_streak(get_current_user_id())
+    return jsonify(streak_summary(streak))
+
+
+@character_bp.route('/api/character/streak/bulk', methods=['POST'])
+def record_streaks():
+    """
+    여러 사용자의 미션 완료일 일괄 기록
+    
+    배치 작업이나 관리 도구에서 여러 사용자의 활동일을 한 번에 기록합니다.
+    
+    Request Body:
+        JSON: {
+            'userIds': [1, 2, 3],
+            'date': '2025-01-15'   # 선택, 기본값: 오늘(UTC), 오늘 이후 날짜는 안 됨
+        }
+    
+    Returns:
+        JSON: {'updated': 3}
+    
+    Errors:
+        400: 잘못된 요청 형식, 오늘 이후 날짜 또는 사용자 수 초과
+        404: 존재하지 않는 사용자 ID 포함
+    """
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get('userIds')
+    if not isinstance(user_ids, list) or not user_ids:
+        return jsonify({'error': 'userIds must be a non-empty list'}), 400
+    if len(user_ids) > MAX_BULK_USERS:
+        return jsonify({'error': f'Too many users (max {MAX_BULK_USERS})'}), 400
+    try:
+        user_ids = [int(u) for u in user_ids]
+        day = date.fromisoformat(data['date']) if data.get('date') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid userIds or date'}), 400
+    if day is not None and day > today():
+        return jsonify({'error': 'Invalid userIds or date'}), 400
+    known = set(db.session.execute(select(User.id).where(User.id.in_(user_ids))).scalars())
+    unknown = sorted(set(user_ids) - known)
+    if unknown:
+        return jsonify({'error': f'Unknown userIds: {unknown}'}), 404
+
+    updated = record_activities(user_ids, day)
+    db.session.commit()
+    return jsonify({'updated': updated})
 
 
 
@@ -4,29 +4,53 @@
 홈 화면에서 필요한 데이터를 제공하는 API 엔드포인트들을 정의합니다.
 디바이스 목록, 위치 정보, 절약 통계, 캐릭터 정보 등을 반환합니다.
 """
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from sqlalchemy import case, select, update
 from models import (
     db,
     Device,
     LocationStat,
     SavingsStat,
-    User,
     CharacterProgressModel,
-    RoomModel,
-    PointSummary,
 )
+from utils.power_totals import (
+    apply_power_delta,
+    apply_power_deltas,
+    get_or_create_location_stat,
+)
+from utils.current_user import get_current_user_id, user_required
+from utils.ledger import EARN, post_entry
+from utils.fields import load_fields, parse_fields, serialize
+from utils.room_selection import get_selected_room
+from utils.rollups import CAMPUS_SCOPE_ID, query_usage, today_range
+from utils.change_feed import publish, publish_many
 
 # Blueprint 생성
 # 'home'이라는 이름으로 Blueprint를 생성하여 홈 관련 라우트를 그룹화합니다
 home_bp = Blueprint('home', __name__)
 
+# 디바이스를 켜고 끌 때의 전력 사용량 변화량
+POWER_ON_INCREASE = 0.5
+POWER_OFF_DECREASE = 0.3
+
+# 디바이스를 끌 때마다 반영되는 절약량과 포인트
+SAVINGS_PER_OFF = 0.1
+POINTS_PER_OFF = 10
+
+# 일괄 변경 요청 하나에 받을 수 있는 최대 디바이스 ID 수
+MAX_BULK_DEVICES = 1000
+
 
 @home_bp.route('/api/home/devices', methods=['GET'])
 def get_devices():
     """
     홈 화면 디바이스 목록 조회
     
-    강의실 내 모든 IoT 디바이스의 목록을 반환합니다.
+    현재 선택된 강의실에 설치된 IoT 디바이스의 목록을 반환합니다.
+    room_id 인덱스로 조회하므로 비용은 캠퍼스 전체가 아닌 강의실 디바이스 수에 비례합니다.
+    
+    Query Parameters:
+        fields (str, optional): 반환할 필드 (쉼표로 구분, 예: 'id,name,status'), 기본값: 전체
     
     Returns:
         JSON: 디바이스 목록 배열
@@ -43,10 +67,23 @@ def get_devices():
                 ...
             ]
     """
-    # 데이터베이스에서 모든 디바이스 조회
-    devices = Device.query.all()
-    # 각 디바이스를 딕셔너리로 변환하여 JSON 배열로 반환
-    return jsonify([d.to_dict() for d in devices])
+    try:
+        fields = parse_fields(Device.API_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # 선택된 강의실의 디바이스만, 요청된 필드의 컬럼만 조회
+    room = get_selected_room()
+    if not room:
+        return jsonify([])
+    devices = (
+        Device.query.options(load_fields(Device, fields))
+        .filter_by(room_id=room.id)
+        .order_by(Device.id.asc())
+        .all()
+    )
+    # 요청된 필드만 딕셔너리로 변환하여 JSON 배열로 반환
+    return jsonify([serialize(d, fields, Device.API_FIELDS) for d in devices])
 
 
 @home_bp.route('/api/home/location', methods=['GET'])
@@ -54,71 +91,70 @@ def get_location():
     """
     홈 화면 위치 정보 조회
     
-    현재 선택된 강의실과 해당 강의실의 총 전력 사용량을 반환합니다.
+    현재 선택된 강의실과 캠퍼스 전체 / 해당 강의실의 총 전력 사용량을 반환합니다.
     
     Returns:
         JSON: 위치 정보
             {
                 'currentLocation': '정보문화관 PC34실',
-                'totalPowerUsage': 150.5
+                'totalPowerUsage': 150.5,
+                'roomPowerUsage': 12.5
             }
     """
-    # 현재 선택된 강의실 찾기
-    selected_room = RoomModel.query.filter_by(is_selected=True).first()
-    
-    # 선택된 강의실이 없으면 기본값으로 첫 번째 강의실 선택
-    if not selected_room:
-        selected_room = RoomModel.query.first()
-        if selected_room:
-            selected_room.is_selected = True
-            db.session.commit()
+    # 현재 사용자가 선택한 강의실 찾기 (사용자 ID 기본키 조회, 없으면 기본 강의실)
+    selected_room = get_selected_room()
     
     # 위치 통계 데이터 조회
+    # 통계 데이터가 없으면 집계 쿼리 한 번으로 총 전력을 계산하여 생성
     stat = LocationStat.query.first()
-    
     if not stat:
-        # 통계 데이터가 없으면 새로 생성
-        # 모든 디바이스의 전력 사용량을 합산하여 총 전력 계산
-        total_power = sum((d.power_usage or 0) for d in Device.query.all())
-        stat = LocationStat(
-            current_location=selected_room.name if selected_room else '정보문화관 PC34실',
-            total_power_usage=total_power
+        stat = get_or_create_location_stat(
+            selected_room.name if selected_room else '정보문화관 PC34실'
         )
-        db.session.add(stat)
         db.session.commit()
-    else:
-        # 통계 데이터가 있으면 선택된 강의실 이름으로 업데이트
-        if selected_room:
-            stat.current_location = selected_room.name
-            db.session.commit()
     
-    return jsonify(stat.to_dict())
+    # 현재 위치는 사용자가 선택한 강의실 기준 (공용 통계 행은 수정하지 않음)
+    result = stat.to_dict()
+    if selected_room:
+        result['currentLocation'] = selected_room.name
+    result['roomPowerUsage'] = (selected_room.total_power_usage or 0) if selected_room else 0
+    return jsonify(result)
 
 
 @home_bp.route('/api/home/savings', methods=['GET'])
 def get_savings():
-    """홈 화면 절약 데이터"""
+    """
+    홈 화면 절약 데이터
+    
+    절약 통계와 함께 오늘 캠퍼스 전력 사용량(kWh)을 반환합니다.
+    전력 사용량은 원본 측정값이 아닌 시/분 단위 집계 테이블에서 읽습니다.
+    """
     stat = SavingsStat.query.first()
     if not stat:
         stat = SavingsStat()
         db.session.add(stat)
         db.session.commit()
-    return jsonify(stat.to_dict())
+    
+    usage = query_usage('campus', CAMPUS_SCOPE_ID, *today_range())
+    result = stat.to_dict()
+    result['todayUsage'] = round(usage['energyWh'] / 1000, 3)
+    return jsonify(result)
 
 
 @home_bp.route('/api/home/character', methods=['GET'])
+@user_required
 def get_character():
     """홈 화면 캐릭터 데이터"""
-    user = User.query.first()
-    if not user:
+    # 레벨과 진행률은 미션 완료 때마다 갱신되는 캐릭터 진행 행에서 함께 읽음
+    user_id = get_current_user_id()
+    cp = CharacterProgressModel.query.filter_by(user_id=user_id).first() if user_id else None
+    if not cp:
         return jsonify({'level': 1, 'growthRate': 0})
-    # growthRate는 간단히 진행률 기반으로 계산
-    cp = CharacterProgressModel.query.first()
-    growth_rate = int(cp.progress) if cp else 0
-    return jsonify({'level': user.level, 'growthRate': growth_rate})
+    return jsonify({'level': cp.current_level, 'growthRate': int(cp.progress)})
 
 
 @home_bp.route('/api/devices/<device_id>/toggle', methods=['PUT'])
+@user_required
 def toggle_device(device_id):
     """
     디바이스 상태 토글 (켜기/끄기)
@@ -142,55 +178,195 @@ def toggle_device(device_id):
     except ValueError:
         return jsonify({'error': 'Invalid device id'}), 400
 
-    # 디바이스 조회
-    device = Device.query.get(int_id)
+    # 디바이스 조회 (커밋까지 행을 잠가 동시에 토글해도 변화량이 한 번만 반영되도록 함)
+    device = db.session.get(Device, int_id, with_for_update=True)
     if not device:
         return jsonify({'error': 'Device not found'}), 404
     
+    # 변경 전 전력 사용량 (총 전력 증분 계산용)
+    previous_power = device.power_usage or 0
+    
     # 상태 변경: 현재 상태가 'off'면 'on'으로, 그 외에는 'off'로
     device.status = 'on' if device.status == 'off' else 'off'
     
     # 전력 사용량 업데이트
     if device.status == 'on' and device.power_usage is not None:
         # 켜면 전력 사용량 증가
-        device.power_usage = (device.power_usage or 0) + 0.5
+        device.power_usage = (device.power_usage or 0) + POWER_ON_INCREASE
     elif device.status == 'off' and device.power_usage is not None:
         # 끄면 전력 사용량 감소 (0 이하로 내려가지 않음)
-        device.power_usage = max(0, (device.power_usage or 0) - 0.3)
+        device.power_usage = max(0, (device.power_usage or 0) - POWER_OFF_DECREASE)
     
     # 절약량 및 포인트 통계 업데이트
     savings = SavingsStat.query.first()
-    summary = PointSummary.query.first()
     
     # 통계 데이터가 없으면 생성
     if not savings:
         savings = SavingsStat()
         db.session.add(savings)
-    if not summary:
-        summary = PointSummary()
-        db.session.add(summary)
 
     # 디바이스를 끄면 절약 포인트 획득
     if device.status == 'off':
-        savings.today_savings += 0.1  # 절약량 증가
-        savings.acquired_points += 10  # 획득 포인트 증가
-        summary.current_points += 10  # 현재 포인트 증가
-    
-    # 모든 디바이스의 총 전력 사용량 재계산
-    total_power = sum((d.power_usage or 0) for d in Device.query.all())
-    stat = LocationStat.query.first()
+        savings.today_savings += SAVINGS_PER_OFF  # 절약량 증가
+        savings.acquired_points += POINTS_PER_OFF  # 획득 포인트 증가
+        post_entry(get_current_user_id(), EARN, POINTS_PER_OFF, 'device_off', device.id)  # 원장에 적립
     
-    if not stat:
-        # 위치 통계가 없으면 생성
-        stat = LocationStat(current_location='pc22실', total_power_usage=total_power)
-        db.session.add(stat)
-    else:
-        # 위치 통계가 있으면 총 전력 사용량 업데이트
-        stat.total_power_usage = total_power
+    # 총 전력 사용량(캠퍼스, 강의실)에 이번 토글의 변화량만 반영
+    # (전체 디바이스를 다시 합산하지 않으므로 디바이스 수와 무관하게 일정한 비용)
+    apply_power_delta((device.power_usage or 0) - previous_power, device.room_id)
 
     # 모든 변경사항을 데이터베이스에 저장
     db.session.commit()
     
+    # 구독 중인 클라이언트에 변경된 디바이스와 위치 통계 전달
+    publish('device', str(device.id), device.to_dict())
+    _publish_location()
+    
     # 업데이트된 디바이스 정보 반환
     return jsonify(device.to_dict())
 
+
+def _publish_location():
+    """변경된 캠퍼스 총 전력 사용량을 변경 피드에 발행"""
+    stat = LocationStat.query.first()
+    if stat:
+        publish('location', None, {'totalPowerUsage': stat.total_power_usage})
+
+
+def _apply_off_rewards(turned_off):
+    """
+    꺼진 디바이스 수만큼 절약량과 포인트를 한 번에 증가
+
+    SET x = x + :n 형태의 UPDATE로 처리하고, 통계 행이 없을 때만 새로 생성합니다.
+
+    Args:
+        turned_off (int): 이번 요청에서 꺼진 디바이스 수
+    """
+    if not turned_off:
+        return
+
+    updated = SavingsStat.query.update({
+        SavingsStat.today_savings: SavingsStat.today_savings + SAVINGS_PER_OFF * turned_off,
+        SavingsStat.acquired_points: SavingsStat.acquired_points + POINTS_PER_OFF * turned_off,
+    }, synchronize_session=False)
+    if not updated:
+        db.session.add(SavingsStat(
+            today_savings=SAVINGS_PER_OFF * turned_off,
+            acquired_points=POINTS_PER_OFF * turned_off,
+        ))
+
+    # 꺼진 디바이스 수만큼의 포인트를 원장에 한 건으로 적립
+    post_entry(get_current_user_id(), EARN, POINTS_PER_OFF * turned_off, 'device_off')
+
+
+@home_bp.route('/api/devices/toggle', methods=['PUT'])
+@user_required
+def bulk_toggle_devices():
+    """
+    여러 디바이스 상태 일괄 변경
+    
+    "모두 끄기" 미션처럼 여러 디바이스를 한 번에 켜거나 끌 때 사용합니다.
+    상태가 바뀌는 디바이스만 하나의 UPDATE 문으로 변경하고,
+    절약량·포인트·총 전력 사용량은 요청당 한 번만 갱신합니다.
+    
+    Request Body:
+        JSON: {
+            'deviceIds': ['1', '2'],  # 변경할 디바이스 ID 목록 (roomId와 둘 중 하나)
+            'roomId': '1',            # 강의실의 모든 디바이스를 변경할 때 사용
+            'status': 'off'           # 목표 상태 ('on' 또는 'off')
+        }
+    
+    Returns:
+        JSON: 변경된 디바이스 수와 각 디바이스의 현재 상태
+            {
+                'changed': 2,
+                'devices': [ ... ],
+                'notFound': []
+            }
+    
+    Errors:
+        400: 잘못된 디바이스 ID 목록(MAX_BULK_DEVICES개 초과 포함), 강의실 ID 또는 상태 값
+    """
+    data = request.get_json(silent=True) or {}
+    target = data.get('status')
+    if target not in ('on', 'off'):
+        return jsonify({'error': 'Invalid status'}), 400
+
+    raw_ids = data.get('deviceIds')
+    room_id = data.get('roomId')
+    if room_id is not None:
+        # 강의실 단위 변경: room_id 인덱스로 대상 디바이스 선택
+        try:
+            condition = Device.room_id == int(room_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid room id'}), 400
+    elif isinstance(raw_ids, list) and raw_ids:
+        if len(raw_ids) > MAX_BULK_DEVICES:
+            return jsonify({'error': f'Too many devices (max {MAX_BULK_DEVICES})'}), 400
+        try:
+            condition = Device.id.in_({int(i) for i in raw_ids})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid device id'}), 400
+    else:
+        return jsonify({'error': 'deviceIds or roomId is required'}), 400
+
+    # 변경 전 전력 사용량과 강의실 (총 전력 증분 계산용)
+    # 커밋까지 행을 잠가 동시에 들어온 변경이 같은 이전 값으로 변화량을 계산하지 않도록 함
+    # (ID 순서로 잠가 요청 사이의 교착을 피함)
+    previous = {
+        r.id: r
+        for r in db.session.execute(
+            select(Device.id, Device.power_usage, Device.room_id)
+            .where(condition)
+            .order_by(Device.id)
+            .with_for_update()
+        )
+    }
+    ids = set(previous)
+    if room_id is None:
+        requested = {int(i) for i in raw_ids}
+    else:
+        requested = ids
+
+    # 목표 상태와 다른 디바이스만 한 번의 UPDATE로 변경
+    if target == 'on':
+        new_power = Device.power_usage + POWER_ON_INCREASE
+    else:
+        new_power = case(
+            (Device.power_usage - POWER_OFF_DECREASE < 0, 0.0),
+            else_=Device.power_usage - POWER_OFF_DECREASE,
+        )
+    changed = db.session.execute(
+        update(Device)
+        .where(Device.id.in_(ids), Device.status != target)
+        .values(status=target, power_usage=new_power)
+        .returning(Device.id, Device.power_usage),
+        execution_options={'synchronize_session': False},
+    ).all()
+
+    # 통계는 요청당 한 번만 갱신 (강의실별 변화량을 모아 반영)
+    deltas_by_room = {}
+    for device_id, power in changed:
+        before = previous[device_id]
+        deltas_by_room[before.room_id] = (
+            deltas_by_room.get(before.room_id, 0.0) + (power or 0) - (before.power_usage or 0)
+        )
+    apply_power_deltas(deltas_by_room)
+    if target == 'off':
+        _apply_off_rewards(len(changed))
+
+    db.session.commit()
+
+    devices = Device.query.filter(Device.id.in_(ids)).order_by(Device.id.asc()).all()
+
+    # 상태가 바뀐 디바이스만 구독 중인 클라이언트에 전달
+    changed_ids = {device_id for device_id, _ in changed}
+    publish_many([('device', str(d.id), d.to_dict()) for d in devices if d.id in changed_ids])
+    if changed_ids:
+        _publish_location()
+
+    return jsonify({
+        'changed': len(changed),
+        'devices': [d.to_dict() for d in devices],
+        'notFound': [str(i) for i in sorted(requested - ids)],
+    })
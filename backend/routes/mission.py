@@ -5,35 +5,68 @@
 미션 목록 조회, 미션 시작/완료, 랭크 진행률, 캠퍼스 통계 등을 제공합니다.
 """
 from flask import Blueprint, jsonify, request
+from sqlalchemy import select
 from models import (
     db,
     Mission,
+    UserMissionModel,
     Device,
-    PointSummary,
-    SavingsStat,
-    CharacterProgressModel,
     RankProgressModel,
     CampusStatModel,
 )
 from utils.seed_data import CAMPUS_STATS
+from utils.change_feed import publish
+from utils.character_progress import record_mission_completion
+from utils.current_user import get_current_user_id, user_required
+from utils.streaks import record_activity
+from utils.points import credit_points, record_mission_savings
+from utils.room_selection import get_selected_room
+from utils.idempotency import idempotent
+from utils.mission_timers import scheduler as mission_timers
+from utils.occupancy import index as occupancy_index
+from utils.pagination import encode_cursor, parse_page_args, set_next_cursor
+from utils.fields import load_fields, parse_fields, project, serialize
+from utils.catalog_cache import catalog_response, page_range, missions as mission_catalog
+from utils.user_missions import (
+    USER_MISSION_STATUSES,
+    complete_mission as complete_user_mission,
+    get_states,
+    list_by_status,
+    merge_items,
+    start_mission as start_user_mission,
+    states_etag_key,
+)
 
 # Blueprint 생성
 mission_bp = Blueprint('mission', __name__)
 
+# 미션 상세에서 미션 필드 외에 선택할 수 있는 추가 항목
+DETAIL_EXTRA_FIELDS = ('roomName', 'devices', 'timer', 'nearbyRoom')
+
+# 미션 상세의 디바이스 기본 필드 (미션 화면의 켜기/끄기 목록에 필요한 필드만)
+DETAIL_DEVICE_FIELDS = ('id', 'name', 'status', 'icon', 'type')
+
 
 @mission_bp.route('/api/missions', methods=['GET'])
+@user_required
 def get_missions():
     """
     미션 목록 조회
     
     카테고리별로 미션 목록을 필터링하여 반환합니다.
+    미션 정보는 메모리 카탈로그에서, 진행 상태(progress, currentStep, status)는
+    현재 사용자의 user_missions 행에서 한 번의 쿼리로 읽어 합칩니다.
     
     Query Parameters:
         category (str, optional): 미션 카테고리 ('all', 'recycle', 'quiz', 'content', 'contest')
                                  기본값: 'all' (모든 카테고리)
+        status (str, optional): 'in-progress' 또는 'completed'이면 현재 사용자의 해당 상태 미션만 반환
+        limit (int, optional): 한 페이지 크기 (기본값: 50, 최대 200)
+        cursor (str, optional): 이전 응답의 X-Next-Cursor 헤더 값
+        fields (str, optional): 반환할 필드 (쉼표로 구분, 예: 'id,title,points'), 기본값: 전체
     
     Returns:
-        JSON: 미션 목록 배열
+        JSON: 미션 목록 배열 (다음 페이지가 있으면 X-Next-Cursor, Link 헤더 포함)
             [
                 {
                     'id': '1',
@@ -51,74 +84,172 @@ def get_missions():
     """
     # 쿼리 파라미터에서 카테고리 가져오기 (없으면 'all')
     category = request.args.get('category', 'all')
+    status = request.args.get('status')
+    if status is not None and status not in USER_MISSION_STATUSES:
+        return jsonify({'error': 'Invalid status'}), 400
     
-    # 기본 쿼리 생성
-    query = Mission.query
-    
-    # 카테고리가 'all'이 아니면 해당 카테고리로 필터링
-    if category != 'all':
-        query = query.filter_by(category=category)
+    try:
+        fields = parse_fields(mission_catalog.fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        limit, after = parse_page_args()
+        if after is not None and type(after[0]) is not int:
+            raise ValueError('invalid cursor')
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
     
-    # 필터링된 미션 목록 조회
-    missions = query.all()
+    version, group = mission_catalog.group(category, fields)
+    after_id = after[0] if after else None
+    user_id = get_current_user_id()
+    if status is None:
+        # 카테고리별로 미리 인코딩해 둔 미션 목록에서 ID 순으로 커서 다음부터 한 페이지 선택 후
+        # 그 페이지의 미션에 대한 사용자 상태만 조회
+        start, end, last_id = page_range(group, after_id, limit)
+        mission_ids = group.ids[start:end]
+        states = get_states(user_id, mission_ids)
+    else:
+        # 상태별 부분 인덱스로 사용자의 미션을 한 페이지 조회
+        states, last_id = list_by_status(user_id, status, after_id, limit, category)
+        mission_ids = list(states)
+    items = merge_items(group, mission_ids, states, fields)
+    next_cursor = encode_cursor([last_id]) if last_id is not None else None
     
-    # 각 미션을 딕셔너리로 변환하여 JSON 배열로 반환
-    return jsonify([m.to_dict() for m in missions])
+    etag_version = f'{version}:{states_etag_key(user_id, states)}'
+    response = catalog_response(mission_catalog, etag_version, items, cache_control='private, no-cache')
+    return set_next_cursor(response, next_cursor)
 
 
 @mission_bp.route('/api/missions/<mission_id>', methods=['GET'])
+@user_required
 def get_mission_detail(mission_id):
-    """미션 상세 정보"""
+    """
+    미션 상세 정보
+    
+    미션 정보와 함께 선택된 강의실 이름, 강의실 디바이스, 타이머, 가까운 여유 강의실을 반환합니다.
+    요청된 필드에 필요한 조회만 수행합니다 (예: devices를 요청하지 않으면 디바이스를 조회하지 않음).
+    
+    Query Parameters:
+        fields (str, optional): 반환할 필드 (미션 필드 + 진행 상태 필드 + roomName, devices, timer, nearbyRoom), 기본값: 전체
+        deviceFields (str, optional): devices 항목의 필드, 기본값: id, name, status, icon, type
+    
+    Errors:
+        400: 잘못된 미션 ID 형식 또는 알 수 없는 필드
+        404: 미션을 찾을 수 없음
+    """
     try:
         int_id = int(mission_id)
     except ValueError:
         return jsonify({'error': 'Invalid mission id'}), 400
 
-    mission = Mission.query.get(int_id)
+    try:
+        fields = parse_fields(
+            tuple(Mission.API_FIELDS) + tuple(UserMissionModel.API_FIELDS) + DETAIL_EXTRA_FIELDS
+        )
+        device_fields = parse_fields(
+            Device.API_FIELDS, param='deviceFields', default=DETAIL_DEVICE_FIELDS
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # 요청된 미션 필드의 컬럼만 조회 (존재 확인을 위해 ID는 항상 포함)
+    mission_fields = [f for f in fields if f in Mission.API_FIELDS]
+    columns = {'id'} | {Mission.API_FIELDS[f] for f in mission_fields}
+    mission = db.session.execute(
+        select(*[getattr(Mission, c) for c in columns]).where(Mission.id == int_id)
+    ).first()
     if not mission:
         return jsonify({'error': 'Mission not found'}), 404
+    mission_detail = serialize(mission, mission_fields, Mission.API_FIELDS)
+
+    # 진행 상태와 마감 시각은 현재 사용자의 행에서 조회 (없으면 시작 전 상태)
+    state_fields = [f for f in fields if f in UserMissionModel.API_FIELDS]
+    user_mission = None
+    if state_fields or 'timer' in fields:
+        user_mission = UserMissionModel.query.filter_by(
+            user_id=get_current_user_id(), mission_id=int_id
+        ).first()
+    if state_fields:
+        if user_mission is not None:
+            mission_detail.update(serialize(user_mission, state_fields, UserMissionModel.API_FIELDS))
+        else:
+            mission_detail.update(project(UserMissionModel.DEFAULT_STATE, state_fields))
     
-    # 미션 상세에 필요한 추가 정보
-    mission_detail = mission.to_dict()
-    mission_detail.update(
-        {
-            'roomName': '정보문화관 PC34실',
-            'devices': [d.to_dict() for d in Device.query.all()],
-            'timer': 600,  # 10분 = 600초
-            'nearbyRoom': {
-                'name': '정보문화관 PC33실',
-                'peopleCount': 3,
-                'status': '여유',
-            },
-        }
-    )
+    # 미션 상세에 필요한 추가 정보 (요청된 항목만)
+    room = get_selected_room() if {'roomName', 'devices', 'nearbyRoom'} & set(fields) else None
+    if 'roomName' in fields:
+        mission_detail['roomName'] = room.name if room else '정보문화관 PC34실'
+    if 'devices' in fields:
+        # 디바이스는 선택된 강의실에 설치된 것만 room_id 인덱스로, 요청된 컬럼만 조회
+        devices = (
+            Device.query.options(load_fields(Device, device_fields))
+            .filter_by(room_id=room.id)
+            .order_by(Device.id.asc())
+            .all()
+            if room
+            else []
+        )
+        mission_detail['devices'] = [serialize(d, device_fields, Device.API_FIELDS) for d in devices]
+    if 'timer' in fields:
+        # 진행 중이면 마감까지 남은 시간(초), 아니면 미션 제한 시간
+        mission_detail['timer'] = mission_timers.remaining(
+            user_mission.deadline_at
+            if user_mission is not None and user_mission.status == 'in-progress'
+            else None
+        )
+    if 'nearbyRoom' in fields:
+        # 가까운 여유 강의실은 재실 인원 인덱스에서 조회 (데이터베이스 조회 없음)
+        nearby = occupancy_index.nearest_free_room(room.id) if room else None
+        mission_detail['nearbyRoom'] = {
+            'name': nearby['name'],
+            'peopleCount': nearby['peopleCount'],
+            'status': nearby['congestion'],
+        } if nearby else None
 
     return jsonify(mission_detail)
 
 
 @mission_bp.route('/api/missions/<mission_id>/start', methods=['POST'])
+@user_required
 def start_mission(mission_id):
-    """미션 시작"""
+    """
+    미션 시작
+    
+    현재 사용자의 미션 상태를 진행 중으로 저장합니다 (다른 사용자의 상태와 미션 카탈로그는 바뀌지 않음).
+    제한 시간(MISSION_TIMER_SECONDS) 안에 완료하지 않으면 미션 타이머 스케줄러가 'expired'로 바꿉니다.
+    """
     try:
         int_id = int(mission_id)
     except ValueError:
         return jsonify({'error': 'Invalid mission id'}), 400
 
-    mission = Mission.query.get(int_id)
+    mission = db.session.get(Mission, int_id)
     if not mission:
         return jsonify({'error': 'Mission not found'}), 404
     
-    mission.status = 'in-progress'
+    user_id = get_current_user_id()
+    # 마감 시각을 함께 저장하고, 커밋 후 타이머 등록
+    deadline = mission_timers.deadline()
+    state = start_user_mission(user_id, int_id, deadline)
+    mission_data = mission.to_dict(state)
     db.session.commit()
-    return jsonify({'message': 'Mission started', 'mission': mission.to_dict()})
+    mission_timers.schedule(user_id, int_id, deadline)
+
+    publish('mission', mission_data['id'], {**mission_data, 'userId': str(user_id)})
+    return jsonify({'message': 'Mission started', 'mission': mission_data})
 
 
 @mission_bp.route('/api/missions/<mission_id>/complete', methods=['POST'])
+@user_required
+@idempotent
 def complete_mission(mission_id):
     """
     미션 완료 처리
     
-    미션을 완료 상태로 변경하고, 포인트, 절약 통계, 캐릭터 진행률 등을 업데이트합니다.
+    현재 사용자의 미션 상태를 완료로 저장하고, 포인트, 절약 통계, 캐릭터 진행률 등을 업데이트합니다.
+    공유 미션 카탈로그 행은 바꾸지 않습니다.
+    동시에 여러 요청이 들어와도 값이 누락되지 않도록, 포인트는 원장에 기록을 추가하고
+    나머지 누적 값은 UPDATE ... SET x = x + :n으로 데이터베이스에서 증가시키며 하나의 짧은 트랜잭션으로 커밋합니다.
     
     Args:
         mission_id (str): 미션 ID (URL 파라미터)
@@ -132,7 +263,8 @@ def complete_mission(mission_id):
     
     Errors:
         400: 잘못된 미션 ID 형식
-        404: 미션을 찾을 수 없음
+        404: 미션 또는 사용자를 찾을 수 없음
+        409: 진행 중인 미션이 아님 (시작하지 않았거나 이미 완료 / 만료됨)
     """
     # 미션 ID를 정수로 변환
     try:
@@ -140,48 +272,49 @@ def complete_mission(mission_id):
     except ValueError:
         return jsonify({'error': 'Invalid mission id'}), 400
 
-    # 미션 조회
-    mission = Mission.query.get(int_id)
+    mission = db.session.get(Mission, int_id)
     if not mission:
         return jsonify({'error': 'Mission not found'}), 404
+    user_id = get_current_user_id()
+
+    # 진행 중인 미션만 완료 상태로 저장하고 (진행률 100%), 저장된 상태를 함께 반환받음
+    state = complete_user_mission(user_id, int_id)
+    if state is None:
+        return jsonify({'error': 'Mission is not in progress'}), 409
+    
+    # 포인트 원장에 미션 포인트 적립 기록 추가
+    summary = credit_points(user_id, mission.points or 0, 'mission', int_id)
     
-    # 미션 상태를 완료로 변경
-    mission.status = 'completed'
-    mission.progress = 100  # 진행률 100%로 설정
-    
-    # 포인트 추가
-    summary = PointSummary.query.first()
-    if not summary:
-        summary = PointSummary()
-        db.session.add(summary)
-    # 현재 포인트와 주간 증가 포인트에 미션 포인트 추가
-    summary.current_points += mission.points
-    summary.weekly_increase += mission.points
-    
-    # 절약 데이터 업데이트
-    savings = SavingsStat.query.first()
-    if not savings:
-        savings = SavingsStat()
-        db.session.add(savings)
     # 참여한 미션 수와 획득 포인트 증가
-    savings.participated_missions += 1
-    savings.acquired_points += mission.points
-    
-    # 캐릭터 진행률 업데이트
-    cp = CharacterProgressModel.query.first()
-    if not cp:
-        cp = CharacterProgressModel()
-        db.session.add(cp)
-    # 진행률 증가 (최대 100%)
-    cp.progress = min(100, cp.progress + 2)
-    # 다음 레벨까지 남은 미션 수 감소 (최소 0)
-    cp.missions_to_next_level = max(0, cp.missions_to_next_level - 1)
-
-    # 모든 변경사항을 데이터베이스에 저장
+    record_mission_savings(mission.points or 0)
+    
+    # 캐릭터 진행률, 레벨 업데이트 (누적 미션 수 기준으로 다시 계산)
+    level, leveled_up = record_mission_completion(user_id)
+    # 오늘 미션 완료일 기록 (연속 미션 일수)
+    record_activity(user_id)
+
+    # 커밋 전에 응답 데이터를 만들어 커밋 후 다시 조회하지 않도록 함
+    mission_data = mission.to_dict(state)
+
+    # 모든 변경사항을 데이터베이스에 저장하고 미션 타이머 취소
     db.session.commit()
+    mission_timers.cancel(user_id, int_id)
+
+    # 구독 중인 클라이언트에 미션(사용자 상태 포함), 포인트 변경 전달
+    # 랭킹은 포인트에 따라 바뀌므로 다시 조회하도록 알림만 보냄
+    publish('mission', mission_data['id'], {**mission_data, 'userId': str(user_id)})
+    publish('points', str(user_id), summary)
+    publish('ranking', None, None)
+    if leveled_up:
+        publish('character', str(user_id), {
+            'currentLevel': level['current_level'],
+            'nextLevel': level['next_level'],
+            'progress': level['progress'],
+            'missionsToNextLevel': level['missions_to_next_level'],
+        })
 
     # 완료 메시지와 업데이트된 미션 정보 반환
-    return jsonify({'message': 'Mission completed', 'mission': mission.to_dict()})
+    return jsonify({'message': 'Mission completed', 'mission': mission_data})
 
 
 @mission_bp.route('/api/rank/progress', methods=['GET'])
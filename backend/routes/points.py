@@ -6,23 +6,38 @@
 from flask import Blueprint, jsonify, request
 from models import (
     db,
-    PointSummary,
-    RecentActivityModel,
-    WeeklyActivityModel,
+    PointLedgerEntry,
     ExchangeItemModel,
     DonateCategoryModel,
 )
+from utils.current_user import get_current_user_id, user_required
+from utils.exchange_codes import claim_code
+from utils.ledger import DONATE, SPEND, debit, get_balance, get_week_buckets
+from utils.point_activity import ACTIVITY_FIELDS, describe
+from utils.idempotency import idempotent
+from utils.catalog_cache import (
+    catalog_response,
+    donate_categories as donate_catalog,
+    exchange_items as exchange_catalog,
+)
+from utils.pagination import page_response, paginate_query
+from utils.fields import parse_fields, project
+
+# 교환 아이템, 기부 카테고리처럼 거의 바뀌지 않는 카탈로그 응답의 캐시 정책
+CATALOG_CACHE_CONTROL = 'public, max-age=60'
 
 # Blueprint 생성
 points_bp = Blueprint('points', __name__)
 
 
 @points_bp.route('/api/points', methods=['GET'])
+@user_required
 def get_points():
     """
     현재 포인트 정보 조회
     
     사용자의 현재 포인트, 주간 증가량, 사용한 포인트, 기부한 포인트 등을 반환합니다.
+    값은 포인트 원장의 스냅샷과 그 이후 기록으로 계산합니다 (주간 증가량은 이번 주 월요일(UTC)부터).
     
     Returns:
         JSON: 포인트 요약 정보
@@ -33,43 +48,75 @@ def get_points():
                 'totalDonated': 300
             }
     """
-    ps = PointSummary.query.first()
-    if not ps:
-        # 포인트 요약 데이터가 없으면 새로 생성
-        ps = PointSummary()
-        db.session.add(ps)
-        db.session.commit()
-    return jsonify(ps.to_dict())
+    return jsonify(get_balance(get_current_user_id()))
 
 
 @points_bp.route('/api/points/activities', methods=['GET'])
+@user_required
 def get_point_activities():
-    """포인트 활동 내역"""
-    acts = RecentActivityModel.query.order_by(RecentActivityModel.id.desc()).all()
-    return jsonify([a.to_dict() for a in acts])
+    """
+    포인트 활동 내역 (최신순)
+    
+    현재 사용자의 포인트 원장 기록을 (user_id, id) 인덱스로 한 페이지만 읽어 활동 항목으로 변환합니다.
+    
+    Query Parameters:
+        limit (int, optional): 한 페이지 크기 (기본값: 50, 최대 200)
+        cursor (str, optional): 이전 응답의 X-Next-Cursor 헤더 값
+        fields (str, optional): 반환할 필드 (쉼표로 구분), 기본값: 전체
+    """
+    try:
+        fields = parse_fields(ACTIVITY_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = PointLedgerEntry.query.filter_by(user_id=get_current_user_id())
+    try:
+        entries, next_cursor = paginate_query(query, [PointLedgerEntry.id], descending=True)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+    return page_response([project(describe(e), fields) for e in entries], next_cursor)
 
 
 @points_bp.route('/api/points/weekly', methods=['GET'])
+@user_required
 def get_weekly_activities():
-    """주간 활동 데이터"""
-    items = WeeklyActivityModel.query.all()
-    return jsonify([w.to_dict() for w in items])
+    """
+    주간 활동 데이터
+    
+    이번 주 월요일부터 일요일까지(UTC) 요일별 적립 포인트를 일별 집계 7개 행에서 반환합니다.
+    
+    Returns:
+        JSON: [{'day': '월', 'date': '2025-11-10', 'points': 15}, ...]
+    """
+    return jsonify(get_week_buckets(get_current_user_id()))
 
 
 @points_bp.route('/api/points/exchange', methods=['GET'])
 def get_exchange_items():
-    """교환 아이템 목록"""
+    """
+    교환 아이템 목록 (미리 인코딩해 둔 카탈로그 스냅샷에서 응답)
+    
+    Query Parameters:
+        category (str, optional): 'voucher' 또는 'gifticon' (기본값: 'voucher')
+        fields (str, optional): 반환할 필드 (쉼표로 구분), 기본값: 전체
+    """
     category = request.args.get('category', 'voucher')
-    items = ExchangeItemModel.query.filter_by(category=category).all()
-    return jsonify([i.to_dict() for i in items])
+    try:
+        fields = parse_fields(exchange_catalog.fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    version, group = exchange_catalog.group(category, fields)
+    return catalog_response(exchange_catalog, version, group.items, CATALOG_CACHE_CONTROL)
 
 
 @points_bp.route('/api/points/exchange', methods=['POST'])
+@user_required
+@idempotent
 def exchange_points():
     """
     포인트 교환 처리
     
-    포인트를 사용하여 상품(바우처, 기프티콘 등)을 교환합니다.
+    포인트를 사용하여 상품(바우처, 기프티콘 등)을 교환하고, 아이템의 코드 재고에서 교환 코드 하나를 발급합니다.
     
     Request Body:
         JSON: {
@@ -82,12 +129,14 @@ def exchange_points():
             {
                 'message': 'Exchange successful',
                 'item': { ... },
+                'code': 'K7QM-2XPA-9DWE',
                 'remainingPoints': 1400
             }
     
     Errors:
         400: 잘못된 아이템 ID 또는 포인트 부족
         404: 아이템을 찾을 수 없음
+        409: 교환 코드 재고 없음
     """
     data = request.json
     item_id = data.get('itemId')
@@ -104,38 +153,47 @@ def exchange_points():
     if not item:
         return jsonify({'error': 'Item not found'}), 404
     
-    # 포인트 요약 데이터 조회 또는 생성
-    ps = PointSummary.query.first()
-    if not ps:
-        ps = PointSummary()
-        db.session.add(ps)
-        db.session.commit()
-
-    # 포인트가 충분한지 확인
-    if ps.current_points < item.points:
+    # 잔액 확인과 차감을 조건부 UPDATE 한 문장으로 처리 (동시 요청에도 잔액 이상 차감되지 않음)
+    user_id = get_current_user_id()
+    remaining = debit(user_id, SPEND, item.points, 'exchange', item.id)
+    if remaining is None:
         return jsonify({'error': 'Insufficient points'}), 400
-    
-    # 포인트 차감 및 사용 포인트 증가
-    ps.current_points -= item.points
-    ps.used_points += item.points
+
+    # 다른 요청이 잡고 있는 코드는 건너뛰고 남은 코드 하나를 발급 (재고가 없으면 차감 취소)
+    code = claim_code(item.id, user_id)
+    if code is None:
+        db.session.rollback()
+        return jsonify({'error': 'Out of stock'}), 409
     db.session.commit()
     
     # 교환 성공 응답 반환
     return jsonify({
         'message': 'Exchange successful',
         'item': item.to_dict(),
-        'remainingPoints': ps.current_points,
+        'code': code,
+        'remainingPoints': remaining,
     })
 
 
 @points_bp.route('/api/points/donate/categories', methods=['GET'])
 def get_donate_categories():
-    """기부 카테고리 목록"""
-    cats = DonateCategoryModel.query.all()
-    return jsonify([c.to_dict() for c in cats])
+    """
+    기부 카테고리 목록 (미리 인코딩해 둔 카탈로그 스냅샷에서 응답)
+    
+    Query Parameters:
+        fields (str, optional): 반환할 필드 (쉼표로 구분), 기본값: 전체
+    """
+    try:
+        fields = parse_fields(donate_catalog.fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    version, group = donate_catalog.group(None, fields)
+    return catalog_response(donate_catalog, version, group.items, CATALOG_CACHE_CONTROL)
 
 
 @points_bp.route('/api/points/donate', methods=['POST'])
+@user_required
+@idempotent
 def donate_points():
     """포인트 기부"""
     data = request.json
@@ -151,30 +209,28 @@ def donate_points():
         DonateCategoryModel.query.get(int_id) if int_id is not None else None
     )
     
+    # 기부 금액은 0 이상의 정수만 허용 (음수 기부로 포인트가 늘지 않도록)
+    if isinstance(amount, bool) or not isinstance(amount, int) or amount < 0:
+        return jsonify({'error': 'Invalid amount'}), 400
+
     # 고정 금액 기부
     if amount == 0 and category:
         amount = category.points
     
-    ps = PointSummary.query.first()
-    if not ps:
-        ps = PointSummary()
-        db.session.add(ps)
-        db.session.commit()
-
-    if ps.current_points < amount:
-        return jsonify({'error': 'Insufficient points'}), 400
-    
-    # 포인트 차감
-    ps.current_points -= amount
-    ps.total_donated += amount
+    # 잔액 확인과 차감을 조건부 UPDATE 한 문장으로 처리 (동시 요청에도 잔액 이상 차감되지 않음)
+    user_id = get_current_user_id()
+    if amount:
+        if debit(user_id, DONATE, amount, 'donate', int_id) is None:
+            return jsonify({'error': 'Insufficient points'}), 400
+    balance = get_balance(user_id)
     db.session.commit()
     
     return jsonify({
         'message': 'Donation successful',
         'category': category.to_dict() if category else None,
         'amount': amount,
-        'remainingPoints': ps.current_points,
-        'totalDonated': ps.total_donated,
+        'remainingPoints': balance['currentPoints'],
+        'totalDonated': balance['totalDonated'],
     })
 
 
@@ -2,67 +2,179 @@
 랭킹 관련 API 라우트
 
 사용자 랭킹 목록을 제공하는 API 엔드포인트를 정의합니다.
+순위는 프로세스 메모리의 포인트 리더보드(utils.leaderboard)에서 계산합니다.
+기간별 랭킹은 최근 1 / 7 / 30일 적립 포인트 순위표에서, 학과 랭킹은 리더보드가 변경분만 반영해 미리 정렬해 둔 학과 순위표에서 읽습니다.
 """
 from flask import Blueprint, jsonify, request
-from models import User, PointSummary, UserStatModel, RankingEntryModel
+from sqlalchemy import select
+
+from models import db, User
+from utils.current_user import get_current_user_id, user_required
+from utils.leaderboard import board, PERIOD_DAYS
 
 # Blueprint 생성
 ranking_bp = Blueprint('ranking', __name__)
 
+# 랭킹 목록 기본 / 최대 크기
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+# 내 주변 순위: 앞뒤로 보여 줄 기본 / 최대 사용자 수
+DEFAULT_WINDOW = 2
+MAX_WINDOW = 10
+
+# 랭킹 타입
+RANKING_TYPES = ('individual', 'department')
+
+# 랭킹 기간: PERIOD_DAYS의 기간(최근 N일 적립 포인트)과 'all'(현재 포인트)
+TIME_PERIODS = (*PERIOD_DAYS, 'all')
+
+# 학과 랭킹 정렬 기준: 포인트 합계 / 1인당 평균
+DEPARTMENT_SORTS = ('total', 'average')
+
+
+def _int_arg(name, default, maximum):
+    """0 이상 maximum 이하의 정수 쿼리 파라미터 (형식이 잘못되면 ValueError)"""
+    value = int(request.args.get(name, default))
+    if value < 0:
+        raise ValueError(name)
+    return min(value, maximum)
+
+
+def _with_profiles(*groups):
+    """(순위, 사용자 ID, 포인트) 목록들을 이름과 학과를 붙인 항목 목록으로 변환 (사용자 조회는 한 번)"""
+    user_ids = {user_id for entries in groups for _, user_id, _ in entries}
+    profiles = {}
+    if user_ids:
+        profiles = {
+            row.id: row
+            for row in db.session.execute(
+                select(User.id, User.name, User.department).where(User.id.in_(user_ids))
+            )
+        }
+    return [
+        [
+            {
+                'id': str(user_id),
+                'rank': rank,
+                'name': profiles[user_id].name if user_id in profiles else '',
+                'department': profiles[user_id].department if user_id in profiles else '',
+                'points': points,
+            }
+            for rank, user_id, points in entries
+        ]
+        for entries in groups
+    ]
+
+
+def _with_department_stats(*groups):
+    """(순위, 학과, 점수) 목록들을 학과 합계 / 평균 / 인원을 붙인 항목 목록으로 변환"""
+    items = []
+    for entries in groups:
+        group = []
+        for rank, department, _ in entries:
+            total, members, average = board.department_stats(department)
+            group.append({
+                'id': department,
+                'rank': rank,
+                'name': department,
+                'department': department,
+                'points': total,
+                'averagePoints': average,
+                'members': members,
+            })
+        items.append(group)
+    return items
+
 
 @ranking_bp.route('/api/ranking', methods=['GET'])
+@user_required
 def get_ranking():
     """
     랭킹 목록 조회
     
     사용자 랭킹 목록과 현재 사용자의 랭킹 정보를 반환합니다.
+    순위는 기간 동안 적립한 포인트(all이면 현재 포인트)가 많은 순이며, 포인트가 같으면 같은 순위입니다.
+    기간 동안 적립한 포인트가 없는 사용자는 목록에 포함되지 않습니다 (myRank도 null).
     
     Query Parameters:
         type (str, optional): 랭킹 타입 ('individual' 또는 'department'), 기본값: 'individual'
-        period (str, optional): 기간 ('daily', 'weekly', 'monthly'), 기본값: 'daily'
+        period (str, optional): 기간 ('daily', 'weekly', 'monthly', 'all'), 기본값: 'all'
+            daily / weekly / monthly는 오늘(UTC)을 포함한 최근 1 / 7 / 30일 동안 적립한 포인트, all은 현재 포인트 기준
+            (period 없이 요청하던 기존 클라이언트가 계속 전체 순위를 받도록 기본값은 all)
+        limit (int, optional): 상위 몇 명을 반환할지 (기본값: 10, 최대 100)
+        window (int, optional): 내 주변 순위에서 앞뒤로 보여 줄 사용자 수 (기본값: 2, 최대 10)
+        sort (str, optional): 학과 랭킹 정렬 기준 ('total' 또는 'average'), 기본값: 'total'
     
     Returns:
         JSON: 랭킹 정보
             {
                 'rankingType': 'individual',
-                'timePeriod': 'daily',
+                'timePeriod': 'all',
                 'myRank': {
                     'myRank': 12,
                     'myPoints': 1500,
                     'myName': '홍길동',
                     'myDepartment': '컴퓨터공학과'
                 },
-                'rankingList': [ ... ]
+                'rankingList': [ ... ],
+                'aroundMe': [ ... ]
             }
+
+        학과 랭킹(type=department)은 기간과 관계없이 학과별 현재 포인트 합계(또는 1인당 평균) 순이며,
+        myRank는 현재 사용자 학과의 순위와 포인트 합계, 목록 항목에는 averagePoints와 members가 추가됩니다.
+        학과 순위는 미리 정렬된 학과 순위표에서 읽으므로 요청마다 사용자 전체를 집계하지 않습니다.
+
+    Errors:
+        400: 잘못된 랭킹 타입, 기간, 정렬 기준, limit 또는 window
     """
     ranking_type = request.args.get('type', 'individual')  # individual or department
-    time_period = request.args.get('period', 'daily')  # daily, weekly, monthly
-    
-    # 현재 사용자 정보 추가
-    user = User.query.first()
-    ps = PointSummary.query.first()
-    my_rank_value = 12
-    my_points_value = ps.current_points if ps else 0
-    if user:
-        stat = UserStatModel.query.first()
-        if stat:
-            my_rank_value = stat.ranking
-    my_rank_info = {
-        'myRank': my_rank_value,
-        'myPoints': my_points_value,
-        'myName': user.name if user else '',
-        'myDepartment': user.department if user else '',
-    }
-    
-    entries = RankingEntryModel.query.order_by(RankingEntryModel.rank.asc()).all()
+    time_period = request.args.get('period', 'all')  # daily, weekly, monthly, all
+    try:
+        limit = _int_arg('limit', DEFAULT_LIMIT, MAX_LIMIT)
+        window = _int_arg('window', DEFAULT_WINDOW, MAX_WINDOW)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or window'}), 400
+    if ranking_type not in RANKING_TYPES:
+        return jsonify({'error': 'Invalid ranking type'}), 400
+    if time_period not in TIME_PERIODS:
+        return jsonify({'error': 'Invalid period'}), 400
+    sort = request.args.get('sort', 'total')
+    if sort not in DEPARTMENT_SORTS:
+        return jsonify({'error': 'Invalid sort'}), 400
 
-    return jsonify({
+    user_id = get_current_user_id()
+    user = db.session.get(User, user_id) if user_id is not None else None
+
+    if ranking_type == 'department':
+        departments = board.department_totals if sort == 'total' else board.department_averages
+        my_department = user.department if user else None
+        ranking_list, around_me = _with_department_stats(
+            departments.top(limit), departments.around(my_department, window)
+        )
+        my_rank_info = {
+            'myRank': departments.rank(my_department),
+            'myPoints': board.department_stats(my_department)[0],
+            'myName': user.name if user else '',
+            'myDepartment': my_department or '',
+        }
+    else:
+        users = board if time_period == 'all' else board.periods.board(time_period)
+        ranking_list, around_me = _with_profiles(users.top(limit), users.around(user_id, window))
+        my_rank_info = {
+            'myRank': users.rank(user_id),
+            'myPoints': users.score(user_id) or 0,
+            'myName': user.name if user else '',
+            'myDepartment': user.department if user else '',
+        }
+
+    response = jsonify({
         'rankingType': ranking_type,
         'timePeriod': time_period,
         'myRank': my_rank_info,
-        'rankingList': [e.to_dict() for e in entries],
+        'rankingList': ranking_list,
+        'aroundMe': around_me,
     })
-
-
-
-
+    # 순위는 요청마다 바뀔 수 있으므로 캐시하지 않음
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -3,22 +3,37 @@
 
 강의실 목록 조회 및 선택 기능을 제공하는 API 엔드포인트를 정의합니다.
 """
-from flask import Blueprint, jsonify
-from models import db, RoomModel, LocationStat, Device
+from flask import Blueprint, jsonify, request
+from models import db, RoomModel
+from utils.power_totals import get_or_create_location_stat
+from utils.change_feed import publish, publish_many
+from utils.current_user import get_current_user_id, user_required
+from utils.room_selection import select_room_for_user
+from utils.versioning import bump, conditional
+from utils.occupancy import ROOM_FIELDS, index as occupancy_index, to_room_dict
+from utils.fields import parse_fields, project
+from utils.pagination import encode_cursor, page_response, parse_page_args
 
 # Blueprint 생성
 rooms_bp = Blueprint('rooms', __name__)
 
 
 @rooms_bp.route('/api/rooms', methods=['GET'])
+@conditional(RoomModel.__tablename__)
 def get_rooms():
     """
     강의실 목록 조회
     
     모든 강의실의 목록을 이름 순으로 정렬하여 반환합니다.
+    재실 인원과 혼잡도는 메모리 인덱스에서 읽으므로 데이터베이스를 조회하지 않습니다.
+    
+    Query Parameters:
+        limit (int, optional): 한 페이지 크기 (기본값: 50, 최대 200)
+        cursor (str, optional): 이전 응답의 X-Next-Cursor 헤더 값
+        fields (str, optional): 반환할 필드 (쉼표로 구분), 기본값: 전체
     
     Returns:
-        JSON: 강의실 목록 배열
+        JSON: 강의실 목록 배열 (다음 페이지가 있으면 X-Next-Cursor, Link 헤더 포함)
             [
                 {
                     'id': '1',
@@ -31,18 +46,90 @@ def get_rooms():
                 ...
             ]
     """
-    # 강의실 목록을 이름 순으로 정렬하여 조회
-    rooms = RoomModel.query.order_by(RoomModel.name.asc()).all()
-    return jsonify([r.to_dict() for r in rooms])
+    try:
+        fields = parse_fields(ROOM_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        limit, after = parse_page_args(size=2)
+        if after is not None and not (isinstance(after[0], str) and isinstance(after[1], int)):
+            raise ValueError('invalid cursor')
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+
+    # 재실 인원 인덱스에서 (이름, ID) 순으로 커서 다음 강의실부터 조회
+    rooms = occupancy_index.list_rooms(after=after, limit=limit + 1)
+    next_cursor = None
+    if len(rooms) > limit:
+        rooms = rooms[:limit]
+        next_cursor = encode_cursor([rooms[-1]['name'], rooms[-1]['id']])
+    return page_response([project(to_room_dict(r), fields) for r in rooms], next_cursor)
+
+
+@rooms_bp.route('/api/rooms/occupancy', methods=['PUT'])
+def update_occupancy():
+    """
+    강의실 재실 인원 갱신
+    
+    출입 센서 등에서 보고한 재실 인원을 여러 강의실에 대해 한 번에 반영합니다.
+    혼잡도는 수용 인원 대비 인원 비율로 다시 계산됩니다.
+    
+    Request Body:
+        JSON: {
+            'rooms': [
+                {'roomId': '1', 'peopleCount': 12},
+                ...
+            ]
+        }
+    
+    Returns:
+        JSON: 값이 바뀐 강의실 목록
+            {
+                'updated': [ { ...Room }, ... ]
+            }
+    
+    Errors:
+        400: 잘못된 요청 형식 또는 음수 인원
+    """
+    data = request.get_json(silent=True) or {}
+    entries = data.get('rooms')
+    if not isinstance(entries, list):
+        return jsonify({'error': 'rooms must be a list'}), 400
+
+    counts = {}
+    for index, entry in enumerate(entries):
+        try:
+            room_id = int(entry['roomId'])
+            people_count = int(entry['peopleCount'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': f'Invalid entry at index {index}'}), 400
+        if people_count < 0:
+            return jsonify({'error': f'Invalid entry at index {index}'}), 400
+        counts[room_id] = people_count
+
+    # 보고된 인원을 모두 데이터베이스에 기록하고, 커밋이 성공한 뒤에 인덱스에 반영
+    changed = occupancy_index.write_counts(counts)
+    if changed:
+        # 조건부 GET 캐시 무효화를 위한 버전 증가
+        bump(RoomModel.__tablename__)
+    db.session.commit()
+    occupancy_index.apply_counts(changed)
+
+    # 구독 중인 클라이언트에 바뀐 강의실 전달
+    updated = [to_room_dict(r) for r in changed]
+    publish_many([('room', room['id'], room) for room in updated])
+
+    return jsonify({'updated': updated})
 
 
 @rooms_bp.route('/api/rooms/<room_id>/select', methods=['PUT'])
+@user_required
 def select_room(room_id):
     """
     강의실 선택 처리
     
-    특정 강의실을 선택하고, 위치 통계를 업데이트합니다.
-    한 번에 하나의 강의실만 선택할 수 있습니다.
+    현재 사용자의 선택 강의실을 저장합니다.
+    사용자당 한 행만 UPSERT하므로 다른 사용자의 선택이나 rooms 테이블에는 영향을 주지 않습니다.
     
     Args:
         room_id (str): 강의실 ID (URL 파라미터)
@@ -65,37 +152,31 @@ def select_room(room_id):
     except ValueError:
         return jsonify({'error': 'Invalid room id'}), 400
 
-    # 모든 강의실의 선택 상태를 해제 (한 번에 하나만 선택 가능)
-    RoomModel.query.update({RoomModel.is_selected: False})
-    
     # 선택할 강의실 조회
-    room = RoomModel.query.get(int_id)
+    room = db.session.get(RoomModel, int_id)
     if not room:
         return jsonify({'error': 'Room not found'}), 404
     
-    # 선택한 강의실을 선택 상태로 변경
-    room.is_selected = True
-    
-    # 위치 통계 업데이트
-    stat = LocationStat.query.first()
-    if not stat:
-        # 위치 통계가 없으면 새로 생성
-        # 모든 디바이스의 전력 사용량을 합산
-        total_power = sum((d.power_usage or 0) for d in Device.query.all())
-        stat = LocationStat(current_location=room.name, total_power_usage=total_power)
-        db.session.add(stat)
-    else:
-        # 위치 통계가 있으면 현재 위치만 업데이트
-        stat.current_location = room.name
+    # 사용자별 선택 강의실 저장 (사용자 ID 기본키로 한 행만 UPSERT)
+    select_room_for_user(get_current_user_id(), room.id)
+    
+    # 위치 통계 조회 (없으면 집계 쿼리로 총 전력을 계산하여 새로 생성)
+    stat = get_or_create_location_stat(room.name)
     
     # 모든 변경사항을 데이터베이스에 저장
     db.session.commit()
     
+    # 구독 중인 클라이언트에 선택된 강의실 전달
+    publish('room', str(room.id), room.to_dict())
+    
     # 선택 성공 응답 반환
+    location = stat.to_dict()
+    location['currentLocation'] = room.name
+    location['roomPowerUsage'] = room.total_power_usage or 0
     return jsonify({
         'message': 'Room selected',
         'room': room.to_dict(),
-        'location': stat.to_dict(),
+        'location': location,
     })
 
 
@@ -0,0 +1,247 @@
+"""
+디바이스 측정값(텔레메트리) 관련 API 라우트
+
+전력 계측기가 몇 초 간격으로 보고하는 측정값을 묶음(batch) 단위로 수집합니다.
+측정값은 ORM 객체를 만들지 않고 집합 단위의 대량 삽입으로 기록하며,
+디바이스의 최신 값(power_usage, temperature)은 묶음당 한 번만 갱신합니다.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import insert, select, update
+
+from models import db, Device, DeviceReading, DeviceReadingInbox
+from utils.power_totals import apply_power_deltas
+from utils.rollups import GRANULARITIES, query_series, query_usage, today_range
+
+# Blueprint 생성
+telemetry_bp = Blueprint('telemetry', __name__)
+
+# 한 번의 요청으로 받을 수 있는 최대 측정값 수
+MAX_BATCH_SIZE = 10000
+
+# 측정 시각이 서버 시각보다 이만큼 넘게 앞서면 거부 (계측기 시계 오차 허용 범위)
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def _parse_timestamp(value):
+    """
+    측정 시각을 UTC 기준 naive datetime으로 변환
+
+    Args:
+        value (str | int | float): ISO 8601 문자열 또는 유닉스 타임스탬프(초)
+
+    Returns:
+        datetime: UTC 기준 시각 (tzinfo 없음)
+
+    Raises:
+        ValueError: 형식이 잘못된 경우
+    """
+    if isinstance(value, bool):
+        raise ValueError('invalid timestamp')
+    if isinstance(value, (int, float)):
+        parsed = datetime.fromtimestamp(value, tz=timezone.utc)
+    elif isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    else:
+        raise ValueError('invalid timestamp')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_reading(raw):
+    """
+    요청 본문의 측정값 하나를 삽입용 딕셔너리로 변환
+
+    NaN / 무한대 / 음수 전력과 미래 시각은 합계와 최신 값을 망가뜨리므로 거부합니다.
+
+    Raises:
+        ValueError, TypeError, KeyError: 필드가 없거나 형식이 잘못된 경우
+    """
+    recorded_at = _parse_timestamp(raw['timestamp'])
+    if recorded_at > datetime.now(timezone.utc).replace(tzinfo=None) + MAX_CLOCK_SKEW:
+        raise ValueError('timestamp in the future')
+    watts = float(raw['watts'])
+    if not math.isfinite(watts) or watts < 0:
+        raise ValueError('invalid watts')
+    temperature = raw.get('temperature')
+    if temperature is not None:
+        temperature = float(temperature)
+        if not math.isfinite(temperature):
+            raise ValueError('invalid temperature')
+    return {
+        'device_id': int(raw['deviceId']),
+        'recorded_at': recorded_at,
+        'watts': watts,
+        'temperature': temperature,
+    }
+
+
+@telemetry_bp.route('/api/devices/readings', methods=['POST'])
+def ingest_readings():
+    """
+    디바이스 측정값 일괄 수집
+
+    여러 디바이스의 측정값을 한 번에 받아 device_readings 테이블에 추가합니다.
+    디바이스별로 가장 최근 측정값만 Device.power_usage / temperature에 반영하며,
+    이미 반영된 값보다 오래된(늦게 도착한) 측정값은 기록만 하고 최신 값은 바꾸지 않습니다.
+    같은 디바이스의 묶음이 동시에 들어와도 합계 변화량이 겹치지 않도록 디바이스 행을 잠근 뒤 비교합니다.
+
+    Request Body:
+        JSON: {
+            'readings': [
+                {
+                    'deviceId': '2',
+                    'timestamp': '2025-11-10T09:43:00Z',  # 또는 유닉스 타임스탬프(초)
+                    'watts': 12.5,
+                    'temperature': 23.1                   # 선택
+                },
+                ...
+            ]
+        }
+
+    Returns:
+        JSON: 처리 결과
+            {
+                'accepted': 120,
+                'rejected': 0,
+                'devicesUpdated': 40
+            }
+
+    Errors:
+        400: 요청 형식이 잘못되었거나(NaN / 무한대 / 음수 전력, 서버 시각보다 MAX_CLOCK_SKEW 넘게 앞선 시각 포함) 묶음 크기 초과
+    """
+    data = request.get_json(silent=True) or {}
+    raw_readings = data.get('readings')
+    if not isinstance(raw_readings, list):
+        return jsonify({'error': 'readings must be a list'}), 400
+    if len(raw_readings) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE})'}), 400
+
+    # 요청 본문 검증 및 변환
+    rows = []
+    for index, raw in enumerate(raw_readings):
+        try:
+            rows.append(_parse_reading(raw))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return jsonify({'error': f'Invalid reading at index {index}'}), 400
+
+    if not rows:
+        return jsonify({'accepted': 0, 'rejected': 0, 'devicesUpdated': 0})
+
+    # 묶음에 포함된 디바이스의 현재 상태를 한 번의 쿼리로 조회
+    # 커밋까지 행을 잠가 동시에 들어온 묶음이 같은 이전 값으로 변화량을 계산하지 않도록 함
+    # (ID 순서로 잠가 묶음 사이의 교착을 피함)
+    device_ids = {row['device_id'] for row in rows}
+    current = {
+        r.id: r
+        for r in db.session.execute(
+            select(Device.id, Device.power_usage, Device.last_reading_at, Device.room_id)
+            .where(Device.id.in_(device_ids))
+            .order_by(Device.id)
+            .with_for_update()
+        )
+    }
+
+    # 존재하지 않는 디바이스의 측정값은 제외
+    accepted = [row for row in rows if row['device_id'] in current]
+    rejected = len(rows) - len(accepted)
+
+    # 디바이스별 최신 측정값 선별
+    latest = {}
+    for row in accepted:
+        best = latest.get(row['device_id'])
+        if best is None or row['recorded_at'] >= best['recorded_at']:
+            latest[row['device_id']] = row
+
+    # 이미 반영된 측정값보다 새로운 경우에만 디바이스 최신 값 갱신
+    device_updates = []
+    deltas_by_room = {}
+    for device_id, row in latest.items():
+        last_reading_at = current[device_id].last_reading_at
+        if last_reading_at is not None and row['recorded_at'] < last_reading_at:
+            continue
+        update_row = {
+            'id': device_id,
+            'power_usage': row['watts'],
+            'last_reading_at': row['recorded_at'],
+        }
+        if row['temperature'] is not None:
+            update_row['temperature'] = row['temperature']
+        device_updates.append(update_row)
+        room_id = current[device_id].room_id
+        deltas_by_room[room_id] = (
+            deltas_by_room.get(room_id, 0.0)
+            + row['watts'] - (current[device_id].power_usage or 0)
+        )
+
+    # 측정값은 executemany 형태의 대량 삽입으로 기록하고, 집계에 필요한 값은 집계 대기열에도 넣음
+    if accepted:
+        db.session.execute(insert(DeviceReading), accepted)
+        db.session.execute(insert(DeviceReadingInbox), [
+            {'device_id': row['device_id'], 'recorded_at': row['recorded_at'], 'watts': row['watts']}
+            for row in accepted
+        ])
+
+    # 디바이스 최신 값은 기본키 기준 대량 업데이트로 한 번에 반영
+    if device_updates:
+        db.session.execute(update(Device), device_updates)
+        apply_power_deltas(deltas_by_room)
+
+    db.session.commit()
+
+    return jsonify({
+        'accepted': len(accepted),
+        'rejected': rejected,
+        'devicesUpdated': len(device_updates),
+    })
+
+
+@telemetry_bp.route('/api/devices/<device_id>/power', methods=['GET'])
+def get_device_power(device_id):
+    """
+    디바이스 전력 사용량 조회
+
+    원본 측정값이 아닌 분/시/일 단위 집계 테이블에서 기간 합계와 구간별 사용량을 읽습니다.
+
+    Query Parameters:
+        from (str, optional): 시작 시각 (ISO 8601, 기본값: 오늘 0시 UTC)
+        to (str, optional): 종료 시각 (ISO 8601, 기본값: 현재)
+        granularity (str, optional): 구간 단위 ('minute', 'hour', 'day'), 기본값: 'hour'
+
+    Returns:
+        JSON: 기간 합계와 구간별 사용량
+            {
+                'deviceId': '2',
+                'summary': {'sampleCount': 720, 'averageWatts': 12.1, 'energyWh': 12.1},
+                'series': [ ... ]
+            }
+
+    Errors:
+        400: 잘못된 디바이스 ID, 시각 또는 구간 단위
+    """
+    try:
+        int_id = int(device_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid device id'}), 400
+
+    granularity = request.args.get('granularity', 'hour')
+    if granularity not in GRANULARITIES:
+        return jsonify({'error': 'Invalid granularity'}), 400
+
+    start, end = today_range()
+    try:
+        if request.args.get('from'):
+            start = _parse_timestamp(request.args['from'])
+        if request.args.get('to'):
+            end = _parse_timestamp(request.args['to'])
+    except ValueError:
+        return jsonify({'error': 'Invalid time range'}), 400
+
+    return jsonify({
+        'deviceId': str(int_id),
+        'summary': query_usage('device', int_id, start, end),
+        'series': query_series('device', int_id, start, end, granularity),
+    })
@@ -3,8 +3,14 @@
 
 사용자 프로필, 통계, 활동 내역 등을 제공하는 API 엔드포인트를 정의합니다.
 """
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from models import db, User, UserStatModel, UserActivityModel
+from utils.change_feed import publish
+from utils.current_user import get_current_user_id, user_required
+from utils.leaderboard import board
+from utils.pagination import page_response, paginate_query
+from utils.fields import load_fields, parse_fields, serialize
+from utils.versioning import bump
 
 # Blueprint 생성
 user_bp = Blueprint('user', __name__)
@@ -35,6 +41,43 @@ def get_user_profile():
     return jsonify(user.to_dict())
 
 
+@user_bp.route('/api/user/profile', methods=['PUT'])
+@user_required
+def update_user_profile():
+    """
+    사용자 프로필 수정
+
+    현재 사용자의 학과를 변경합니다.
+    학과 랭킹은 이전 학과와 새 학과의 합계만 변경분만큼 갱신됩니다.
+
+    Request Body:
+        {
+            'department': '전자공학과'
+        }
+
+    Returns:
+        JSON: 수정된 사용자 프로필 정보
+
+    Errors:
+        400: 잘못된 학과 (빈 문자열이거나 100자 초과)
+        404: 사용자를 찾을 수 없음
+    """
+    data = request.get_json(silent=True) or {}
+    department = data.get('department')
+    if not isinstance(department, str) or not department.strip() or len(department.strip()) > 100:
+        return jsonify({'error': 'Invalid department'}), 400
+
+    user = db.session.get(User, get_current_user_id())
+    user.department = department.strip()
+    bump(User.__tablename__)
+    db.session.commit()
+
+    # 이 프로세스의 학과 랭킹에 바로 반영 (다른 프로세스는 users 버전 변경으로 반영)
+    board.move(user.id, user.department)
+    publish('ranking', None, None)
+    return jsonify(user.to_dict())
+
+
 @user_bp.route('/api/user/stats', methods=['GET'])
 def get_user_stats():
     """사용자 통계"""
@@ -43,14 +86,34 @@ def get_user_stats():
         stat = UserStatModel(user_id=User.query.first().id if User.query.first() else 1)
         db.session.add(stat)
         db.session.commit()
-    return jsonify(stat.to_dict())
+    data = stat.to_dict()
+    # 순위는 포인트 리더보드의 현재 순위 사용
+    data['ranking'] = board.rank(stat.user_id) or data['ranking']
+    return jsonify(data)
 
 
 @user_bp.route('/api/user/activities', methods=['GET'])
 def get_user_activities():
-    """사용자 활동 내역"""
-    acts = UserActivityModel.query.order_by(UserActivityModel.id.desc()).all()
-    return jsonify([a.to_dict() for a in acts])
+    """
+    사용자 활동 내역 (최신순)
+    
+    Query Parameters:
+        limit (int, optional): 한 페이지 크기 (기본값: 50, 최대 200)
+        cursor (str, optional): 이전 응답의 X-Next-Cursor 헤더 값
+        fields (str, optional): 반환할 필드 (쉼표로 구분), 기본값: 전체
+    """
+    try:
+        fields = parse_fields(UserActivityModel.API_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # 요청된 필드의 컬럼만 조회
+    query = UserActivityModel.query.options(load_fields(UserActivityModel, fields))
+    try:
+        acts, next_cursor = paginate_query(query, [UserActivityModel.id], descending=True)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+    return page_response([serialize(a, fields, UserActivityModel.API_FIELDS) for a in acts], next_cursor)
 
 
 
@@ -0,0 +1,124 @@
+"""
+미션 완료 동시성 벤치마크
+
+여러 스레드에서 같은 미션의 시작 / 완료 API를 동시에 호출한 뒤,
+포인트 / 절약 통계 / 캐릭터 누적 미션 수가 성공한 완료 수만큼 정확히 증가했는지 확인합니다.
+진행 중인 미션만 완료할 수 있으므로, 다른 요청이 먼저 완료한 경우의 409는 실패로 세지 않습니다.
+값이 하나라도 모자라거나 넘치면 갱신이 유실되었거나 같은 진행이 두 번 완료된 것입니다.
+
+운영과 같은 PostgreSQL에 대해 실행해야 의미 있는 결과를 얻을 수 있습니다
+(SQLite는 쓰기를 한 번에 하나씩만 처리하므로 경합이 발생하지 않습니다).
+벤치마크는 실제 데이터를 변경하므로 개발용 데이터베이스에서만 실행하세요.
+
+사용법:
+  python -m utils.bench_mission_completion                        # 기본: 스레드 32개, 요청 500개
+  python -m utils.bench_mission_completion --threads 64 --requests 1000 --mission 1
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+from models import db, CharacterProgressModel, Mission, SavingsStat
+from utils.current_user import get_current_user_id
+from utils.ledger import get_balance
+
+
+def _snapshot(user_id):
+    """검증할 누적 값 조회"""
+    points = get_balance(user_id)['currentPoints']
+    missions = db.session.execute(select(SavingsStat.participated_missions)).scalar() or 0
+    completed = db.session.execute(
+        select(CharacterProgressModel.completed_missions)
+        .where(CharacterProgressModel.user_id == user_id)
+    ).scalar() or 0
+    return points, missions, completed
+
+
+def run(app, mission_id, threads, requests):
+    """
+    벤치마크 실행
+
+    Returns:
+        dict: 요청 수, 성공 / 거절(409) / 실패 수, 소요 시간, 기대 증가량과 실제 증가량
+    """
+    with app.test_request_context():
+        user_id = get_current_user_id()
+        mission = db.session.get(Mission, mission_id)
+        if mission is None:
+            raise SystemExit(f"❌ 미션을 찾을 수 없습니다: {mission_id}")
+        mission_points = mission.points or 0
+        before = _snapshot(user_id)
+        db.session.remove()
+
+    # 스레드마다 별도의 테스트 클라이언트 사용 (요청마다 별도의 세션/연결)
+    local = threading.local()
+    start_barrier = threading.Barrier(threads)
+    failures = []
+    rejected = []
+
+    def complete(i):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+            # 모든 스레드가 준비된 뒤 동시에 시작
+            start_barrier.wait()
+        headers = {'X-User-Id': str(user_id)}
+        response = local.client.post(f'/api/missions/{mission_id}/start', headers=headers)
+        if response.status_code != 200:
+            failures.append((i, response.status_code))
+            return
+        response = local.client.post(f'/api/missions/{mission_id}/complete', headers=headers)
+        if response.status_code == 409:
+            rejected.append(i)
+        elif response.status_code != 200:
+            failures.append((i, response.status_code))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(complete, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        after = _snapshot(user_id)
+
+    succeeded = requests - len(failures) - len(rejected)
+    return {
+        'requests': requests,
+        'succeeded': succeeded,
+        'rejected': len(rejected),
+        'failures': len(failures),
+        'elapsed': elapsed,
+        'expected': (succeeded * mission_points, succeeded, succeeded),
+        'actual': tuple(a - b for a, b in zip(after, before)),
+    }
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    parser = argparse.ArgumentParser(description='미션 완료 동시성 벤치마크')
+    parser.add_argument('--threads', type=int, default=32, help='동시 요청 스레드 수')
+    parser.add_argument('--requests', type=int, default=500, help='전체 요청 수')
+    parser.add_argument('--mission', type=int, default=1, help='완료할 미션 ID')
+    args = parser.parse_args()
+
+    result = run(app, args.mission, args.threads, max(args.requests, args.threads))
+
+    labels = ('포인트', '참여 미션 수', '캐릭터 누적 미션 수')
+    print(f"요청 수: {result['requests']} (완료 {result['succeeded']}, "
+          f"진행 중 아님 {result['rejected']}, 실패 {result['failures']})")
+    print(f"소요 시간: {result['elapsed']:.2f}초 ({result['requests'] / result['elapsed']:.0f} req/s)")
+    lost = False
+    for label, expected, actual in zip(labels, result['expected'], result['actual']):
+        mark = '✅' if expected == actual else '❌'
+        lost = lost or expected != actual
+        print(f"{mark} {label}: 기대 +{expected}, 실제 +{actual}")
+    if lost:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+포인트 교환 동시성 벤치마크
+
+사용자에게 교환 아이템 가격의 (요청 수 / 2)배만큼 포인트를 적립하고 요청 수만큼 교환 코드를 등록한 뒤,
+여러 스레드에서 같은 아이템의 교환 API를 동시에 호출합니다.
+잔액 확인과 차감이 한 문장으로 처리되므로 다음이 모두 성립해야 합니다.
+- 성공한 교환 수가 잔액으로 살 수 있는 수와 정확히 같음 (초과 차감도, 잘못된 거절도 없음)
+- 남은 포인트가 0 이상이고, 원장으로 계산한 잔액과 현재 포인트 행이 같음
+- 성공한 교환마다 서로 다른 교환 코드가 발급됨
+
+운영과 같은 PostgreSQL에 대해 실행해야 의미 있는 결과를 얻을 수 있습니다
+(SQLite는 쓰기를 한 번에 하나씩만 처리하므로 경합이 발생하지 않습니다).
+벤치마크는 실제 데이터를 변경하므로 개발용 데이터베이스에서만 실행하세요.
+
+사용법:
+  python -m utils.bench_point_exchange                        # 기본: 스레드 32개, 요청 500개
+  python -m utils.bench_point_exchange --threads 64 --requests 1000 --item 1 --category voucher
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+from models import db, ExchangeItemModel, PointBalance
+from utils.current_user import get_current_user_id
+from utils.exchange_codes import generate_codes, load_codes
+from utils.ledger import EARN, get_balance, post_entry
+
+
+def _balances(user_id):
+    """원장으로 계산한 잔액과 현재 포인트 행 값"""
+    ledger = get_balance(user_id)['currentPoints']
+    row = db.session.execute(
+        select(PointBalance.current_points).where(PointBalance.user_id == user_id)
+    ).scalar()
+    return ledger, row
+
+
+def run(app, item_id, category, threads, requests):
+    """
+    벤치마크 실행
+
+    Returns:
+        dict: 요청 수, 성공 / 거절 / 실패 수, 발급된 서로 다른 코드 수, 소요 시간,
+            아이템 가격, 적립 후 잔액, 실행 후 잔액
+    """
+    with app.test_request_context():
+        user_id = get_current_user_id()
+        item = db.session.get(ExchangeItemModel, item_id)
+        if item is None or item.category != category or not item.points:
+            raise SystemExit(f"❌ 교환 아이템을 찾을 수 없습니다: {category} {item_id}")
+        cost = item.points
+        # 요청의 절반 정도만 성공할 수 있도록 포인트 적립
+        post_entry(user_id, EARN, cost * (requests // 2), 'bench')
+        db.session.commit()
+        # 코드 재고가 교환 수를 제한하지 않도록 요청 수만큼 등록
+        load_codes(item_id, generate_codes(requests))
+        before, _ = _balances(user_id)
+        db.session.remove()
+
+    # 스레드마다 별도의 테스트 클라이언트 사용 (요청마다 별도의 세션/연결)
+    local = threading.local()
+    start_barrier = threading.Barrier(threads)
+    statuses = []
+    codes = []
+
+    def exchange(i):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+            # 모든 스레드가 준비된 뒤 동시에 시작
+            start_barrier.wait()
+        response = local.client.post(
+            '/api/points/exchange',
+            json={'itemId': str(item_id), 'category': category},
+            headers={'X-User-Id': str(user_id)},
+        )
+        statuses.append(response.status_code)
+        if response.status_code == 200:
+            codes.append(response.get_json()['code'])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(exchange, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        after = _balances(user_id)
+
+    return {
+        'requests': requests,
+        'succeeded': statuses.count(200),
+        'rejected': statuses.count(400),
+        'failures': len(statuses) - statuses.count(200) - statuses.count(400),
+        'codes': len(set(codes)),
+        'elapsed': elapsed,
+        'cost': cost,
+        'before': before,
+        'after': after,
+    }
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    parser = argparse.ArgumentParser(description='포인트 교환 동시성 벤치마크')
+    parser.add_argument('--threads', type=int, default=32, help='동시 요청 스레드 수')
+    parser.add_argument('--requests', type=int, default=500, help='전체 요청 수')
+    parser.add_argument('--item', type=int, default=1, help='교환할 아이템 ID')
+    parser.add_argument('--category', default='voucher', help='아이템 카테고리')
+    args = parser.parse_args()
+
+    result = run(app, args.item, args.category, args.threads, max(args.requests, args.threads))
+
+    expected = min(result['requests'], result['before'] // result['cost'])
+    ledger_after, row_after = result['after']
+    checks = [
+        ('성공한 교환 수', expected, result['succeeded']),
+        ('남은 포인트', result['before'] - expected * result['cost'], ledger_after),
+        ('현재 포인트 행', ledger_after, row_after),
+        ('서로 다른 교환 코드 수', result['succeeded'], result['codes']),
+    ]
+
+    print(f"요청 수: {result['requests']} (성공 {result['succeeded']}, "
+          f"포인트 부족 {result['rejected']}, 실패 {result['failures']})")
+    print(f"소요 시간: {result['elapsed']:.2f}초 ({result['requests'] / result['elapsed']:.0f} req/s, "
+          f"성공 {result['succeeded'] / result['elapsed']:.0f} 건/s)")
+    broken = result['failures'] > 0 or ledger_after < 0
+    for label, want, got in checks:
+        mark = '✅' if want == got else '❌'
+        broken = broken or want != got
+        print(f"{mark} {label}: 기대 {want}, 실제 {got}")
+    if ledger_after < 0:
+        print(f"❌ 잔액보다 많이 차감됨: {ledger_after}")
+    if broken:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
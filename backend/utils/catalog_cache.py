@@ -0,0 +1,227 @@
+"""
+카탈로그 메모리 캐시
+
+미션 목록, 교환 아이템, 기부 카테고리처럼 작고 거의 바뀌지 않는 테이블을
+카테고리별로 미리 JSON 바이트로 인코딩한 불변 스냅샷으로 프로세스 메모리에 보관합니다.
+조회 API는 스냅샷의 바이트를 이어 붙여 바로 응답하므로 데이터베이스 조회나 직렬화를 하지 않습니다.
+
+스냅샷은 테이블 버전(table_versions)과 함께 보관합니다.
+- 같은 프로세스에서 데이터를 바꾼 요청은 커밋 후 refresh()로 새 스냅샷을 만듭니다.
+- 다른 워커 프로세스의 변경은 CHECK_SECONDS마다 버전만 조회해서 확인합니다.
+새 스냅샷은 현재 스냅샷보다 버전이 높을 때만 교체하므로, 늦게 끝난 로드가 최신 스냅샷을 덮어쓰지 않습니다.
+
+fields= 파라미터로 일부 필드만 요청하면 해당 필드 조합으로 인코딩한 결과를 스냅샷 안에 함께 보관하므로,
+같은 조합의 다음 요청부터는 다시 직렬화하지 않습니다.
+"""
+import hashlib
+import json
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from flask import Response, request
+
+from models import DonateCategoryModel, ExchangeItemModel, Mission, UserMissionModel
+from utils.fields import project
+from utils.versioning import get_versions
+
+# 다른 프로세스의 변경 여부(테이블 버전)를 확인하는 주기 (초)
+CHECK_SECONDS = 5
+
+# 필드 조합별 인코딩 결과를 스냅샷마다 보관할 최대 개수
+MAX_PROJECTIONS = 64
+
+# 카테고리별 항목: 정렬 키(ID) 목록과 같은 순서의 원본 딕셔너리, 인코딩된 JSON 바이트 목록
+CatalogGroup = namedtuple('CatalogGroup', ['ids', 'dicts', 'items'])
+
+# 스냅샷: 버전, {카테고리: CatalogGroup}, {(카테고리, 필드 조합): CatalogGroup}
+# groups는 만든 뒤 바꾸지 않고, projections에는 필드 조합별 결과만 추가됩니다.
+CatalogSnapshot = namedtuple('CatalogSnapshot', ['version', 'groups', 'projections'])
+
+_EMPTY_GROUP = CatalogGroup((), (), ())
+
+
+def encode_json(data):
+    """
+    키를 정렬한 간결한 UTF-8 JSON 바이트로 인코딩
+
+    jsonify와 달리 한글 등 ASCII가 아닌 문자를 \\uXXXX로 바꾸지 않으므로 바이트는 jsonify 응답과 다릅니다
+    (파싱 결과는 같음).
+    """
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class CatalogCache:
+    """
+    카테고리별 카탈로그 스냅샷 캐시
+
+    Args:
+        name (str): 캐시 이름 (ETag 구분용)
+        tables (tuple): 스냅샷이 의존하는 테이블 이름
+        fields (tuple): 항목 딕셔너리의 필드 이름 (fields= 파라미터로 선택 가능한 필드)
+        loader (callable): {카테고리: [(ID, dict), ...]}를 반환하는 함수
+    """
+
+    def __init__(self, name, tables, fields, loader):
+        self.name = name
+        self.tables = tables
+        self.fields = fields
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = None
+
+    def _current_version(self):
+        # 각 테이블 버전은 증가만 하므로 합도 변경 때마다 증가함
+        return sum(version for version, _ in get_versions(self.tables).values())
+
+    def refresh(self):
+        """
+        데이터베이스에서 스냅샷을 다시 만들어 교체
+
+        버전을 먼저 읽고 데이터를 읽으므로, 그 사이에 바뀐 데이터는 다음 확인 때 다시 반영됩니다.
+
+        Returns:
+            CatalogSnapshot: 현재 스냅샷
+        """
+        version = self._current_version()
+        groups = {
+            key: CatalogGroup(
+                tuple(i for i, _ in rows),
+                tuple(d for _, d in rows),
+                tuple(encode_json(d) for _, d in rows),
+            )
+            for key, rows in self._loader().items()
+        }
+        return self.install(CatalogSnapshot(version, groups, {}))
+
+    def install(self, snapshot):
+        """버전이 현재보다 높을 때만 스냅샷 교체"""
+        with self._lock:
+            if self._snapshot is None or snapshot.version > self._snapshot.version:
+                self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def snapshot(self):
+        """
+        현재 스냅샷 조회
+
+        확인 주기가 지났을 때만 테이블 버전을 조회하고, 바뀌었으면 다시 로드합니다.
+        """
+        current = self._snapshot
+        if current is None:
+            return self.refresh()
+        if time.monotonic() - self._checked_at > CHECK_SECONDS:
+            if self._current_version() != current.version:
+                return self.refresh()
+            self._checked_at = time.monotonic()
+        return current
+
+    def group(self, key, fields=None):
+        """
+        카테고리의 항목 조회
+
+        Args:
+            key: 카테고리
+            fields (list | None): 선택한 필드 (None이거나 전체 필드면 원본 그대로)
+
+        Returns:
+            tuple: (스냅샷 버전, CatalogGroup)
+        """
+        snapshot = self.snapshot()
+        group = snapshot.groups.get(key, _EMPTY_GROUP)
+        if fields is None or tuple(fields) == self.fields:
+            return snapshot.version, group
+
+        projection_key = (key, tuple(fields))
+        projected = snapshot.projections.get(projection_key)
+        if projected is None:
+            dicts = tuple(project(d, fields) for d in group.dicts)
+            projected = CatalogGroup(group.ids, dicts, tuple(encode_json(d) for d in dicts))
+            if len(snapshot.projections) < MAX_PROJECTIONS:
+                snapshot.projections[projection_key] = projected
+        return snapshot.version, projected
+
+
+def page_range(group, after_id, limit):
+    """
+    ID 순으로 정렬된 항목에서 after_id 다음부터 limit 개의 위치 선택
+
+    Returns:
+        tuple: (시작 위치, 끝 위치, 마지막 항목 ID 또는 None(다음 페이지 없음))
+    """
+    start = bisect_right(group.ids, after_id) if after_id is not None else 0
+    end = min(start + limit, len(group.ids))
+    last_id = group.ids[end - 1] if end < len(group.ids) else None
+    return start, end, last_id
+
+
+def catalog_response(cache, version, items, cache_control):
+    """
+    인코딩된 항목으로 JSON 배열 응답 생성 (ETag / 304 처리 포함)
+
+    Args:
+        cache (CatalogCache): 카탈로그 캐시
+        version (int | str): 스냅샷 버전 (사용자별 응답은 사용자 상태를 구분하는 값을 덧붙인 문자열)
+        items (tuple): 인코딩된 JSON 항목 목록
+        cache_control (str): Cache-Control 헤더 값
+
+    Returns:
+        Response: JSON 응답 또는 304 응답
+    """
+    query = request.query_string.decode('utf-8', 'replace')
+    etag = hashlib.sha1(f'{cache.name}:{version}|{query}'.encode('utf-8')).hexdigest()[:16]
+
+    if request.if_none_match and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(b'[' + b','.join(items) + b']', mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def _load_missions():
+    # 항목은 진행 상태가 없는(시작 전) 상태로 인코딩하고, 사용자 상태는 응답할 때 합침
+    missions = Mission.query.order_by(Mission.id.asc()).all()
+    groups = {'all': []}
+    for m in missions:
+        row = (m.id, m.to_dict())
+        groups['all'].append(row)
+        groups.setdefault(m.category, []).append(row)
+    return groups
+
+
+def _load_exchange_items():
+    groups = {}
+    for item in ExchangeItemModel.query.order_by(ExchangeItemModel.id.asc()).all():
+        groups.setdefault(item.category, []).append((item.id, item.to_dict()))
+    return groups
+
+
+def _load_donate_categories():
+    cats = DonateCategoryModel.query.order_by(DonateCategoryModel.id.asc()).all()
+    return {None: [(c.id, c.to_dict()) for c in cats]}
+
+
+# 애플리케이션 전역 카탈로그
+missions = CatalogCache(
+    'missions',
+    (Mission.__tablename__,),
+    tuple(Mission.API_FIELDS) + tuple(UserMissionModel.API_FIELDS),
+    _load_missions,
+)
+exchange_items = CatalogCache(
+    'exchange_items',
+    (ExchangeItemModel.__tablename__,),
+    ('id', 'icon', 'title', 'discount', 'points', 'category'),
+    _load_exchange_items,
+)
+donate_categories = CatalogCache(
+    'donate_categories',
+    (DonateCategoryModel.__tablename__,),
+    ('id', 'icon', 'title', 'points'),
+    _load_donate_categories,
+)
@@ -0,0 +1,281 @@
+"""
+변경 이벤트 피드
+
+디바이스 토글, 강의실 선택, 미션 완료 등 쓰기 API에서 바뀐 엔티티를
+순번(seq)이 붙은 이벤트로 메모리에 기록하고, 구독자(SSE 연결)에게 전달합니다.
+
+최근 이벤트만 고정 크기 버퍼에 보관하며, 재연결한 클라이언트는 마지막으로 받은
+순번(cursor) 이후의 이벤트부터 이어서 받습니다. 버퍼에서 이미 밀려난 순번으로
+재연결하면 전체 데이터를 다시 조회하도록 'reset' 이벤트를 보냅니다.
+
+순번은 프로세스 메모리에서만 증가하므로, 클라이언트에 보내는 cursor에는 프로세스가 시작될 때마다 새로 만드는
+epoch를 붙입니다 (예: '3fa2c1d0-42'). 서버가 재시작되었거나 다른 워커 프로세스의 cursor로 재연결하면
+epoch가 달라 이어서 보낼 수 없으므로 'reset' 이벤트를 보냅니다.
+
+구독자(SSE 연결)는 새 이벤트가 올 때까지 조건 변수에서 대기하며, 그동안 요청을 처리하는 실행 단위를 계속 점유합니다.
+개발 서버나 gunicorn sync / gthread 워커에서는 구독자마다 스레드 하나를 점유하므로,
+운영 환경에서는 gunicorn.conf.py의 gevent 워커로 실행해 구독자가 스레드 대신 greenlet을 점유하게 합니다
+(psycopg2는 psycogreen으로 협력형 대기로 바꿈).
+
+이벤트 버퍼는 워커 프로세스마다 따로 있으며, PostgreSQL에서는 FeedRelay가 LISTEN / NOTIFY로
+모든 워커의 이벤트를 각 워커의 버퍼에 같은 순서로 전달합니다.
+"""
+import json
+import secrets
+import select
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from models import db
+
+# 메모리에 보관할 최근 이벤트 수
+DEFAULT_BUFFER_SIZE = 10000
+
+# 워커 사이에 이벤트를 전달하는 PostgreSQL NOTIFY 채널
+NOTIFY_CHANNEL = 'change_feed'
+
+# NOTIFY 페이로드 최대 크기 (PostgreSQL 제한 8000바이트), 넘으면 data 없이 보냄
+MAX_NOTIFY_BYTES = 7900
+
+# 알림이 없을 때 수신 연결이 살아 있는지 확인하는 간격 (초)
+RELAY_PING_SECONDS = 15.0
+
+# 수신 연결이 끊겼을 때 다시 연결하기까지 대기 시간 (초)
+RELAY_RETRY_SECONDS = 1.0
+
+
+class ChangeFeed:
+    """
+    순번이 붙은 변경 이벤트를 보관하는 메모리 버퍼
+
+    이벤트는 (seq, entity, entity_id, data) 튜플이며 seq는 1부터 1씩 증가합니다.
+    epoch는 피드마다(프로세스가 시작될 때마다) 새로 만드는 값으로, 클라이언트에 보내는 cursor에 붙습니다.
+    """
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self._events = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self.epoch = secrets.token_hex(4)
+
+    @property
+    def last_seq(self):
+        """마지막으로 발행된 이벤트 순번"""
+        return self._seq
+
+    def format_cursor(self, seq):
+        """순번을 클라이언트에 보낼 cursor 문자열로 변환 (예: '3fa2c1d0-42')"""
+        return f'{self.epoch}-{seq}'
+
+    def parse_cursor(self, raw):
+        """
+        클라이언트가 보낸 cursor 문자열을 순번으로 변환
+
+        Returns:
+            int | None: 순번, 이 피드의 epoch가 아니면 None (이어서 보낼 수 없음)
+
+        Raises:
+            ValueError: cursor 형식이 잘못된 경우
+        """
+        epoch, _, seq = raw.rpartition('-')
+        seq = int(seq)
+        if seq < 0:
+            raise ValueError('invalid cursor')
+        if epoch != self.epoch:
+            return None
+        return seq
+
+    def publish(self, entity, entity_id, data):
+        """
+        변경 이벤트 발행
+
+        Args:
+            entity (str): 엔티티 종류 (예: 'device', 'room', 'location')
+            entity_id (str | None): 엔티티 ID
+            data (dict | None): 변경된 엔티티의 현재 값
+
+        Returns:
+            int: 발행된 이벤트 순번
+        """
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, entity, entity_id, data))
+            self._cond.notify_all()
+            return self._seq
+
+    def mark_gap(self):
+        """
+        이벤트를 놓쳤을 수 있는 구간 표시
+
+        순번을 하나 건너뛰고 버퍼를 비우므로, 이전 cursor로 이어서 받던 구독자는 모두 'reset'을 받습니다.
+        """
+        with self._cond:
+            self._seq += 1
+            self._events.clear()
+            self._cond.notify_all()
+
+    def since(self, cursor):
+        """
+        cursor 이후의 이벤트 목록 조회
+
+        Args:
+            cursor (int | None): 마지막으로 받은 이벤트 순번 (None이면 알 수 없는 cursor)
+
+        Returns:
+            list | None: 이벤트 목록, 버퍼에서 밀려난 이벤트가 있거나 이 피드에서 발행되지 않은 순번이면 None
+        """
+        with self._cond:
+            if cursor is None or cursor > self._seq:
+                return None
+            if cursor == self._seq:
+                return []
+            if not self._events:
+                return None
+            first_seq = self._events[0][0]
+            if cursor < first_seq - 1:
+                return None
+            return list(islice(self._events, cursor - first_seq + 1, None))
+
+    def wait(self, cursor, timeout):
+        """
+        cursor 이후 새 이벤트가 발행될 때까지 대기
+
+        Args:
+            cursor (int): 마지막으로 받은 이벤트 순번
+            timeout (float): 최대 대기 시간 (초)
+
+        Returns:
+            bool: 새 이벤트가 있으면 True
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._seq > cursor, timeout)
+
+
+class FeedRelay:
+    """
+    워커 프로세스 사이의 변경 이벤트 전달 (PostgreSQL LISTEN / NOTIFY)
+
+    PostgreSQL에서는 발행한 이벤트를 로컬 피드에 바로 넣지 않고 NOTIFY로 보내며,
+    프로세스마다 수신 스레드가 같은 채널을 LISTEN하다가 받은 순서대로 로컬 피드에 발행합니다.
+    따라서 어느 워커가 처리한 쓰기든 모든 워커의 구독자에게 전달됩니다.
+    수신 연결을 (다시) 맺을 때는 그 전의 이벤트를 놓쳤을 수 있으므로 피드에 공백을 표시합니다.
+
+    그 밖의 데이터베이스(SQLite 등)에서는 로컬 피드에만 발행합니다 (단일 프로세스 개발 서버용).
+    init_app()으로 애플리케이션에 연결하면 각 프로세스의 첫 요청에서 수신 스레드를 시작합니다.
+    """
+
+    def __init__(self, feed):
+        self._feed = feed
+        self._app = None
+        self._lock = threading.Lock()
+        self._started = False
+        self.enabled = False
+
+    def init_app(self, app):
+        self._app = app
+        url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        self.enabled = url.get_backend_name() == 'postgresql'
+        if self.enabled:
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            thread = threading.Thread(target=self._run, name='change-feed-relay', daemon=True)
+            thread.start()
+            self._started = True
+
+    @staticmethod
+    def _encode(entity, entity_id, data):
+        payload = json.dumps([entity, entity_id, data], ensure_ascii=False, separators=(',', ':'))
+        if len(payload.encode('utf-8')) > MAX_NOTIFY_BYTES:
+            # 너무 큰 이벤트는 바뀐 엔티티만 알리고, 클라이언트가 다시 조회
+            payload = json.dumps([entity, entity_id, None], ensure_ascii=False, separators=(',', ':'))
+        return payload
+
+    def send(self, events):
+        """
+        이벤트를 모든 워커에 전달 (NOTIFY 한 번의 왕복)
+
+        Args:
+            events (list): [(entity, entity_id, data), ...]
+        """
+        payloads = [self._encode(*event) for event in events]
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(
+                text('SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload'),
+                {'channel': NOTIFY_CHANNEL, 'payloads': payloads},
+            )
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:  # 스레드가 멈추지 않도록 잠시 후 다시 연결
+                self._app.logger.exception('변경 피드 수신 실패')
+            time.sleep(RELAY_RETRY_SECONDS)
+
+    def _listen(self):
+        with self._app.app_context():
+            raw = db.engine.raw_connection()
+        # LISTEN 상태의 연결은 풀에 돌려주지 않음
+        raw.detach()
+        try:
+            connection = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+            self._feed.mark_gap()
+            while True:
+                if select.select([connection], [], [], RELAY_PING_SECONDS) == ([], [], []):
+                    # 끊긴 연결이면 예외가 발생해 다시 연결함
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    entity, entity_id, data = json.loads(connection.notifies.pop(0).payload)
+                    self._feed.publish(entity, entity_id, data)
+        finally:
+            raw.close()
+
+
+# 애플리케이션 전역 피드
+feed = ChangeFeed()
+
+# 워커 사이의 이벤트 전달 (app.py에서 init_app으로 연결)
+relay = FeedRelay(feed)
+
+
+def publish(entity, entity_id, data):
+    """변경 이벤트 발행 (커밋 이후에 호출)"""
+    publish_many([(entity, entity_id, data)])
+
+
+def publish_many(events):
+    """
+    여러 변경 이벤트를 순서대로 발행 (커밋 이후에 호출)
+
+    Args:
+        events (list): [(entity, entity_id, data), ...]
+    """
+    if not events:
+        return
+    if not relay.enabled:
+        for entity, entity_id, data in events:
+            feed.publish(entity, entity_id, data)
+        return
+    try:
+        relay.send(events)
+    except Exception:
+        # 변경은 이미 커밋되었으므로 요청은 실패시키지 않음 (구독자는 다음 조회에서 최신 값을 받음)
+        current_app.logger.exception('변경 이벤트 발행 실패')
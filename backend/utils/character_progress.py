@@ -0,0 +1,231 @@
+"""
+캐릭터 레벨 / 진행률 관리 유틸리티
+
+사용자별 캐릭터 진행 행(character_progress)은 누적 완료 미션 수를 기준으로
+레벨, 진행률, 다음 레벨까지 남은 미션 수를 미리 계산해 저장해 둔 값입니다.
+미션 완료 이벤트마다 누적 미션 수를 1 증가시키고 파생 값을 함께 갱신하므로,
+조회 API는 user_id 인덱스로 한 행만 읽으면 됩니다.
+
+레벨 규칙이 바뀌면 저장된 누적 미션 수로 모든 사용자의 파생 값을 다시 계산합니다.
+사용자 ID 순으로 작은 배치마다 커밋하므로 오래 잠금을 잡지 않습니다.
+
+사용법:
+  python -m utils.character_progress check     # 규칙과 다른 사용자 수 확인
+  python -m utils.character_progress rebuild   # 모든 사용자의 레벨 다시 계산
+"""
+import sys
+
+from sqlalchemy import bindparam, case, func, select, update
+
+from models import db, CharacterProgressModel, User
+from utils.sql import dialect_insert
+
+# 레벨 L에서 L+1로 오르는 데 필요한 미션 수 = LEVEL_STEP * L
+LEVEL_STEP = 10
+
+# 다시 계산할 때 한 번에 처리하는 사용자 수
+REBUILD_BATCH_SIZE = 500
+
+
+def level_state(completed_missions):
+    """
+    누적 완료 미션 수로 레벨 상태 계산
+
+    Args:
+        completed_missions (int): 누적 완료 미션 수
+
+    Returns:
+        dict: current_level, next_level, progress(0~100), missions_to_next_level
+    """
+    level = 1
+    remaining = completed_missions
+    while remaining >= LEVEL_STEP * level:
+        remaining -= LEVEL_STEP * level
+        level += 1
+    needed = LEVEL_STEP * level
+    return {
+        'current_level': level,
+        'next_level': level + 1,
+        'progress': round(remaining * 100 / needed, 1),
+        'missions_to_next_level': needed - remaining,
+    }
+
+
+def get_progress(user_id):
+    """
+    사용자의 캐릭터 진행 행 조회 (없으면 레벨 1 상태로 생성)
+
+    Args:
+        user_id (int): 사용자 ID
+
+    Returns:
+        CharacterProgressModel: 캐릭터 진행 행
+    """
+    cp = CharacterProgressModel.query.filter_by(user_id=user_id).first()
+    if not cp:
+        cp = CharacterProgressModel(user_id=user_id, completed_missions=0, **level_state(0))
+        db.session.add(cp)
+    return cp
+
+
+def record_mission_completion(user_id, count=1):
+    """
+    미션 완료 이벤트를 캐릭터 진행 행에 반영
+
+    누적 미션 수는 INSERT ... ON CONFLICT DO UPDATE SET completed_missions = completed_missions + :count
+    한 문장으로 (진행 행이 없으면 만들면서) 증가시키고,
+    반환된 값으로 계산한 파생 값은 누적 미션 수가 그대로일 때만 기록합니다.
+    동시에 완료한 요청이 있으면 더 나중의 누적 값을 본 요청의 파생 값이 남습니다.
+    레벨이 오르면 사용자 레벨(users.level)도 함께 갱신합니다. 커밋은 호출한 쪽에서 합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        count (int): 완료한 미션 수
+
+    Returns:
+        tuple: (갱신된 레벨 상태 dict, 레벨이 올랐는지 여부)
+    """
+    table = CharacterProgressModel.__table__
+
+    # 진행 행이 없으면 레벨 1 상태로 만들고 (파생 값은 아래에서 기록), 있으면 누적 미션 수만 증가
+    stmt = dialect_insert(table).values(user_id=user_id, completed_missions=count, **level_state(0))
+    completed, previous_level = db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={'completed_missions': table.c.completed_missions + stmt.excluded.completed_missions},
+        )
+        .returning(table.c.completed_missions, table.c.current_level)
+    ).one()
+
+    state = level_state(completed)
+    db.session.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.completed_missions == completed)
+        .values(**state)
+    )
+
+    leveled_up = state['current_level'] > previous_level
+    if leveled_up:
+        db.session.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id == user_id)
+            .values(level=state['current_level'])
+        )
+    return state, leveled_up
+
+
+def _progress_batch(after_user_id, batch_size):
+    """user_id 순으로 다음 배치의 (user_id, 누적 미션 수, 저장된 레벨 상태) 조회"""
+    table = CharacterProgressModel.__table__
+    query = select(
+        table.c.user_id,
+        table.c.completed_missions,
+        table.c.current_level,
+        table.c.next_level,
+        table.c.progress,
+        table.c.missions_to_next_level,
+    ).where(table.c.user_id.is_not(None))
+    if after_user_id is not None:
+        query = query.where(table.c.user_id > after_user_id)
+    return db.session.execute(query.order_by(table.c.user_id).limit(batch_size)).all()
+
+
+def _is_stale(row):
+    state = level_state(row.completed_missions or 0)
+    return (
+        row.current_level != state['current_level']
+        or row.next_level != state['next_level']
+        or row.progress != state['progress']
+        or row.missions_to_next_level != state['missions_to_next_level']
+    )
+
+
+def check_levels(batch_size=REBUILD_BATCH_SIZE):
+    """
+    현재 레벨 규칙과 저장된 값이 다른 사용자 수 확인
+
+    Returns:
+        dict: 검사한 사용자 수와 값이 다른 사용자 수
+    """
+    checked = stale = 0
+    after = None
+    while True:
+        rows = _progress_batch(after, batch_size)
+        if not rows:
+            break
+        checked += len(rows)
+        stale += sum(1 for row in rows if _is_stale(row))
+        after = rows[-1].user_id
+    return {'checked': checked, 'stale': stale}
+
+
+def rebuild_levels(batch_size=REBUILD_BATCH_SIZE):
+    """
+    모든 사용자의 레벨 상태를 현재 규칙으로 다시 계산
+
+    user_id 순으로 batch_size명씩 읽고, 값이 다른 행만 한 번의 UPDATE ... RETURNING으로 고친 뒤 배치마다 커밋합니다.
+    그 사이 미션을 완료한 사용자는 누적 미션 수가 달라 갱신 조건에서 제외되며,
+    해당 완료 이벤트가 이미 새 규칙으로 계산한 값을 기록합니다.
+    사용자 레벨(users.level)은 진행 행이 실제로 갱신된 사용자만 고치므로 더 새로운 레벨을 덮어쓰지 않습니다.
+
+    Returns:
+        dict: 검사한 사용자 수와 다시 계산한 사용자 수
+    """
+    table = CharacterProgressModel.__table__
+    users = User.__table__
+    checked = rebuilt = 0
+    after = None
+    while True:
+        rows = _progress_batch(after, batch_size)
+        if not rows:
+            break
+        checked += len(rows)
+        after = rows[-1].user_id
+
+        completed = {row.user_id: row.completed_missions or 0 for row in rows if _is_stale(row)}
+        if completed:
+            states = {user_id: level_state(count) for user_id, count in completed.items()}
+            changed = db.session.execute(
+                update(table)
+                .where(
+                    table.c.user_id.in_(completed),
+                    func.coalesce(table.c.completed_missions, 0) == case(completed, value=table.c.user_id),
+                )
+                .values(**{
+                    k: case({user_id: state[k] for user_id, state in states.items()}, value=table.c.user_id)
+                    for k in level_state(0)
+                })
+                .returning(table.c.user_id, table.c.current_level)
+            ).all()
+            if changed:
+                db.session.execute(
+                    update(users)
+                    .where(users.c.id == bindparam('b_user_id'))
+                    .values(level=bindparam('b_level')),
+                    [{'b_user_id': user_id, 'b_level': level} for user_id, level in changed],
+                )
+            rebuilt += len(changed)
+        db.session.commit()
+    return {'checked': checked, 'rebuilt': rebuilt}
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else 'check'
+    with app.app_context():
+        if command == 'check':
+            result = check_levels()
+            print(f"검사한 사용자 수: {result['checked']}")
+            print(f"규칙과 다른 사용자 수: {result['stale']}")
+        elif command == 'rebuild':
+            result = rebuild_levels()
+            print(f"검사한 사용자 수: {result['checked']}")
+            print(f"다시 계산한 사용자 수: {result['rebuilt']}")
+        else:
+            print(f"❌ 알 수 없는 명령어: {command}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+현재 사용자 식별 유틸리티
+
+인증 기능이 붙기 전까지는 X-User-Id 헤더로 사용자를 구분합니다.
+헤더가 없거나 형식이 잘못된 경우에는 첫 번째 사용자(시드 데이터 사용자)를 현재 사용자로 봅니다.
+헤더의 사용자가 존재하지 않으면 현재 사용자가 없는 것으로 보며, 사용자별 API는 user_required로 404를 반환합니다.
+"""
+from functools import wraps
+
+from flask import g, jsonify, request
+from sqlalchemy import select
+
+from models import db, User
+
+
+def get_current_user_id():
+    """
+    현재 요청의 사용자 ID 조회
+
+    같은 요청 안에서는 한 번만 계산하여 flask.g에 보관합니다.
+
+    Returns:
+        int | None: 사용자 ID (헤더의 사용자가 존재하지 않거나 사용자가 하나도 없으면 None)
+    """
+    if 'current_user_id' in g:
+        return g.current_user_id
+
+    user_id = None
+    raw = request.headers.get('X-User-Id')
+    if raw:
+        try:
+            user_id = int(raw)
+        except ValueError:
+            user_id = None
+        else:
+            if db.session.get(User, user_id) is None:
+                g.current_user_id = None
+                return None
+    if user_id is None:
+        user_id = db.session.execute(
+            select(User.id).order_by(User.id.asc()).limit(1)
+        ).scalar()
+
+    g.current_user_id = user_id
+    return user_id
+
+
+def user_required(view):
+    """
+    현재 사용자가 없으면 404를 반환하는 데코레이터
+
+    존재하지 않는 사용자 ID로 포인트, 미션, 강의실 선택 등의 행이 만들어지지 않도록
+    사용자별 API에 붙입니다. @idempotent보다 먼저(위에) 적용합니다.
+
+    Example:
+        @points_bp.route('/api/points/donate', methods=['POST'])
+        @user_required
+        @idempotent
+        def donate_points():
+            ...
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if get_current_user_id() is None:
+            return jsonify({'error': 'User not found'}), 404
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,177 @@
+"""
+교환 코드(바우처 / 기프티콘) 재고 유틸리티
+
+교환 아이템마다 미리 만들어 둔 코드를 exchange_codes에 재고로 보관하고, 교환할 때 하나씩 발급합니다.
+발급은 다음 한 문장으로 처리합니다.
+
+    UPDATE exchange_codes SET user_id = :user, claimed_at = :now
+    WHERE id = (SELECT id FROM exchange_codes
+                WHERE item_id = :item AND user_id IS NULL
+                ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED)
+    RETURNING code
+
+PostgreSQL에서는 다른 요청이 잠근 코드를 기다리지 않고 건너뛰므로, 인기 아이템에 요청이 몰려도
+동시에 들어온 교환이 서로 다른 코드를 바로 가져갑니다.
+SQLite는 FOR UPDATE를 지원하지 않아 잠금 절 없이 같은 문장을 실행하며, 쓰기가 한 번에 하나씩 처리되므로
+같은 코드가 두 번 발급되지 않습니다.
+
+사용법:
+  python -m utils.exchange_codes load 1 codes.txt     # 아이템 1에 파일의 코드 등록 (한 줄에 하나, '-'면 표준 입력)
+  python -m utils.exchange_codes generate 1 1000      # 아이템 1에 무작위 코드 1000개 생성
+  python -m utils.exchange_codes stock                # 아이템별 남은 코드 수
+"""
+import secrets
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, text, update
+
+from models import db, ExchangeCodeModel, EXCHANGE_CODE_AVAILABLE_WHERE
+from utils.sql import dialect_insert
+
+# 한 번의 INSERT로 등록하는 코드 수
+LOAD_BATCH_SIZE = 1000
+
+# 무작위 코드에 쓰는 문자 (헷갈리기 쉬운 0/O, 1/I 제외)
+CODE_ALPHABET = '23456789ABCDEFGHJKLMNPQRSTUVWXYZ'
+CODE_GROUPS = 3
+CODE_GROUP_LENGTH = 4
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def claim_code(item_id, user_id):
+    """
+    아이템의 코드 하나를 사용자에게 발급 (커밋은 호출한 쪽에서 함)
+
+    Args:
+        item_id (int): 교환 아이템 ID
+        user_id (int): 사용자 ID
+
+    Returns:
+        str | None: 발급된 코드, 재고가 없으면 None
+    """
+    available = (
+        select(ExchangeCodeModel.id)
+        .where(ExchangeCodeModel.item_id == item_id, text(EXCHANGE_CODE_AVAILABLE_WHERE))
+        .order_by(ExchangeCodeModel.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return db.session.execute(
+        update(ExchangeCodeModel)
+        .where(ExchangeCodeModel.id == available, text(EXCHANGE_CODE_AVAILABLE_WHERE))
+        .values(user_id=user_id, claimed_at=_utcnow())
+        .returning(ExchangeCodeModel.code),
+        execution_options={'synchronize_session': False},
+    ).scalar()
+
+
+def generate_codes(count):
+    """
+    무작위 코드 생성 (예: 'K7QM-2XPA-9DWE')
+
+    Args:
+        count (int): 생성할 코드 수
+
+    Returns:
+        list: 코드 목록
+    """
+    return [
+        '-'.join(
+            ''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_GROUP_LENGTH))
+            for _ in range(CODE_GROUPS)
+        )
+        for _ in range(count)
+    ]
+
+
+def load_codes(item_id, codes, batch_size=LOAD_BATCH_SIZE):
+    """
+    아이템에 코드 일괄 등록
+
+    batch_size개씩 INSERT ... ON CONFLICT DO NOTHING으로 등록하고 배치마다 커밋하므로,
+    이미 등록된 코드가 섞여 있거나 같은 파일을 다시 등록해도 중복되지 않습니다.
+
+    Args:
+        item_id (int): 교환 아이템 ID
+        codes (iterable): 코드 목록 (빈 문자열은 건너뜀)
+        batch_size (int): 한 번에 등록하는 코드 수
+
+    Returns:
+        int: 새로 등록한 코드 수
+    """
+    loaded = 0
+    batch = []
+
+    def flush():
+        now = _utcnow()
+        rows = [{'item_id': item_id, 'code': code, 'created_at': now} for code in batch]
+        inserted = db.session.execute(
+            dialect_insert(ExchangeCodeModel.__table__)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=['code'])
+            .returning(ExchangeCodeModel.id)
+        ).all()
+        db.session.commit()
+        batch.clear()
+        return len(inserted)
+
+    for code in codes:
+        code = code.strip()
+        if not code:
+            continue
+        batch.append(code)
+        if len(batch) >= batch_size:
+            loaded += flush()
+    if batch:
+        loaded += flush()
+    return loaded
+
+
+def stock_counts():
+    """
+    아이템별 남은 코드 수
+
+    Returns:
+        dict: {아이템 ID: 남은 코드 수} (재고가 있는 아이템만)
+    """
+    rows = db.session.execute(
+        select(ExchangeCodeModel.item_id, func.count())
+        .where(text(EXCHANGE_CODE_AVAILABLE_WHERE))
+        .group_by(ExchangeCodeModel.item_id)
+    ).all()
+    return dict(rows)
+
+
+def _read_lines(path):
+    if path == '-':
+        return sys.stdin.read().splitlines()
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else 'stock'
+    with app.app_context():
+        if command == 'load' and len(sys.argv) > 3:
+            item_id = int(sys.argv[2])
+            print(f"등록한 코드 수: {load_codes(item_id, _read_lines(sys.argv[3]))}")
+        elif command == 'generate' and len(sys.argv) > 3:
+            item_id = int(sys.argv[2])
+            print(f"등록한 코드 수: {load_codes(item_id, generate_codes(int(sys.argv[3])))}")
+        elif command == 'stock':
+            for item_id, count in sorted(stock_counts().items()):
+                print(f"아이템 {item_id}: {count}개")
+        else:
+            print(f"❌ 알 수 없는 명령어: {command}")
+
+
+if __name__ == '__main__':
+    main()
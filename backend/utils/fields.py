@@ -0,0 +1,86 @@
+"""
+필드 선택(sparse fieldsets) 유틸리티
+
+목록 / 상세 API는 fields 쿼리 파라미터로 필요한 필드만 요청할 수 있습니다.
+    GET /api/home/devices?fields=id,name,status
+
+데이터베이스에서 읽는 API는 요청된 필드의 컬럼만 SELECT 하고(load_only),
+응답도 요청된 필드만 직렬화하므로 모바일 클라이언트의 응답 크기와 서버 작업이 함께 줄어듭니다.
+"""
+from flask import request
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(available, param='fields', default=None):
+    """
+    fields 쿼리 파라미터를 읽어 요청된 필드 목록 반환
+
+    Args:
+        available (iterable): 선택할 수 있는 필드 이름
+        param (str): 쿼리 파라미터 이름
+        default (iterable | None): 파라미터가 없을 때의 필드 목록 (None이면 전체)
+
+    Returns:
+        list: 요청 순서를 유지한 필드 목록 (중복 제거)
+
+    Raises:
+        ValueError: 알 수 없는 필드가 있거나 필드가 비어 있는 경우
+    """
+    raw = request.args.get(param)
+    if raw is None:
+        return list(default if default is not None else available)
+
+    fields = []
+    for name in raw.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in available:
+            raise ValueError(f'Unknown field: {name}')
+        if name not in fields:
+            fields.append(name)
+    if not fields:
+        raise ValueError(f'Empty {param}')
+    return fields
+
+
+def load_fields(model, fields):
+    """
+    요청된 필드의 컬럼만 읽도록 하는 쿼리 옵션
+
+    기본키는 항상 함께 읽습니다.
+
+    Args:
+        model: API_FIELDS(필드 이름 → 컬럼 속성 이름)를 정의한 모델 클래스
+        fields (list): 필드 목록
+
+    Returns:
+        Load: query.options()에 전달할 옵션
+    """
+    return load_only(*[getattr(model, model.API_FIELDS[f]) for f in fields])
+
+
+def serialize(obj, fields, api_fields):
+    """
+    요청된 필드만 딕셔너리로 변환
+
+    ID는 to_dict()와 같이 문자열로 반환합니다.
+
+    Args:
+        obj: 모델 인스턴스 또는 조회 결과 행
+        fields (list): 필드 목록
+        api_fields (dict): 필드 이름 → 속성 이름
+
+    Returns:
+        dict: 요청된 필드만 담은 딕셔너리
+    """
+    data = {}
+    for field in fields:
+        value = getattr(obj, api_fields[field])
+        data[field] = str(value) if field == 'id' and value is not None else value
+    return data
+
+
+def project(data, fields):
+    """이미 만들어진 딕셔너리에서 요청된 필드만 선택"""
+    return {field: data[field] for field in fields if field in data}
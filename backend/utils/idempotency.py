@@ -0,0 +1,317 @@
+"""
+멱등성 키(Idempotency-Key) 유틸리티
+
+모바일 클라이언트는 네트워크가 불안정하면 같은 쓰기 요청을 다시 보낼 수 있습니다.
+쓰기 API에 Idempotency-Key 헤더를 보내면, 같은 키의 두 번째 요청부터는 처리하지 않고
+처음 요청의 응답(상태 코드와 본문)을 그대로 반환합니다.
+
+키 확인은 세 단계로 이루어집니다.
+1. 메모리 LRU: 최근 응답은 데이터베이스 조회 없이 바로 반환
+2. 블룸 필터: 이 프로세스에서 본 적 없는 키(대부분의 새 요청)는 조회 없이 바로 3으로 진행
+3. idempotency_keys 테이블: INSERT ... ON CONFLICT DO NOTHING으로 키를 선점한 뒤 요청을 처리
+
+키 선점은 요청의 트랜잭션 안에서 이루어지므로 요청이 커밋되면 키도 함께 커밋됩니다.
+여러 프로세스가 같은 키를 동시에 받아도 기본키 충돌로 한 요청만 처리되며,
+블룸 필터는 조회를 건너뛸지 정하는 데만 쓰므로 오탐이 있어도 결과는 달라지지 않습니다.
+
+만료된 키는 다음 명령으로 정리합니다 (cron 등으로 주기 실행):
+  python -m utils.idempotency purge
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Response, jsonify, make_response, request
+from sqlalchemy import delete, select, update
+
+from models import db, IdempotencyKey
+from utils.current_user import get_current_user_id
+from utils.sql import dialect_insert
+
+# 키를 보관하는 시간
+TTL = timedelta(hours=24)
+
+# 헤더 값 최대 길이
+MAX_KEY_LENGTH = 255
+
+# 메모리 LRU에 보관할 응답 수
+LRU_SIZE = 10000
+
+# 블룸 필터 크기 (비트 수)와 해시 함수 수: 약 100만 개 키에서 오탐률 약 1%
+BLOOM_BITS = 1 << 23
+BLOOM_HASHES = 7
+# 이 수만큼 키를 추가하면 블룸 필터를 비움 (오탐률이 계속 올라가지 않도록)
+BLOOM_CAPACITY = 1000000
+
+# 만료된 키를 한 번에 삭제하는 행 수
+PURGE_BATCH_SIZE = 5000
+
+# 응답 헤더: 보관된 응답을 반환했음을 표시
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class BloomFilter:
+    """
+    키 존재 여부를 확인하는 블룸 필터
+
+    '없음'은 확실하고 '있음'은 오탐일 수 있습니다. 키는 이미 SHA-256이므로 그 바이트를 나눠 해시로 씁니다.
+    """
+
+    def __init__(self, bits=BLOOM_BITS, hashes=BLOOM_HASHES, capacity=BLOOM_CAPACITY):
+        self._bits = bits
+        self._hashes = hashes
+        self._capacity = capacity
+        self._array = bytearray(bits // 8)
+        self._count = 0
+
+    def _positions(self, digest):
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return [(h1 + i * h2) % self._bits for i in range(self._hashes)]
+
+    def add(self, digest):
+        if self._count >= self._capacity:
+            self._array = bytearray(self._bits // 8)
+            self._count = 0
+        for p in self._positions(digest):
+            self._array[p >> 3] |= 1 << (p & 7)
+        self._count += 1
+
+    def __contains__(self, digest):
+        return all(self._array[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+
+class IdempotencyStore:
+    """
+    멱등성 키 저장소 (메모리 LRU + 블룸 필터 + 데이터베이스)
+
+    LRU에는 응답이 확정된 키만 (요청 해시, 상태 코드, 본문, 만료 시각)으로 보관합니다.
+    """
+
+    def __init__(self, lru_size=LRU_SIZE):
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._lru_size = lru_size
+        self._bloom = BloomFilter()
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self._lru_size:
+                self._lru.popitem(last=False)
+            self._bloom.add(bytes.fromhex(key))
+
+    def cached(self, key, now):
+        """LRU에서 만료되지 않은 응답 조회 (없으면 None)"""
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= now:
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return entry
+
+    def maybe_seen(self, key):
+        """이 프로세스에서 본 적이 있을 수 있는 키인지 (False면 확실히 처음)"""
+        with self._lock:
+            return bytes.fromhex(key) in self._bloom
+
+    def load(self, key, now):
+        """데이터베이스에서 만료되지 않은 키 조회 (없으면 None)"""
+        return db.session.execute(
+            select(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at > now)
+        ).scalar_one_or_none()
+
+    def claim(self, key, request_hash, now):
+        """
+        키 선점 (현재 트랜잭션 안에서, 커밋은 요청 처리가 끝난 뒤)
+
+        만료된 행이 남아 있으면 새 요청으로 덮어씁니다.
+
+        Returns:
+            bool: 선점했으면 True, 이미 다른 요청이 사용 중이면 False
+        """
+        with self._lock:
+            self._bloom.add(bytes.fromhex(key))
+        values = {
+            'key': key,
+            'request_hash': request_hash,
+            'status_code': None,
+            'body': None,
+            'created_at': now,
+            'expires_at': now + TTL,
+        }
+        claimed = db.session.execute(
+            dialect_insert(IdempotencyKey.__table__)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=['key'])
+            .returning(IdempotencyKey.key)
+        ).first()
+        if claimed:
+            return True
+        return bool(db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+            .values(**values),
+            execution_options={'synchronize_session': False},
+        ).rowcount)
+
+    def save(self, key, request_hash, status_code, body, now):
+        """
+        응답 저장 후 커밋
+
+        요청 처리 중 롤백되어 선점 행이 사라졌으면 다시 만듭니다.
+        """
+        expires_at = now + TTL
+        stmt = dialect_insert(IdempotencyKey.__table__).values(
+            key=key,
+            request_hash=request_hash,
+            status_code=status_code,
+            body=body,
+            created_at=now,
+            expires_at=expires_at,
+        )
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'status_code': status_code, 'body': body},
+        ))
+        db.session.commit()
+        self._remember(key, (request_hash, status_code, body, expires_at))
+
+    def release(self, key):
+        """처리에 실패한 요청의 선점 해제 (다시 시도할 수 있도록)"""
+        db.session.rollback()
+        db.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+            )
+        )
+        db.session.commit()
+
+
+# 애플리케이션 전역 저장소
+store = IdempotencyStore()
+
+
+def _scoped_key(raw_key):
+    """사용자와 엔드포인트 범위를 포함한 키 (SHA-256 16진수)"""
+    scope = f'{get_current_user_id()}\n{request.method} {request.path}\n{raw_key}'
+    return hashlib.sha256(scope.encode('utf-8')).hexdigest()
+
+
+def _replay(request_hash, stored_hash, status_code, body):
+    """보관된 응답 반환 (다른 요청 본문에 같은 키를 쓴 경우 422)"""
+    if stored_hash != request_hash:
+        return jsonify({'error': 'Idempotency-Key was used with a different request'}), 422
+    if status_code is None:
+        return jsonify({'error': 'A request with this Idempotency-Key is in progress'}), 409
+    response = Response(body, status=status_code, mimetype='application/json')
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(view):
+    """
+    Idempotency-Key 헤더를 처리하는 데코레이터
+
+    헤더가 없으면 그대로 처리합니다. 500 미만의 응답은 보관하고,
+    500 이상의 응답이나 예외는 보관하지 않고 선점을 해제하므로 같은 키로 다시 시도할 수 있습니다.
+
+    Example:
+        @points_bp.route('/api/points/donate', methods=['POST'])
+        @idempotent
+        def donate_points():
+            ...
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        raw_key = request.headers.get('Idempotency-Key')
+        if raw_key is None:
+            return view(*args, **kwargs)
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            return jsonify({'error': 'Invalid Idempotency-Key'}), 400
+
+        key = _scoped_key(raw_key)
+        request_hash = hashlib.sha256(request.get_data()).hexdigest()
+        now = _utcnow()
+
+        # 1. 메모리 LRU
+        entry = store.cached(key, now)
+        if entry is not None:
+            return _replay(request_hash, *entry[:3])
+
+        # 2. 블룸 필터가 '본 적 있음'이면 먼저 조회 (새 키는 조회 없이 바로 선점)
+        if store.maybe_seen(key):
+            row = store.load(key, now)
+            if row is not None:
+                return _replay(request_hash, row.request_hash, row.status_code, row.body)
+
+        # 3. 선점 (다른 프로세스가 먼저 선점했으면 그 응답 반환)
+        if not store.claim(key, request_hash, now):
+            row = store.load(key, now)
+            db.session.rollback()
+            if row is None:
+                return jsonify({'error': 'A request with this Idempotency-Key is in progress'}), 409
+            return _replay(request_hash, row.request_hash, row.status_code, row.body)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            store.release(key)
+            raise
+        if response.status_code >= 500:
+            store.release(key)
+            return response
+        store.save(key, request_hash, response.status_code, response.get_data(as_text=True), now)
+        return response
+    return wrapper
+
+
+def purge_expired(batch_size=PURGE_BATCH_SIZE):
+    """
+    만료된 키 삭제
+
+    expires_at 인덱스로 만료된 키를 batch_size개씩 삭제하고 배치마다 커밋합니다.
+
+    Returns:
+        int: 삭제한 키 수
+    """
+    total = 0
+    now = _utcnow()
+    while True:
+        keys = db.session.execute(
+            select(IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= now)
+            .limit(batch_size)
+        ).scalars().all()
+        if not keys:
+            return total
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.key.in_(keys)))
+        db.session.commit()
+        total += len(keys)
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else 'purge'
+    with app.app_context():
+        if command == 'purge':
+            print(f"삭제한 만료 키 수: {purge_expired()}")
+        else:
+            print(f"❌ 알 수 없는 명령어: {command}")
+
+
+if __name__ == '__main__':
+    main()
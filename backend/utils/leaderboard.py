@@ -0,0 +1,701 @@
+"""
+실시간 포인트 리더보드
+
+사용자별 현재 포인트를 프로세스 메모리의 순위 인덱스(indexable skip list)에 (포인트 내림차순, 사용자 ID) 순서로 보관합니다.
+각 노드가 다음 노드까지 건너뛰는 항목 수(width)를 함께 가지므로 다음 연산이 모두 O(log n)입니다.
+- 포인트 변경 (삭제 후 삽입)
+- 사용자의 정확한 순위 (나보다 포인트가 많은 사용자 수 + 1, 동점은 같은 순위)
+- 상위 N명, 내 주변 순위 (시작 위치를 O(log n)에 찾은 뒤 N개만 순회)
+
+포인트 변경은 두 경로로 반영합니다.
+1. 같은 프로세스의 쓰기: utils.ledger가 갱신한 현재 포인트를 세션에 기록해 두고, 커밋 직후 바로 반영
+2. 다른 워커 프로세스의 쓰기: 백그라운드 스레드가 SYNC_SECONDS마다 새 원장 기록의 사용자만 골라
+   point_balances에서 현재 포인트를 다시 읽어 반영
+두 경로 모두 변경량이 아닌 현재 값을 덮어쓰므로 같은 변경을 여러 번 반영해도 결과가 같습니다.
+
+기간별(일간 / 주간 / 월간) 순위는 사용자별 일별 적립 포인트를 날짜 링에 두고 최근 N일의 합을 별도의 순위표로 유지합니다.
+학과별 포인트 합계 / 평균도 사용자 포인트나 학과가 바뀔 때 변경분만 반영해 별도의 순위표로 정렬해 둡니다.
+
+프로세스가 시작되면 첫 요청 때 모든 사용자의 현재 포인트와 학과를 한 번 읽어 인덱스를 O(n)에 다시 만듭니다.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, event, func, select
+from sqlalchemy.orm import Session
+
+from models import db, PointBalance, PointDailyBucket, PointLedgerEntry, User
+from utils.ledger import BALANCE_CHANGES_KEY, EARN, EARNING_CHANGES_KEY
+from utils.versioning import get_versions
+
+# 다른 프로세스의 포인트 변경을 확인하는 주기 (초)
+SYNC_SECONDS = 1.0
+
+# 한 번에 확인하는 원장 기록 수
+SYNC_BATCH_SIZE = 10000
+
+# 아직 커밋되지 않은 앞 ID 기록을 놓치지 않도록, 이 시간 안의 기록은 다음 확인 때 다시 확인
+SYNC_LAG = timedelta(seconds=5)
+
+# 스킵 리스트 최대 높이 (약 1600만 명까지 O(log n) 유지)
+MAX_LEVELS = 24
+
+# 기간별 순위: 기간마다 합산하는 최근 일 수 (오늘 포함, UTC 날짜 기준)
+PERIOD_DAYS = {
+    'daily': 1,
+    'weekly': 7,
+    'monthly': 30,
+}
+
+# 일별 버킷 링 크기 (가장 긴 기간의 일 수)
+RING_DAYS = max(PERIOD_DAYS.values())
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class _Tail:
+    """모든 키보다 큰 값 (스킵 리스트의 끝)"""
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+    def __ge__(self, other):
+        return True
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+_TAIL = _Node(_Tail(), 0)
+
+
+class RankIndex:
+    """
+    순서 통계를 지원하는 스킵 리스트 (indexable skip list)
+
+    width[level]은 해당 레벨에서 다음 노드까지의 위치 차이이며,
+    탐색하며 지나온 width를 더하면 키의 위치(앞에 있는 키 수)가 됩니다.
+    """
+
+    def __init__(self, keys=()):
+        self.build(keys)
+
+    def __len__(self):
+        return self._size
+
+    def build(self, keys):
+        """정렬된 키 목록으로 O(n)에 다시 만들기"""
+        self._head = _Node(None, MAX_LEVELS)
+        self._head.next = [_TAIL] * MAX_LEVELS
+        last = [(self._head, 0)] * MAX_LEVELS
+        position = 0
+        for position, key in enumerate(keys, 1):
+            node = _Node(key, self._random_levels())
+            for level in range(len(node.next)):
+                prev, prev_position = last[level]
+                prev.next[level] = node
+                prev.width[level] = position - prev_position
+                last[level] = (node, position)
+        for level, (prev, prev_position) in enumerate(last):
+            prev.next[level] = _TAIL
+            prev.width[level] = position + 1 - prev_position
+        self._size = position
+
+    @staticmethod
+    def _random_levels():
+        levels = 1
+        while levels < MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+        return levels
+
+    def insert(self, key):
+        chain = [None] * MAX_LEVELS
+        steps = [0] * MAX_LEVELS
+        node = self._head
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.next[level].key <= key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        new = _Node(key, self._random_levels())
+        walked = 0
+        for level in range(len(new.next)):
+            prev = chain[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - walked
+            prev.width[level] = walked + 1
+            walked += steps[level]
+        for level in range(len(new.next), MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain = [None] * MAX_LEVELS
+        node = self._head
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        if target is _TAIL or target.key != key:
+            raise KeyError(key)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def count_less(self, key):
+        """key보다 작은 키의 수"""
+        position = 0
+        node = self._head
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def slice(self, start, count):
+        """start 위치(0부터)부터 최대 count개의 키"""
+        if start < 0 or start >= self._size or count <= 0:
+            return []
+        remaining = start + 1
+        node = self._head
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        keys = []
+        while node is not _TAIL and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Leaderboard:
+    """
+    점수 순위표
+
+    점수가 높은 순으로 정렬하고, 점수가 같으면 ID가 작은 항목이 앞에 옵니다.
+    순위는 동점이면 같은 순위를 받습니다 (예: 1, 2, 2, 4).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scores = {}
+        self._index = RankIndex()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def rebuild(self, scores):
+        """
+        {ID: 점수}로 전체 다시 만들기
+
+        Args:
+            scores (dict): {ID: 점수}
+        """
+        keys = sorted((-score, member) for member, score in scores.items())
+        with self._lock:
+            self._scores = dict(scores)
+            self._index.build(keys)
+
+    def scores(self):
+        """{ID: 점수} 복사본"""
+        with self._lock:
+            return dict(self._scores)
+
+    def set(self, member, score):
+        """점수 설정 (없으면 추가)"""
+        with self._lock:
+            old = self._scores.get(member)
+            if old == score:
+                return
+            if old is not None:
+                self._index.remove((-old, member))
+            self._scores[member] = score
+            self._index.insert((-score, member))
+
+    def discard(self, member):
+        """항목 제거"""
+        with self._lock:
+            old = self._scores.pop(member, None)
+            if old is not None:
+                self._index.remove((-old, member))
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def rank(self, member):
+        """
+        순위 조회
+
+        Returns:
+            int | None: 순위 (1부터), 없는 항목이면 None
+        """
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            return self._index.count_less((-score,)) + 1
+
+    def _entries(self, start, count):
+        """start 위치부터 (순위, ID, 점수) 목록 (잠금 안에서 호출)"""
+        entries = []
+        rank = None
+        previous = None
+        for position, (negative, member) in enumerate(self._index.slice(start, count), start):
+            if rank is None:
+                rank = self._index.count_less((negative,)) + 1
+            elif negative != previous:
+                rank = position + 1
+            previous = negative
+            entries.append((rank, member, -negative))
+        return entries
+
+    def top(self, count, offset=0):
+        """
+        상위 항목 조회
+
+        Returns:
+            list: [(순위, ID, 점수), ...]
+        """
+        with self._lock:
+            return self._entries(offset, count)
+
+    def around(self, member, window):
+        """
+        항목 주변 조회 (앞뒤로 window개씩)
+
+        Returns:
+            list: [(순위, ID, 점수), ...], 없는 항목이면 빈 목록
+        """
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return []
+            position = self._index.count_less((-score, member))
+            start = max(0, position - window)
+            return self._entries(start, position - start + window + 1)
+
+
+class PeriodLeaderboards:
+    """
+    기간별 적립 포인트 순위표 (일별 버킷 링)
+
+    RING_DAYS개의 일별 버킷 {사용자 ID: 그날 적립 포인트}을 날짜 순서대로 링에 두고
+    (날짜 d는 d.toordinal() % RING_DAYS 번째 슬롯), 기간마다 최근 N일 버킷의 합을 Leaderboard로 유지합니다.
+    - 적립: 그날 버킷 값을 바꾸고, 그 날짜를 포함하는 기간 순위표에 변경분만 더함 (O(log n))
+    - 날짜가 바뀔 때: 리더보드 동기화 스레드의 advance만 처리합니다.
+      잠금 안에서는 기간별 현재 합계와 막 빠지는 날짜의 버킷을 복사만 하고(O(n)),
+      잠금 밖에서 합계에서 만료 항목을 빼 새 순위표를 정렬해 만든 뒤(O(n log n)) 잠금 안에서 바꿔 끼웁니다.
+      새 순위표를 만드는 동안 들어온 적립은 기록해 두었다가 바꿔 끼우기 직전에 다시 반영합니다.
+    조회와 적립은 날짜 변경 처리를 기다리지 않으며, 날짜가 바뀐 뒤 새 순위표로 바뀌기 전까지
+    (SYNC_SECONDS와 순위표를 만드는 시간 정도) 기간 순위는 전날 기준으로 보입니다.
+    모든 기간이 같은 Leaderboard이므로 조회 비용은 전체 순위표와 같습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._today = _utcnow().date()
+        self._buckets = [{} for _ in range(RING_DAYS)]
+        self._boards = {period: Leaderboard() for period in PERIOD_DAYS}
+        # 날짜가 바뀐 뒤 advance 전에 들어온 오늘 이후 날짜의 적립 {(사용자 ID, 날짜): 포인트}
+        self._pending = {}
+        # advance가 새 순위표를 만드는 동안의 적립 변경 [(사용자 ID, 날짜, 변경량)], 그 밖에는 None
+        self._changes = None
+
+    @staticmethod
+    def _slot(day):
+        return day.toordinal() % RING_DAYS
+
+    @staticmethod
+    def _in_period(day, days, today):
+        return today - timedelta(days=days) < day <= today
+
+    @staticmethod
+    def _add(board, user_id, delta):
+        points = (board.score(user_id) or 0) + delta
+        if points > 0:
+            board.set(user_id, points)
+        else:
+            board.discard(user_id)
+
+    def advance(self):
+        """
+        오늘 날짜(UTC)로 옮기며 기간을 벗어난 버킷 정리 (리더보드 동기화 스레드에서만 호출)
+
+        Returns:
+            bool: 날짜가 바뀌었으면 True
+        """
+        today = _utcnow().date()
+        with self._lock:
+            previous = self._today
+            if today <= previous:
+                return False
+            passed = (today - previous).days
+            copies = {}
+            snapshot = {}
+            for period, days in PERIOD_DAYS.items():
+                if passed >= days:
+                    # 기간 전체가 지났으면 모든 항목이 만료됨
+                    snapshot[period] = ({}, [])
+                    continue
+                expired = []
+                for offset in range(passed):
+                    day = previous - timedelta(days=days - 1 - offset)
+                    if day not in copies:
+                        copies[day] = dict(self._buckets[self._slot(day)])
+                    expired.append(copies[day])
+                snapshot[period] = (self._boards[period].scores(), expired)
+            self._changes = []
+
+        boards = {}
+        for period, (scores, expired) in snapshot.items():
+            for bucket in expired:
+                for user_id, points in bucket.items():
+                    left = scores.get(user_id, 0) - points
+                    if left > 0:
+                        scores[user_id] = left
+                    else:
+                        scores.pop(user_id, None)
+            boards[period] = Leaderboard()
+            boards[period].rebuild(scores)
+
+        with self._lock:
+            changes, self._changes = self._changes, None
+            for user_id, day, delta in changes:
+                for period, days in PERIOD_DAYS.items():
+                    if self._in_period(day, days, today):
+                        self._add(boards[period], user_id, delta)
+            # RING_DAYS일 전 날짜의 슬롯을 새 날짜에 재사용
+            for offset in range(1, min(passed, RING_DAYS) + 1):
+                self._buckets[self._slot(previous + timedelta(days=offset))] = {}
+            self._today = today
+            # 이전 순위표는 잠금 밖에서 해제되도록 참조를 남겨 둠
+            boards, self._boards = self._boards, boards
+            pending, self._pending = self._pending, {}
+            for (user_id, day), points in pending.items():
+                self._set_day(user_id, day, points)
+        return True
+
+    def board(self, period):
+        """기간의 순위표 (PERIOD_DAYS의 키)"""
+        return self._boards[period]
+
+    def set_day(self, user_id, day, points):
+        """
+        사용자의 날짜별 적립 합계 설정
+
+        변경량이 아닌 그날의 합계를 덮어쓰므로 같은 값을 여러 번 반영해도 결과가 같습니다.
+        """
+        with self._lock:
+            self._set_day(user_id, day, points)
+
+    def _set_day(self, user_id, day, points):
+        """set_day 본문 (잠금 안에서 호출)"""
+        if day > self._today:
+            # 아직 날짜를 옮기기 전이면 advance에서 반영
+            self._pending[(user_id, day)] = points
+            return
+        if not self._in_period(day, RING_DAYS, self._today):
+            return
+        bucket = self._buckets[self._slot(day)]
+        delta = points - bucket.get(user_id, 0)
+        if not delta:
+            return
+        if points:
+            bucket[user_id] = points
+        else:
+            bucket.pop(user_id, None)
+        for period, days in PERIOD_DAYS.items():
+            if self._in_period(day, days, self._today):
+                self._add(self._boards[period], user_id, delta)
+        if self._changes is not None:
+            self._changes.append((user_id, day, delta))
+
+    def load(self, rows, today):
+        """
+        일별 적립 합계로 전체 다시 만들기 (동기화 스레드 시작 전에 호출)
+
+        Args:
+            rows (iterable): (사용자 ID, 날짜, 적립 포인트) 목록
+            today (date): 오늘 날짜 (UTC)
+        """
+        buckets = [{} for _ in range(RING_DAYS)]
+        totals = {period: {} for period in PERIOD_DAYS}
+        for user_id, day, points in rows:
+            if not points or not self._in_period(day, RING_DAYS, today):
+                continue
+            buckets[self._slot(day)][user_id] = points
+            for period, days in PERIOD_DAYS.items():
+                if self._in_period(day, days, today):
+                    totals[period][user_id] = totals[period].get(user_id, 0) + points
+        boards = {}
+        for period in PERIOD_DAYS:
+            boards[period] = Leaderboard()
+            boards[period].rebuild(totals[period])
+        with self._lock:
+            self._today = today
+            self._buckets = buckets
+            self._boards = boards
+            self._pending = {}
+
+
+class PointLeaderboard(Leaderboard):
+    """
+    사용자 현재 포인트 리더보드 (학과별 순위 포함)
+
+    사용자별 학과를 함께 보관하고, 사용자의 포인트나 학과가 바뀔 때마다 학과별 합계와 인원을 변경분만큼 고칩니다.
+    학과 순위는 합계 기준(department_totals)과 평균 기준(department_averages) 두 순위표로 미리 정렬해 두므로,
+    학과 랭킹 요청은 전체 사용자를 GROUP BY 하지 않고 정렬된 순위표만 읽습니다.
+
+    init_app()으로 애플리케이션에 연결하면 각 프로세스의 첫 요청에서
+    데이터베이스로 순위표를 다시 만들고 동기화 스레드를 시작합니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._app = None
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._cursor = 0
+        self._users_version = None
+        # 사용자 포인트와 학과 합계를 함께 바꾸기 위한 잠금
+        self._update_lock = threading.RLock()
+        self._departments = {}  # {사용자 ID: 학과}
+        self._department_stats = {}  # {학과: [포인트 합계, 인원]}
+        self.department_totals = Leaderboard()
+        self.department_averages = Leaderboard()
+        self.periods = PeriodLeaderboards()
+
+    def init_app(self, app):
+        self._app = app
+        app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            with self._app.app_context():
+                self.load()
+                db.session.remove()
+            thread = threading.Thread(target=self._run, name='leaderboard-sync', daemon=True)
+            thread.start()
+            self._started = True
+
+    def _add_to_department(self, department, points, members):
+        """학과 합계와 인원에 변경분을 더하고 학과 순위표 갱신 (_update_lock 안에서 호출)"""
+        stats = self._department_stats.setdefault(department, [0, 0])
+        stats[0] += points
+        stats[1] += members
+        if stats[1] <= 0:
+            del self._department_stats[department]
+            self.department_totals.discard(department)
+            self.department_averages.discard(department)
+            return
+        self.department_totals.set(department, stats[0])
+        self.department_averages.set(department, round(stats[0] / stats[1], 1))
+
+    def set(self, user_id, points):
+        """사용자 포인트 설정 (학과 합계도 변경분만큼 갱신)"""
+        with self._update_lock:
+            old = self.score(user_id)
+            if old == points:
+                return
+            super().set(user_id, points)
+            department = self._departments.get(user_id)
+            if department is not None:
+                self._add_to_department(department, points - (old or 0), 0 if old is not None else 1)
+
+    def update(self, user_id, points, department):
+        """
+        사용자 포인트와 학과를 함께 설정
+
+        학과가 바뀌면 이전 학과에서 빼고 새 학과에 더합니다.
+        """
+        with self._update_lock:
+            old = self.score(user_id)
+            old_department = self._departments.get(user_id)
+            if old == points and old_department == department:
+                return
+            if old is not None and old_department is not None:
+                self._add_to_department(old_department, -old, -1)
+            super().set(user_id, points)
+            self._departments[user_id] = department
+            self._add_to_department(department, points, 1)
+
+    def move(self, user_id, department):
+        """사용자의 학과 변경 (두 학과의 합계와 인원 갱신)"""
+        with self._update_lock:
+            self.update(user_id, self.score(user_id) or 0, department)
+
+    def department_of(self, user_id):
+        return self._departments.get(user_id)
+
+    def department_stats(self, department):
+        """
+        학과 합계와 인원
+
+        Returns:
+            tuple: (포인트 합계, 인원, 평균 포인트), 없는 학과면 (0, 0, 0)
+        """
+        total, members = self._department_stats.get(department, (0, 0))
+        return total, members, round(total / members, 1) if members else 0
+
+    def load(self):
+        """
+        모든 사용자의 현재 포인트와 학과로 순위표 다시 만들기
+
+        현재 포인트 행이 아직 없는 사용자(행이 생기기 전의 원장 기록만 있는 사용자)는 원장 합계로 계산합니다.
+        학과 합계와 기간별 합계는 이때 한 번만 계산하고, 이후에는 변경분만 반영합니다.
+
+        Returns:
+            int: 사용자 수
+        """
+        cursor = db.session.execute(select(func.max(PointLedgerEntry.id))).scalar() or 0
+        users_version = get_versions([User.__tablename__])[User.__tablename__][0]
+        departments = dict(db.session.execute(select(User.id, User.department)).all())
+        scores = dict.fromkeys(departments, 0)
+        scores.update(db.session.execute(
+            select(PointBalance.user_id, PointBalance.current_points)
+        ).all())
+        signed = case((PointLedgerEntry.kind == EARN, PointLedgerEntry.amount), else_=-PointLedgerEntry.amount)
+        scores.update(db.session.execute(
+            select(PointLedgerEntry.user_id, func.sum(signed))
+            .where(PointLedgerEntry.user_id.not_in(select(PointBalance.user_id)))
+            .group_by(PointLedgerEntry.user_id)
+        ).all())
+
+        stats = {}
+        for user_id, department in departments.items():
+            entry = stats.setdefault(department, [0, 0])
+            entry[0] += scores.get(user_id, 0)
+            entry[1] += 1
+
+        with self._update_lock:
+            self._cursor = cursor
+            self._users_version = users_version
+            self.rebuild(scores)
+            self._departments = departments
+            self._department_stats = stats
+            self.department_totals.rebuild({d: total for d, (total, _) in stats.items()})
+            self.department_averages.rebuild(
+                {d: round(total / members, 1) for d, (total, members) in stats.items()}
+            )
+        today = _utcnow().date()
+        self.periods.load(db.session.execute(
+            select(PointDailyBucket.user_id, PointDailyBucket.day, PointDailyBucket.earned_points)
+            .where(PointDailyBucket.day > today - timedelta(days=RING_DAYS), PointDailyBucket.earned_points > 0)
+        ), today)
+        return len(scores)
+
+    def _run(self):
+        while True:
+            time.sleep(SYNC_SECONDS)
+            try:
+                with self._app.app_context():
+                    self.sync()
+                    db.session.remove()
+            except Exception:  # 스레드가 멈추지 않도록 다음 주기에 다시 시도
+                self._app.logger.exception('리더보드 동기화 실패')
+
+    def sync(self):
+        """
+        다른 프로세스의 변경 반영
+
+        - 마지막 확인 이후 원장 기록이 생긴 사용자의 현재 포인트와 학과, 최근 일별 적립 합계를 다시 읽어 반영
+        - 날짜가 바뀌었으면 기간을 벗어난 일별 버킷을 빼고 기간 순위표를 새로 만들어 바꿔 끼움
+        - users 테이블 버전이 바뀌었으면(학과 변경 등) 사용자별 학과를 다시 읽어 바뀐 사용자만 옮김
+
+        Returns:
+            int: 반영한 사용자 수
+        """
+        synced = 0
+        self.periods.advance()
+        users_version = get_versions([User.__tablename__])[User.__tablename__][0]
+        if users_version != self._users_version:
+            for user_id, department in db.session.execute(select(User.id, User.department)):
+                if self._departments.get(user_id) != department:
+                    self.move(user_id, department)
+                    synced += 1
+            self._users_version = users_version
+
+        entries = db.session.execute(
+            select(PointLedgerEntry.id, PointLedgerEntry.user_id, PointLedgerEntry.created_at)
+            .where(PointLedgerEntry.id > self._cursor)
+            .order_by(PointLedgerEntry.id)
+            .limit(SYNC_BATCH_SIZE)
+        ).all()
+        if not entries:
+            return synced
+
+        # 충분히 오래된 기록까지만 커서를 옮기고, 최근 기록은 다음 확인 때 다시 읽음
+        settled = _utcnow() - SYNC_LAG
+        for entry_id, _, created_at in entries:
+            if created_at > settled:
+                break
+            self._cursor = entry_id
+
+        user_ids = {user_id for _, user_id, _ in entries}
+        rows = db.session.execute(
+            select(PointBalance.user_id, PointBalance.current_points, User.department)
+            .join(User, User.id == PointBalance.user_id)
+            .where(PointBalance.user_id.in_(user_ids))
+        ).all()
+        for user_id, points, department in rows:
+            self.update(user_id, points, department)
+
+        since = _utcnow().date() - timedelta(days=RING_DAYS)
+        for user_id, day, points in db.session.execute(
+            select(PointDailyBucket.user_id, PointDailyBucket.day, PointDailyBucket.earned_points)
+            .where(PointDailyBucket.user_id.in_(user_ids), PointDailyBucket.day > since)
+        ):
+            self.periods.set_day(user_id, day, points)
+        return synced + len(rows)
+
+
+# 애플리케이션 전역 리더보드
+board = PointLeaderboard()
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed_balances(session):
+    # utils.ledger가 이 트랜잭션에서 바꾼 현재 포인트를 커밋 직후 반영
+    changes = session.info.pop(BALANCE_CHANGES_KEY, None)
+    if changes:
+        for user_id, points in changes.items():
+            board.set(user_id, points)
+    earnings = session.info.pop(EARNING_CHANGES_KEY, None)
+    if earnings:
+        for (user_id, day), points in earnings.items():
+            board.periods.set_day(user_id, day, points)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_balances(session):
+    session.info.pop(BALANCE_CHANGES_KEY, None)
+    session.info.pop(EARNING_CHANGES_KEY, None)
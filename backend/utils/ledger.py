@@ -0,0 +1,431 @@
+"""
+포인트 원장(ledger) 유틸리티
+
+포인트 적립 / 사용 / 기부는 point_ledger에 한 건씩 추가만 하고, 잔액 행을 제자리에서 고치지 않습니다.
+현재 포인트, 사용 포인트, 기부 포인트, 이번 주 적립 포인트는 모두 원장에서 계산합니다.
+
+잔액 조회는 사용자별 스냅샷(point_snapshots) 한 행과 아직 합산되지 않은 짧은 기록(tail)만 읽으므로
+원장이 길어져도 조회 비용이 일정합니다. 압축 작업이 주기적으로 tail을 스냅샷에 합산해 tail을 짧게 유지합니다.
+
+압축은 합산하지 않은 기록(compacted가 거짓인 행)을 부분 인덱스로 찾아 스냅샷에 더하고,
+같은 트랜잭션에서 합산 표시를 합니다. ID 위치나 기록 시각으로 건너뛰지 않으므로
+ID 순서와 다르게 늦게 커밋된 기록도 다음 실행에서 빠짐없이 합산됩니다.
+잔액 조회는 스냅샷과 tail을 한 문장으로 읽어, 압축이 그 사이에 커밋되어도 같은 기록을 빠뜨리거나 두 번 세지 않습니다.
+
+기록을 추가할 때는 같은 트랜잭션에서 사용자별 일별 집계(point_daily_buckets)에도 더하므로,
+주간 차트는 원장을 읽지 않고 7개 집계 행만 읽습니다.
+
+교환 / 기부처럼 잔액 안에서만 허용되는 차감은 debit()으로 처리합니다.
+사용자별 현재 포인트 행(point_balances)에 UPDATE ... WHERE current_points >= :amount RETURNING을 실행해
+잔액 확인과 차감을 한 문장으로 하므로, 동시에 여러 요청이 들어와도 잔액보다 많이 차감되지 않습니다.
+
+사용법:
+  python -m utils.ledger compact                  # 새 기록을 스냅샷에 한 번 합산
+  python -m utils.ledger compact --interval 60    # 60초마다 반복
+"""
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, bindparam, select, text, update
+
+from models import (
+    db, PointBalance, PointDailyBucket, PointLedgerEntry, PointSnapshot, RollupCursor, User,
+    POINT_LEDGER_UNCOMPACTED_WHERE,
+)
+from utils.sql import dialect_insert
+
+# 압축 작업 이름 (rollup_cursors.name)
+CURSOR_NAME = 'point_ledger'
+
+# 한 번에 합산하는 원장 기록 수
+COMPACT_BATCH_SIZE = 50000
+
+# 합산 표시 UPDATE 한 번에 지정하는 원장 ID 수 (바인드 변수 수 제한)
+MARK_CHUNK_SIZE = 1000
+
+# 원장 기록 종류
+EARN = 'earn'
+SPEND = 'spend'
+DONATE = 'donate'
+
+# 기록 종류별로 더하는 일별 집계 컬럼
+_BUCKET_COLUMNS = {
+    EARN: 'earned_points',
+    SPEND: 'used_points',
+    DONATE: 'donated_points',
+}
+
+# 이 트랜잭션에서 바뀐 현재 포인트 {사용자 ID: 포인트}를 보관하는 세션 info 키
+# (커밋 후 utils.leaderboard가 읽어 순위표에 반영)
+BALANCE_CHANGES_KEY = 'point_balance_changes'
+
+# 이 트랜잭션에서 바뀐 일별 적립 포인트 {(사용자 ID, 날짜): 그날 적립 합계}를 보관하는 세션 info 키
+# (커밋 후 utils.leaderboard가 읽어 기간별 순위표에 반영)
+EARNING_CHANGES_KEY = 'point_earning_changes'
+
+# 주간 차트의 요일 이름 (월요일부터)
+WEEKDAY_NAMES = ('월', '화', '수', '목', '금', '토', '일')
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def week_start(moment):
+    """기준 시각이 속한 주의 월요일 (UTC 날짜)"""
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+def _append(user_id, kind, amount, reason, ref, created_at):
+    """원장 기록과 일별 집계 추가"""
+    created_at = created_at or _utcnow()
+    db.session.execute(
+        PointLedgerEntry.__table__.insert().values(
+            user_id=user_id,
+            kind=kind,
+            amount=amount,
+            reason=reason,
+            ref=None if ref is None else str(ref),
+            created_at=created_at,
+        )
+    )
+
+    table = PointDailyBucket.__table__
+    column = _BUCKET_COLUMNS[kind]
+    day = created_at.date()
+    stmt = dialect_insert(table).values(user_id=user_id, day=day, **{column: amount})
+    total = db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['user_id', 'day'],
+        set_={column: table.c[column] + stmt.excluded[column]},
+    ).returning(table.c[column])).scalar()
+    if kind == EARN:
+        db.session.info.setdefault(EARNING_CHANGES_KEY, {})[(user_id, day)] = total
+
+
+def _init_balance(user_id):
+    """
+    현재 포인트 행이 없으면 원장으로 계산한 잔액으로 생성
+
+    행이 생기기 전에 쌓인 원장 기록도 반영되도록 get_balance()로 계산합니다.
+
+    Returns:
+        int | None: 만든 행의 현재 포인트 (다른 요청이 먼저 만들었으면 None)
+    """
+    return db.session.execute(
+        dialect_insert(PointBalance.__table__)
+        .values(user_id=user_id, current_points=get_balance(user_id)['currentPoints'])
+        .on_conflict_do_nothing(index_elements=['user_id'])
+        .returning(PointBalance.current_points)
+    ).scalar()
+
+
+def _add_balance(user_id, delta):
+    """현재 포인트 행에 delta를 더하고 갱신된 값 반환 (행이 없으면 None)"""
+    return db.session.execute(
+        update(PointBalance)
+        .where(PointBalance.user_id == user_id)
+        .values(current_points=PointBalance.current_points + delta)
+        .returning(PointBalance.current_points),
+        execution_options={'synchronize_session': False},
+    ).scalar()
+
+
+def _record_balance(user_id, points):
+    """커밋 후 순위표에 반영할 현재 포인트 기록"""
+    db.session.info.setdefault(BALANCE_CHANGES_KEY, {})[user_id] = points
+
+
+def post_entry(user_id, kind, amount, reason, ref=None, created_at=None):
+    """
+    원장에 기록 추가 (커밋은 호출한 쪽에서 함)
+
+    같은 트랜잭션에서 기록 날짜의 일별 집계 행과 현재 포인트 행에도 반영합니다.
+    잔액 확인 없이 차감하므로, 사용자 요청으로 포인트를 쓰는 경우에는 debit()을 사용합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        kind (str): EARN, SPEND, DONATE
+        amount (int): 포인트 (양수)
+        reason (str): 사유 (예: 'mission', 'device_off', 'exchange', 'donate')
+        ref (str | None): 관련 항목 ID
+        created_at (datetime | None): 기록 시각 (UTC, 기본값: 현재)
+    """
+    _append(user_id, kind, amount, reason, ref, created_at)
+    delta = amount if kind == EARN else -amount
+    points = _add_balance(user_id, delta)
+    if points is None:
+        # 행을 새로 만들면 방금 추가한 기록까지 포함한 잔액으로 만들어지므로 다시 더하지 않음
+        points = _init_balance(user_id)
+        if points is None:
+            points = _add_balance(user_id, delta)
+    _record_balance(user_id, points)
+
+
+def debit(user_id, kind, amount, reason, ref=None):
+    """
+    잔액이 충분할 때만 포인트 차감 (커밋은 호출한 쪽에서 함)
+
+    잔액 확인과 차감을 조건부 UPDATE 한 문장으로 처리하므로 파이썬에서 잔액을 읽고 비교하는 동안
+    잠금을 잡지 않으며, 동시에 들어온 요청이 함께 확인을 통과해 잔액보다 많이 차감되는 일이 없습니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        kind (str): SPEND 또는 DONATE
+        amount (int): 차감할 포인트 (양수)
+        reason (str): 사유 (예: 'exchange', 'donate')
+        ref (str | None): 관련 항목 ID
+
+    Returns:
+        int | None: 차감 후 현재 포인트, 잔액이 부족하면 None (아무것도 기록하지 않음)
+    """
+    stmt = (
+        update(PointBalance)
+        .where(PointBalance.user_id == user_id, PointBalance.current_points >= amount)
+        .values(current_points=PointBalance.current_points - amount)
+        .returning(PointBalance.current_points)
+    )
+    remaining = db.session.execute(stmt, execution_options={'synchronize_session': False}).scalar()
+    if remaining is None:
+        # 현재 포인트 행이 아직 없는 사용자면 원장으로 만든 뒤 한 번 더 시도
+        _init_balance(user_id)
+        remaining = db.session.execute(stmt, execution_options={'synchronize_session': False}).scalar()
+        if remaining is None:
+            return None
+    _append(user_id, kind, amount, reason, ref, None)
+    _record_balance(user_id, remaining)
+    return remaining
+
+
+def get_week_buckets(user_id, now=None):
+    """
+    이번 주(월요일부터 7일)의 일별 적립 포인트
+
+    일별 집계에서 최대 7개 행만 읽고, 기록이 없는 날은 0으로 채웁니다.
+
+    Args:
+        user_id (int | None): 사용자 ID
+        now (datetime | None): 기준 시각 (UTC)
+
+    Returns:
+        list: [{'day': '월', 'date': '2025-11-10', 'points': 15}, ...] (7개)
+    """
+    start = week_start(now or _utcnow())
+    days = [start + timedelta(days=i) for i in range(7)]
+    earned = {}
+    if user_id is not None:
+        earned = dict(db.session.execute(
+            select(PointDailyBucket.day, PointDailyBucket.earned_points).where(
+                PointDailyBucket.user_id == user_id,
+                PointDailyBucket.day >= days[0],
+                PointDailyBucket.day <= days[-1],
+            )
+        ).all())
+    return [
+        {'day': WEEKDAY_NAMES[i], 'date': day.isoformat(), 'points': earned.get(day, 0)}
+        for i, day in enumerate(days)
+    ]
+
+
+def get_balance(user_id, now=None):
+    """
+    사용자의 포인트 잔액 계산 (스냅샷 + 이후 기록)
+
+    Args:
+        user_id (int | None): 사용자 ID
+        now (datetime | None): 기준 시각 (UTC, 이번 주 계산용)
+
+    Returns:
+        dict: currentPoints, weeklyIncrease, usedPoints, totalDonated
+    """
+    this_week = week_start(now or _utcnow())
+    earned = used = donated = weekly = 0
+    if user_id is None:
+        rows = []
+    else:
+        # 스냅샷과 tail을 한 문장으로 읽음 (사용자 행 기준 외부 조인, tail 기록마다 한 행)
+        rows = db.session.execute(
+            select(
+                PointSnapshot.user_id.label('snapshot_user_id'),
+                PointSnapshot.earned_points,
+                PointSnapshot.used_points,
+                PointSnapshot.total_donated,
+                PointSnapshot.week_start,
+                PointSnapshot.week_earned,
+                PointLedgerEntry.kind,
+                PointLedgerEntry.amount,
+                PointLedgerEntry.created_at,
+            )
+            .select_from(User)
+            .outerjoin(PointSnapshot, PointSnapshot.user_id == User.id)
+            .outerjoin(PointLedgerEntry, and_(
+                PointLedgerEntry.user_id == User.id,
+                text(POINT_LEDGER_UNCOMPACTED_WHERE),
+            ))
+            .where(User.id == user_id)
+        ).all()
+
+    if rows and rows[0].snapshot_user_id is not None:
+        snapshot = rows[0]
+        earned, used, donated = snapshot.earned_points, snapshot.used_points, snapshot.total_donated
+        if snapshot.week_start == this_week:
+            weekly = snapshot.week_earned
+
+    for row in rows:
+        if row.kind == EARN:
+            earned += row.amount
+            if week_start(row.created_at) == this_week:
+                weekly += row.amount
+        elif row.kind == SPEND:
+            used += row.amount
+        elif row.kind == DONATE:
+            donated += row.amount
+
+    return {
+        'currentPoints': earned - used - donated,
+        'weeklyIncrease': weekly,
+        'usedPoints': used,
+        'totalDonated': donated,
+    }
+
+
+def _fold(snapshot, entries):
+    """스냅샷 값(dict)에 원장 기록을 더함"""
+    for entry in entries:
+        if entry.kind == EARN:
+            snapshot['earned_points'] += entry.amount
+            entry_week = week_start(entry.created_at)
+            if snapshot['week_start'] is None or entry_week > snapshot['week_start']:
+                snapshot['week_start'] = entry_week
+                snapshot['week_earned'] = entry.amount
+            elif entry_week == snapshot['week_start']:
+                snapshot['week_earned'] += entry.amount
+        elif entry.kind == SPEND:
+            snapshot['used_points'] += entry.amount
+        elif entry.kind == DONATE:
+            snapshot['total_donated'] += entry.amount
+        snapshot['last_entry_id'] = max(snapshot['last_entry_id'], entry.id)
+
+
+def compact(batch_size=COMPACT_BATCH_SIZE):
+    """
+    아직 합산되지 않은 원장 기록을 사용자별 스냅샷에 합산
+
+    스냅샷과 기록의 합산 표시(compacted)를 같은 트랜잭션에서 갱신하므로
+    중간에 실패해도 같은 기록이 두 번 더해지지 않습니다.
+    커밋된 기록만 보이므로 늦게 커밋된 기록은 다음 실행에서 합산됩니다.
+
+    Returns:
+        int: 합산한 기록 수
+    """
+    table = PointSnapshot.__table__
+    compacted = 0
+
+    while True:
+        # 진행 위치 행을 잠가 동시에 실행된 압축 작업이 같은 기록을 처리하지 않도록 함
+        cursor = db.session.execute(
+            select(RollupCursor).where(RollupCursor.name == CURSOR_NAME).with_for_update()
+        ).scalar_one_or_none()
+        if cursor is None:
+            cursor = RollupCursor(name=CURSOR_NAME, last_reading_id=0)
+            db.session.add(cursor)
+
+        now = _utcnow()
+        entries = db.session.execute(
+            select(
+                PointLedgerEntry.id,
+                PointLedgerEntry.user_id,
+                PointLedgerEntry.kind,
+                PointLedgerEntry.amount,
+                PointLedgerEntry.created_at,
+            )
+            .where(text(POINT_LEDGER_UNCOMPACTED_WHERE))
+            .order_by(PointLedgerEntry.id)
+            .limit(batch_size)
+        ).all()
+        if not entries:
+            db.session.commit()
+            return compacted
+
+        by_user = {}
+        for entry in entries:
+            by_user.setdefault(entry.user_id, []).append(entry)
+
+        # 스냅샷이 없는 사용자는 빈 스냅샷 생성 후, 대상 스냅샷을 한 번에 잠가 읽음
+        db.session.execute(
+            dialect_insert(table)
+            .values([{'user_id': user_id} for user_id in by_user])
+            .on_conflict_do_nothing(index_elements=['user_id'])
+        )
+        rows = db.session.execute(
+            select(table).where(table.c.user_id.in_(list(by_user))).with_for_update()
+        ).mappings().all()
+
+        params = []
+        for row in rows:
+            snapshot = {
+                'last_entry_id': row['last_entry_id'] or 0,
+                'earned_points': row['earned_points'] or 0,
+                'used_points': row['used_points'] or 0,
+                'total_donated': row['total_donated'] or 0,
+                'week_start': row['week_start'],
+                'week_earned': row['week_earned'] or 0,
+            }
+            _fold(snapshot, by_user[row['user_id']])
+            params.append({f'b_{k}': v for k, v in snapshot.items()} | {'b_user_id': row['user_id']})
+
+        db.session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam('b_user_id'))
+            .values(
+                last_entry_id=bindparam('b_last_entry_id'),
+                earned_points=bindparam('b_earned_points'),
+                used_points=bindparam('b_used_points'),
+                total_donated=bindparam('b_total_donated'),
+                week_start=bindparam('b_week_start'),
+                week_earned=bindparam('b_week_earned'),
+                updated_at=now,
+            ),
+            params,
+        )
+        ids = [entry.id for entry in entries]
+        for i in range(0, len(ids), MARK_CHUNK_SIZE):
+            db.session.execute(
+                update(PointLedgerEntry)
+                .where(PointLedgerEntry.id.in_(ids[i:i + MARK_CHUNK_SIZE]))
+                .values(compacted=True),
+                execution_options={'synchronize_session': False},
+            )
+        cursor.last_reading_id = max(cursor.last_reading_id or 0, ids[-1])
+        db.session.commit()
+        compacted += len(entries)
+
+        if len(entries) < batch_size:
+            return compacted
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    args = sys.argv[1:]
+    command = args[0].lower() if args else 'compact'
+    interval = None
+    if len(args) > 2 and args[1] == '--interval':
+        interval = int(args[2])
+
+    if command != 'compact':
+        print(f"❌ 알 수 없는 명령어: {command}")
+        return
+
+    with app.app_context():
+        while True:
+            print(f"합산한 원장 기록: {compact()}개")
+            if interval is None:
+                return
+            time.sleep(interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+미션 타이머 스케줄러
+
+미션을 시작하면 user_missions.deadline_at에 마감 시각을 저장하고, 프로세스 메모리의 타이밍 휠에 등록합니다.
+타이밍 휠은 마감 시각(초 단위)별 버킷에 (사용자 ID, 미션 ID)를 정수 하나로 묶은 키만 보관하므로,
+타이머 객체나 콜백 없이 타이머당 약 200바이트(100만 개에 약 200MB)만 사용합니다.
+
+백그라운드 스레드는 TICK_SECONDS마다 지난 버킷을 꺼내 한 번에 만료 처리합니다.
+만료는 EXPIRE_BATCH_SIZE개씩 UPDATE ... RETURNING 한 문장으로 기록하며, 데이터베이스를 주기적으로 조회하지 않습니다.
+UPDATE는 '진행 중이고 마감 시각이 지난' 행만 바꾸므로, 다시 시작해 마감이 늦춰진 미션이나
+이미 완료한 미션은 만료되지 않고, 여러 워커가 같은 타이머를 처리해도 결과가 같습니다.
+
+프로세스가 다시 시작되면 첫 요청 때 만료 스레드를 시작하고, 스레드가 만료 처리를 시작하기 전에
+진행 중인 미션의 마감 시각을 한 번 읽어 타이밍 휠을 다시 만듭니다 (요청은 기다리지 않음).
+"""
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text, tuple_, update
+
+from models import db, UserMissionModel, USER_MISSION_STATUS_WHERE
+from utils.change_feed import publish
+
+# 만료를 확인하는 주기 (초)
+TICK_SECONDS = 1.0
+
+# 한 번의 UPDATE로 만료 처리하는 최대 타이머 수
+EXPIRE_BATCH_SIZE = 1000
+
+# 다시 만들 때 한 번에 읽는 행 수
+REBUILD_BATCH_SIZE = 10000
+
+# 미션 ID가 차지하는 비트 수 (키 = 사용자 ID << 32 | 미션 ID)
+_MISSION_BITS = 32
+_MISSION_MASK = (1 << _MISSION_BITS) - 1
+
+
+def _pack(user_id, mission_id):
+    return (user_id << _MISSION_BITS) | mission_id
+
+
+def _unpack(key):
+    return key >> _MISSION_BITS, key & _MISSION_MASK
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _to_epoch(deadline):
+    """마감 시각(UTC, tzinfo 없음)을 초 단위 버킷 번호로 변환 (올림)"""
+    return math.ceil(deadline.replace(tzinfo=timezone.utc).timestamp())
+
+
+class TimerWheel:
+    """
+    초 단위 버킷 타이밍 휠
+
+    버킷은 마감 시각(유닉스 초)을 키로 하는 딕셔너리이므로 먼 미래의 타이머도 한 버킷에만 들어갑니다.
+    취소할 때는 키의 버킷을 찾아 바로 지우므로, 만료 시점에 버려지는 항목이 남지 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}  # {마감 초: set(키)}
+        self._deadlines = {}  # {키: 마감 초}
+        self._cursor = None  # 다음으로 확인할 초
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def add(self, key, second, replace=True):
+        """타이머 등록 (이미 있으면 replace가 참일 때만 마감 시각 교체)"""
+        with self._lock:
+            if not replace and key in self._deadlines:
+                return
+            self._discard(key)
+            # 이미 확인한 초보다 이른 마감은 다음 확인 때 만료되도록 당겨서 등록
+            if self._cursor is not None and second < self._cursor:
+                second = self._cursor
+            self._buckets.setdefault(second, set()).add(key)
+            self._deadlines[key] = second
+
+    def cancel(self, key):
+        """타이머 취소"""
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        second = self._deadlines.pop(key, None)
+        if second is None:
+            return
+        bucket = self._buckets[second]
+        bucket.discard(key)
+        if not bucket:
+            del self._buckets[second]
+
+    def pop_due(self, now):
+        """
+        now(유닉스 초)까지 마감된 타이머를 꺼냄
+
+        마지막으로 확인한 초부터 now까지의 버킷만 확인합니다.
+        처음 호출하거나 다시 만든 직후에는 지난 마감 시각이 모두 포함되도록 전체 버킷에서 찾습니다.
+
+        Returns:
+            list: 마감된 키 목록
+        """
+        due = []
+        with self._lock:
+            if self._cursor is None:
+                seconds = [s for s in self._buckets if s <= now]
+            else:
+                seconds = range(self._cursor, now + 1)
+            for second in seconds:
+                bucket = self._buckets.pop(second, None)
+                if bucket:
+                    for key in bucket:
+                        del self._deadlines[key]
+                    due.extend(bucket)
+            self._cursor = max(self._cursor or 0, now + 1)
+        return due
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._deadlines.clear()
+            self._cursor = None
+
+
+class MissionTimerScheduler:
+    """
+    미션 타이머 스케줄러
+
+    init_app()으로 애플리케이션에 연결하면 각 프로세스의 첫 요청에서 만료 스레드를 시작하며,
+    스레드가 저장된 마감 시각으로 타이머를 다시 만든 뒤 만료 처리를 시작합니다.
+    """
+
+    def __init__(self):
+        self.timer_seconds = 600
+        self._app = None
+        self._wheel = TimerWheel()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def init_app(self, app):
+        self._app = app
+        self.timer_seconds = app.config.get('MISSION_TIMER_SECONDS', self.timer_seconds)
+        app.before_request(self._ensure_started)
+
+    def __len__(self):
+        return len(self._wheel)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            thread = threading.Thread(target=self._run, name='mission-timers', daemon=True)
+            thread.start()
+            self._started = True
+
+    def deadline(self, started_at=None):
+        """시작 시각으로 마감 시각 계산 (UTC)"""
+        return (started_at or _utcnow()) + timedelta(seconds=self.timer_seconds)
+
+    def remaining(self, deadline=None):
+        """
+        마감까지 남은 시간 (초)
+
+        Args:
+            deadline (datetime | None): 마감 시각 (UTC), 없으면 미션 제한 시간 전체
+
+        Returns:
+            int: 남은 시간 (0 이상)
+        """
+        if deadline is None:
+            return self.timer_seconds
+        return max(0, math.ceil((deadline - _utcnow()).total_seconds()))
+
+    def schedule(self, user_id, mission_id, deadline):
+        """
+        미션 타이머 등록 (커밋 후 호출)
+
+        Args:
+            user_id (int): 사용자 ID
+            mission_id (int): 미션 ID
+            deadline (datetime): 마감 시각 (UTC)
+        """
+        self._wheel.add(_pack(user_id, mission_id), _to_epoch(deadline))
+
+    def cancel(self, user_id, mission_id):
+        """미션 타이머 취소 (완료 등, 커밋 후 호출)"""
+        self._wheel.cancel(_pack(user_id, mission_id))
+
+    def rebuild(self):
+        """
+        저장된 마감 시각으로 타이밍 휠 다시 만들기
+
+        진행 중 부분 인덱스를 사용해 진행 중인 미션만 배치 단위로 읽습니다.
+        요청을 처리하는 동안 실행되므로, 그 사이 요청이 등록한 타이머(더 최신 마감 시각)는 바꾸지 않습니다.
+
+        Returns:
+            int: 등록된 타이머 수
+        """
+        with self._app.app_context():
+            result = db.session.execute(
+                select(
+                    UserMissionModel.user_id,
+                    UserMissionModel.mission_id,
+                    UserMissionModel.deadline_at,
+                )
+                .where(text(USER_MISSION_STATUS_WHERE['in-progress']))
+                .where(UserMissionModel.deadline_at.isnot(None))
+                .execution_options(yield_per=REBUILD_BATCH_SIZE)
+            )
+            for user_id, mission_id, deadline_at in result:
+                self._wheel.add(_pack(user_id, mission_id), _to_epoch(deadline_at), replace=False)
+            db.session.remove()
+        return len(self._wheel)
+
+    def _run(self):
+        # 만료 처리를 시작하기 전에 저장된 마감 시각으로 타이머를 다시 만듦 (실패하면 다음 주기에 다시 시도)
+        while True:
+            try:
+                self.rebuild()
+                break
+            except Exception:
+                self._app.logger.exception('미션 타이머 다시 만들기 실패')
+                time.sleep(TICK_SECONDS)
+        while True:
+            time.sleep(TICK_SECONDS)
+            try:
+                self.expire_due()
+            except Exception:  # 스레드가 멈추지 않도록 다음 주기에 다시 시도
+                self._app.logger.exception('미션 타이머 만료 처리 실패')
+
+    def expire_due(self, now=None):
+        """
+        마감된 타이머를 배치 단위로 만료 처리
+
+        Args:
+            now (float | None): 기준 시각 (유닉스 초, 기본값: 현재)
+
+        Returns:
+            int: 만료된 미션 수
+        """
+        due = self._wheel.pop_due(int(now if now is not None else time.time()))
+        if not due:
+            return 0
+
+        expired_at = _utcnow()
+        expired = 0
+        with self._app.app_context():
+            for i in range(0, len(due), EXPIRE_BATCH_SIZE):
+                keys = [_unpack(key) for key in due[i:i + EXPIRE_BATCH_SIZE]]
+                # 실제로 만료된 행만 돌려받아 이벤트 발행 (이미 완료했거나 다시 시작한 미션 제외)
+                rows = db.session.execute(
+                    update(UserMissionModel.__table__)
+                    .where(
+                        tuple_(UserMissionModel.user_id, UserMissionModel.mission_id).in_(keys),
+                        text(USER_MISSION_STATUS_WHERE['in-progress']),
+                        UserMissionModel.deadline_at <= expired_at,
+                    )
+                    .values(status='expired')
+                    .returning(UserMissionModel.user_id, UserMissionModel.mission_id)
+                ).all()
+                db.session.commit()
+                expired += len(rows)
+                for user_id, mission_id in rows:
+                    publish('mission', str(mission_id), {
+                        'id': str(mission_id),
+                        'userId': str(user_id),
+                        'status': 'expired',
+                    })
+            db.session.remove()
+        return expired
+
+
+# 애플리케이션 전역 스케줄러
+scheduler = MissionTimerScheduler()
@@ -0,0 +1,352 @@
+"""
+강의실 재실 인원 인덱스
+
+강의실별 재실 인원과 혼잡도를 프로세스 메모리에 보관하고,
+"가장 가까운 빈자리 있는 강의실" 조회를 데이터베이스 없이 처리합니다.
+
+강의실은 (건물, 층) 단위로 묶어 두고, 같은 층 → 같은 건물의 가까운 층 → 다른 건물(buildings 테이블의
+캠퍼스 지도 좌표로 계산한 거리가 가까운 순) 순으로 거리를 넓혀 가며 탐색합니다.
+같은 거리에서는 인원 비율이 가장 낮은 강의실을 고릅니다.
+
+재실 인원이 보고되면 혼잡도를 다시 계산해 데이터베이스에 기록하고, 커밋이 성공한 뒤에 인덱스에 반영합니다.
+다른 워커 프로세스가 기록한 변경 사항은 백그라운드 스레드가 RELOAD_SECONDS마다 데이터베이스에서 다시 읽어 반영하므로,
+요청 처리 중에는 데이터베이스를 읽지 않습니다.
+"""
+import math
+import threading
+import time
+from bisect import bisect_right
+
+from sqlalchemy import case, or_, select, update
+
+from models import db, BuildingModel, RoomModel
+
+# 다른 프로세스의 변경 사항을 반영하기 위해 인덱스를 다시 읽는 주기 (초)
+RELOAD_SECONDS = 30
+
+# 혼잡도 기준 (인원 / 수용 인원)
+RELAXED_RATIO = 0.5  # 이 비율 미만이면 '여유'
+CROWDED_RATIO = 0.8  # 이 비율 이상이면 '혼잡', 그 사이는 '보통'
+
+# 수용 인원이 없는 강의실의 기본값
+DEFAULT_CAPACITY = 40
+
+# 강의실 응답 필드 (to_room_dict의 키)
+ROOM_FIELDS = ('id', 'name', 'signalStrength', 'signal', 'peopleCount', 'congestion')
+
+
+def compute_congestion(people_count, capacity):
+    """
+    재실 인원과 수용 인원으로 혼잡도 계산
+
+    Args:
+        people_count (int): 재실 인원
+        capacity (int): 수용 인원
+
+    Returns:
+        str: '여유', '보통', '혼잡'
+    """
+    ratio = people_count / (capacity or DEFAULT_CAPACITY)
+    if ratio < RELAXED_RATIO:
+        return '여유'
+    if ratio < CROWDED_RATIO:
+        return '보통'
+    return '혼잡'
+
+
+class OccupancyIndex:
+    """
+    강의실 재실 인원 메모리 인덱스
+
+    강의실 정보는 id → dict로, 위치는 건물 → 층 → 강의실 ID 집합으로 보관하며,
+    건물마다 다른 건물을 가까운 순으로 정렬한 목록을 미리 만들어 둡니다.
+
+    init_app()으로 애플리케이션에 연결하면 각 프로세스의 첫 요청에서 인덱스를 만들고 다시 읽기 스레드를 시작합니다.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._lock = threading.RLock()
+        self._rooms = {}
+        self._floors = {}
+        self._nearby = {}  # {건물: 다른 건물 목록 (가까운 순)}
+        self._order = []  # 이름 순으로 정렬한 강의실 ID 목록
+        self._keys = []  # _order와 같은 순서의 (이름, ID) 정렬 키
+        self._applied_at = {}  # {강의실 ID: apply_counts()로 반영한 시각 (time.monotonic)}
+
+    def init_app(self, app):
+        self._app = app
+        app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            with self._app.app_context():
+                self.load()
+                db.session.remove()
+            thread = threading.Thread(target=self._run, name='occupancy-reload', daemon=True)
+            thread.start()
+            self._started = True
+
+    def _run(self):
+        while True:
+            time.sleep(RELOAD_SECONDS)
+            try:
+                with self._app.app_context():
+                    self.load()
+                    db.session.remove()
+            except Exception:  # 스레드가 멈추지 않도록 다음 주기에 다시 시도
+                self._app.logger.exception('강의실 인덱스 다시 읽기 실패')
+
+    def load(self):
+        """
+        데이터베이스에서 모든 강의실과 건물 위치를 읽어 인덱스를 다시 구성
+
+        읽기 시작한 뒤 apply_counts()로 반영된 강의실은 읽은 값이 더 오래되었을 수 있으므로 인덱스의 값을 유지합니다.
+        """
+        started = time.monotonic()
+        positions = {
+            name: (x, y)
+            for name, x, y in db.session.execute(
+                select(BuildingModel.name, BuildingModel.pos_x, BuildingModel.pos_y)
+            )
+        }
+        rows = db.session.execute(
+            select(
+                RoomModel.id,
+                RoomModel.name,
+                RoomModel.signal_strength,
+                RoomModel.signal_quality,
+                RoomModel.people_count,
+                RoomModel.capacity,
+                RoomModel.building,
+                RoomModel.floor,
+            )
+        ).all()
+
+        rooms = {}
+        floors = {}
+        for row in rooms_from_rows(rows):
+            rooms[row['id']] = row
+            floors.setdefault(row['building'], {}).setdefault(row['floor'], set()).add(row['id'])
+
+        keys = sorted((room['name'], room_id) for room_id, room in rooms.items())
+        nearby = {building: _by_distance(building, floors, positions) for building in floors}
+        with self._lock:
+            self._applied_at = {
+                room_id: applied_at
+                for room_id, applied_at in self._applied_at.items()
+                if applied_at >= started
+            }
+            for room_id in self._applied_at:
+                if room_id in rooms and room_id in self._rooms:
+                    rooms[room_id]['peopleCount'] = self._rooms[room_id]['peopleCount']
+                    rooms[room_id]['congestion'] = self._rooms[room_id]['congestion']
+            self._rooms = rooms
+            self._floors = floors
+            self._nearby = nearby
+            self._order = [room_id for _, room_id in keys]
+            self._keys = keys
+
+    def get(self, room_id):
+        """강의실 정보 조회 (없으면 None)"""
+        with self._lock:
+            room = self._rooms.get(room_id)
+            return dict(room) if room else None
+
+    def list_rooms(self, after=None, limit=None):
+        """
+        강의실 목록을 이름 순으로 반환
+
+        정렬 키 (이름, ID)를 이진 탐색하여 after 다음 위치부터 limit 개만 복사합니다.
+
+        Args:
+            after (tuple | None): 마지막으로 받은 강의실의 (이름, ID)
+            limit (int | None): 최대 개수 (None이면 전체)
+
+        Returns:
+            list: 강의실 정보 목록
+        """
+        with self._lock:
+            start = bisect_right(self._keys, tuple(after)) if after is not None else 0
+            end = len(self._order) if limit is None else start + limit
+            return [dict(self._rooms[room_id]) for room_id in self._order[start:end]]
+
+    def write_counts(self, counts):
+        """
+        재실 인원을 데이터베이스에 기록
+
+        보고된 값은 인덱스의 값과 같더라도 모두 기록합니다 (다른 워커가 그 사이에 바꿨을 수 있음).
+        한 번의 UPDATE ... RETURNING으로 데이터베이스 값이 실제로 바뀐 강의실만 돌려받습니다.
+        커밋은 호출한 쪽에서 하며, 인덱스는 커밋이 성공한 뒤 apply_counts()로 갱신합니다.
+
+        Args:
+            counts (dict): {강의실 ID: 재실 인원}
+
+        Returns:
+            list: 값이 바뀐 강의실 정보 목록 (apply_counts()에 넘길 값)
+        """
+        with self._lock:
+            reported = {
+                room_id: dict(
+                    self._rooms[room_id],
+                    peopleCount=people_count,
+                    congestion=compute_congestion(people_count, self._rooms[room_id]['capacity']),
+                )
+                for room_id, people_count in counts.items()
+                if room_id in self._rooms
+            }
+        if not reported:
+            return []
+
+        rooms = RoomModel.__table__
+        people_count = case({r['id']: r['peopleCount'] for r in reported.values()}, value=rooms.c.id)
+        congestion = case({r['id']: r['congestion'] for r in reported.values()}, value=rooms.c.id)
+        changed_ids = db.session.execute(
+            update(rooms)
+            .where(
+                rooms.c.id.in_(reported),
+                or_(
+                    rooms.c.people_count.is_distinct_from(people_count),
+                    rooms.c.congestion.is_distinct_from(congestion),
+                ),
+            )
+            .values(people_count=people_count, congestion=congestion)
+            .returning(rooms.c.id)
+        ).scalars().all()
+        return [reported[room_id] for room_id in sorted(changed_ids)]
+
+    def apply_counts(self, changed):
+        """
+        커밋된 재실 인원을 인덱스에 반영
+
+        Args:
+            changed (list): write_counts()가 반환한 강의실 정보 목록
+        """
+        applied_at = time.monotonic()
+        with self._lock:
+            for room in changed:
+                current = self._rooms.get(room['id'])
+                if current is not None:
+                    current['peopleCount'] = room['peopleCount']
+                    current['congestion'] = room['congestion']
+                    self._applied_at[room['id']] = applied_at
+
+    def nearest_free_room(self, room_id):
+        """
+        가장 가까운 빈자리 있는(재실 인원 < 수용 인원) 강의실 조회
+
+        같은 층부터 층 차이를 1씩 넓혀 가며 탐색하고, 같은 건물에 없으면 다른 건물을 가까운 순으로 같은 방식으로 탐색합니다.
+
+        Args:
+            room_id (int): 기준 강의실 ID
+
+        Returns:
+            dict | None: 강의실 정보 (빈자리 있는 강의실이 없으면 None)
+        """
+        with self._lock:
+            origin = self._rooms.get(room_id)
+            if origin is None:
+                return None
+
+            building = origin['building']
+            floor = origin['floor']
+
+            # 같은 건물 → 가까운 건물 순으로 탐색
+            for b in [building] + self._nearby.get(building, []):
+                found = self._nearest_in_building(b, floor, room_id)
+                if found is not None:
+                    return dict(found)
+        return None
+
+    def _nearest_in_building(self, building, floor, exclude_id):
+        floors = self._floors.get(building, {})
+        if not floors:
+            return None
+        if floor is None:
+            # 층 정보가 없으면 건물 전체를 같은 거리로 취급
+            candidates = set().union(*floors.values())
+            return self._best_free(candidates, exclude_id)
+
+        numbered = [f for f in floors if f is not None]
+        span = max((abs(f - floor) for f in numbered), default=0)
+        for distance in range(span + 1):
+            candidates = set(floors.get(floor - distance, ()))
+            if distance:
+                candidates |= floors.get(floor + distance, set())
+            best = self._best_free(candidates, exclude_id)
+            if best is not None:
+                return best
+        # 층 정보가 없는 강의실은 가장 먼 거리로 취급
+        return self._best_free(floors.get(None, set()), exclude_id)
+
+    def _best_free(self, candidates, exclude_id):
+        best = None
+        best_ratio = None
+        for candidate_id in candidates:
+            if candidate_id == exclude_id:
+                continue
+            room = self._rooms[candidate_id]
+            capacity = room['capacity'] or DEFAULT_CAPACITY
+            if room['peopleCount'] >= capacity:
+                continue
+            ratio = room['peopleCount'] / capacity
+            if best is None or ratio < best_ratio:
+                best, best_ratio = room, ratio
+        return best
+
+
+def _by_distance(building, floors, positions):
+    """
+    building에서 가까운 순으로 정렬한 다른 건물 목록
+
+    위치(buildings 테이블)가 없는 건물은 거리를 알 수 없으므로 이름 순으로 맨 뒤에 둡니다.
+    """
+    origin = positions.get(building)
+
+    def distance(other):
+        position = positions.get(other)
+        if origin is None or position is None:
+            return (1, math.inf, str(other))
+        return (0, math.dist(origin, position), str(other))
+
+    return sorted((b for b in floors if b != building), key=distance)
+
+
+def rooms_from_rows(rows):
+    """조회한 행을 인덱스용 딕셔너리로 변환 (혼잡도는 인원 기준으로 다시 계산)"""
+    for row in rows:
+        people_count = row.people_count or 0
+        capacity = row.capacity or DEFAULT_CAPACITY
+        yield {
+            'id': row.id,
+            'name': row.name,
+            'signalStrength': row.signal_strength,
+            'signal': row.signal_quality,
+            'peopleCount': people_count,
+            'congestion': compute_congestion(people_count, capacity),
+            'capacity': capacity,
+            'building': row.building,
+            'floor': row.floor,
+        }
+
+
+def to_room_dict(room):
+    """인덱스의 강의실 정보를 API 응답 형식(RoomModel.to_dict와 동일)으로 변환"""
+    return {
+        'id': str(room['id']),
+        'name': room['name'],
+        'signalStrength': room['signalStrength'],
+        'signal': room['signal'],
+        'peopleCount': room['peopleCount'],
+        'congestion': room['congestion'],
+    }
+
+
+# 애플리케이션 전역 인덱스
+index = OccupancyIndex()
@@ -0,0 +1,177 @@
+"""
+커서 기반(keyset) 페이지네이션 유틸리티
+
+목록 API는 OFFSET 대신 "마지막으로 받은 행의 정렬 키 다음부터" 조회하므로,
+몇 번째 페이지든 인덱스를 타고 limit 개만 읽어 첫 페이지와 같은 비용으로 처리됩니다.
+
+응답 본문은 기존과 같은 JSON 배열을 유지하고, 다음 페이지 커서는 헤더로 전달합니다.
+    X-Next-Cursor: <불투명 커서>
+    Link: </api/...?cursor=<커서>&limit=20>; rel="next"
+다음 페이지가 없으면 두 헤더 모두 붙지 않습니다.
+"""
+import base64
+import json
+from urllib.parse import urlencode
+
+from flask import jsonify, request
+from sqlalchemy import and_, or_
+
+# 한 페이지 기본 크기와 최대 크기
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    """
+    정렬 키 값 목록을 불투명 커서 문자열로 변환
+
+    Args:
+        values (list): 마지막 행의 정렬 키 값 (JSON으로 표현 가능한 값)
+
+    Returns:
+        str: URL에 그대로 넣을 수 있는 커서
+    """
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    커서 문자열을 정렬 키 값 목록으로 변환
+
+    Args:
+        cursor (str): encode_cursor로 만든 커서
+        size (int): 정렬 키 개수
+
+    Returns:
+        list: 정렬 키 값 목록
+
+    Raises:
+        ValueError: 커서 형식이 잘못된 경우
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('invalid cursor')
+    return values
+
+
+def parse_page_args(size=1):
+    """
+    요청의 limit / cursor 쿼리 파라미터를 읽음
+
+    Args:
+        size (int): 정렬 키 개수
+
+    Returns:
+        tuple: (limit, 정렬 키 값 목록 또는 None)
+
+    Raises:
+        ValueError: limit 또는 cursor 형식이 잘못된 경우
+    """
+    raw_limit = request.args.get('limit')
+    if raw_limit is None or raw_limit == '':
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        limit = int(raw_limit)
+        if limit < 1:
+            raise ValueError('invalid limit')
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    raw_cursor = request.args.get('cursor')
+    after = decode_cursor(raw_cursor, size) if raw_cursor else None
+    return limit, after
+
+
+def after_clause(columns, after, descending=False):
+    """
+    정렬 키가 after 다음인 행만 남기는 WHERE 조건 생성
+
+    (a, b) > (x, y)를 a > x OR (a = x AND b > y) 형태로 풀어서 만들어
+    행 값 비교를 지원하지 않는 데이터베이스에서도 동작하도록 합니다.
+
+    Args:
+        columns (list): 정렬 컬럼 목록 (마지막 컬럼은 유일해야 함)
+        after (list): 마지막으로 받은 행의 정렬 키 값
+        descending (bool): 내림차순 정렬 여부
+
+    Returns:
+        ColumnElement: WHERE 조건
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        beyond = column < after[i] if descending else column > after[i]
+        equal = [columns[j] == after[j] for j in range(i)]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
+
+
+def paginate_query(query, columns, descending=False):
+    """
+    ORM 쿼리에 커서 조건과 정렬, limit을 적용하여 한 페이지를 조회
+
+    limit보다 한 행 더 읽어 다음 페이지가 있는지 판단합니다.
+
+    Args:
+        query (Query): 필터가 적용된 ORM 쿼리
+        columns (list): 정렬 컬럼 목록 (마지막 컬럼은 유일해야 함)
+        descending (bool): 내림차순 정렬 여부
+
+    Returns:
+        tuple: (행 목록, 다음 페이지 커서 또는 None)
+
+    Raises:
+        ValueError: limit 또는 cursor 형식이 잘못된 경우
+    """
+    limit, after = parse_page_args(len(columns))
+    if after is not None:
+        # 커서 값의 타입이 정렬 컬럼 타입과 다르면 잘못된 커서로 처리
+        for column, value in zip(columns, after):
+            if type(value) is not column.type.python_type:
+                raise ValueError('invalid cursor')
+        query = query.filter(after_clause(columns, after, descending))
+    order = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
+
+def page_response(items, next_cursor):
+    """
+    페이지 응답 생성 (본문은 JSON 배열, 다음 페이지 커서는 헤더)
+
+    Args:
+        items (list): 응답 항목 목록
+        next_cursor (str | None): 다음 페이지 커서
+
+    Returns:
+        Response: JSON 응답
+    """
+    return set_next_cursor(jsonify(items), next_cursor)
+
+
+def set_next_cursor(response, next_cursor):
+    """
+    응답에 다음 페이지 커서 헤더(X-Next-Cursor, Link) 추가
+
+    Args:
+        response (Response): 응답
+        next_cursor (str | None): 다음 페이지 커서 (None이면 헤더를 붙이지 않음)
+
+    Returns:
+        Response: 같은 응답
+    """
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
@@ -0,0 +1,70 @@
+"""
+포인트 활동 내역 유틸리티
+
+포인트 원장 기록을 화면에 보여 줄 활동 항목(이모지, 제목, 날짜, 포인트)으로 변환합니다.
+미션, 교환 아이템, 기부 카테고리 이름은 메모리 카탈로그 스냅샷에서 찾으므로 추가 조회가 없습니다.
+"""
+from bisect import bisect_left
+
+from utils import catalog_cache
+from utils.ledger import DONATE, EARN, SPEND
+
+# 활동 항목 필드 (fields= 파라미터로 선택 가능)
+ACTIVITY_FIELDS = ('id', 'emoji', 'title', 'date', 'points')
+
+# 날짜 표시 형식 (UTC)
+DATE_FORMAT = '%Y.%m.%d %H:%M'
+
+# 사유별 (이모지, 제목 형식, 이름을 찾을 카탈로그)
+_REASONS = {
+    'mission': ('🌱', '{name} 미션 성공!', catalog_cache.missions),
+    'device_off': ('💡', '디바이스 전원 끄기', None),
+    'exchange': ('🎁', '{name} 교환', catalog_cache.exchange_items),
+    'donate': ('💝', '{name} 기부', catalog_cache.donate_categories),
+}
+
+# 사유를 알 수 없거나 카탈로그에서 삭제된 항목의 종류별 (이모지, 제목)
+_KIND_DEFAULTS = {
+    EARN: ('⭐', '포인트 적립'),
+    SPEND: ('🎁', '포인트 사용'),
+    DONATE: ('💝', '포인트 기부'),
+}
+
+
+def _catalog_title(cache, ref):
+    """카탈로그 스냅샷에서 ID로 항목 제목 조회 (없으면 None)"""
+    try:
+        item_id = int(ref)
+    except (TypeError, ValueError):
+        return None
+    for group in cache.snapshot().groups.values():
+        i = bisect_left(group.ids, item_id)
+        if i < len(group.ids) and group.ids[i] == item_id:
+            return group.dicts[i]['title']
+    return None
+
+
+def describe(entry):
+    """
+    원장 기록을 활동 항목으로 변환
+
+    Args:
+        entry: PointLedgerEntry 또는 같은 컬럼을 가진 조회 결과 행
+
+    Returns:
+        dict: {'id', 'emoji', 'title', 'date', 'points'} (사용 / 기부는 음수 포인트)
+    """
+    emoji, title = _KIND_DEFAULTS[entry.kind]
+    reason = _REASONS.get(entry.reason)
+    if reason is not None:
+        reason_emoji, reason_title, cache = reason
+        name = _catalog_title(cache, entry.ref) if cache is not None else None
+        if cache is None or name:
+            emoji, title = reason_emoji, reason_title.format(name=name)
+    return {
+        'id': str(entry.id),
+        'emoji': emoji,
+        'title': title,
+        'date': entry.created_at.strftime(DATE_FORMAT),
+        'points': entry.amount if entry.kind == EARN else -entry.amount,
+    }
@@ -0,0 +1,50 @@
+"""
+포인트 / 절약 통계 갱신 유틸리티
+
+포인트는 원장(utils.ledger)에 기록을 추가하는 것으로만 바꾸고,
+절약 통계(savings_stats)는 여러 요청이 동시에 바꾸는 값이므로
+ORM 객체를 읽어 파이썬에서 더한 뒤 저장하지 않고 UPDATE ... SET x = x + :n 한 문장으로 증가시킵니다.
+"""
+from sqlalchemy import update
+
+from models import db, SavingsStat
+from utils.ledger import EARN, get_balance, post_entry
+
+
+def credit_points(user_id, amount, reason, ref=None):
+    """
+    포인트 적립
+
+    원장에 적립 기록을 추가하고 갱신된 잔액을 반환합니다. 커밋은 호출한 쪽에서 합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        amount (int): 적립할 포인트
+        reason (str): 적립 사유 (예: 'mission', 'device_off')
+        ref (str | None): 관련 항목 ID
+
+    Returns:
+        dict: 갱신된 잔액 (currentPoints, weeklyIncrease, usedPoints, totalDonated)
+    """
+    if amount:
+        post_entry(user_id, EARN, amount, reason, ref)
+    return get_balance(user_id)
+
+
+def record_mission_savings(points):
+    """
+    절약 통계에 미션 참여 1회와 획득 포인트 반영
+
+    Args:
+        points (int): 미션으로 획득한 포인트
+    """
+    updated = db.session.execute(
+        update(SavingsStat)
+        .values(
+            participated_missions=SavingsStat.participated_missions + 1,
+            acquired_points=SavingsStat.acquired_points + points,
+        ),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    if not updated:
+        db.session.add(SavingsStat(participated_missions=1, acquired_points=points))
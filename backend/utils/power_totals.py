@@ -0,0 +1,201 @@
+"""
+전력 사용량 합계 관리 유틸리티
+
+디바이스 토글마다 devices 테이블 전체를 읽어 합계를 다시 계산하지 않도록,
+캠퍼스 합계(LocationStat.total_power_usage)와 강의실 합계(RoomModel.total_power_usage)를
+변화량(delta)만큼 증감하는 방식으로 유지합니다.
+합계가 어긋났는지 확인하고 처음부터 다시 계산하는 작업은
+스케줄러(cron 등)나 수동 실행으로 오프라인에서 수행합니다.
+
+사용법:
+  python -m utils.power_totals check     # 저장된 합계와 실제 합계 비교
+  python -m utils.power_totals rebuild   # 실제 합계로 다시 저장
+"""
+import sys
+
+from sqlalchemy import bindparam, func, select, update
+
+from models import db, Device, LocationStat, RoomModel
+
+# 위치 통계가 없을 때 사용하는 기본 위치 이름
+DEFAULT_LOCATION = 'pc22실'
+
+# 부동소수점 오차로 인한 차이는 무시합니다
+DRIFT_TOLERANCE = 1e-6
+
+
+def compute_total_power():
+    """
+    모든 디바이스의 전력 사용량 합계를 데이터베이스에서 집계
+
+    ORM 객체를 불러오지 않고 SUM 집계 한 번으로 계산합니다.
+    정합성 검사나 통계 행이 없을 때의 초기화에만 사용합니다.
+
+    Returns:
+        float: 전체 전력 사용량 합계
+    """
+    total = db.session.query(
+        func.coalesce(func.sum(Device.power_usage), 0.0)
+    ).scalar()
+    return float(total or 0.0)
+
+
+def apply_power_delta(delta, room_id=None, location=DEFAULT_LOCATION):
+    """
+    캠퍼스 및 강의실 전력 사용량에 변화량을 더함
+
+    UPDATE ... SET total = total + :delta 형태의 단일 쿼리로 처리하므로
+    디바이스 수와 관계없이 비용이 일정합니다. 커밋은 호출한 쪽에서 합니다.
+
+    Args:
+        delta (float): 전력 사용량 변화량 (새 값 - 이전 값)
+        room_id (int | None): 디바이스가 설치된 강의실 ID
+        location (str): 통계 행이 없을 때 사용할 위치 이름
+
+    Returns:
+        LocationStat | None: 통계 행을 새로 만든 경우 해당 행
+    """
+    return apply_power_deltas({room_id: delta}, location)
+
+
+def apply_power_deltas(deltas_by_room, location=DEFAULT_LOCATION):
+    """
+    여러 강의실의 전력 사용량 변화량을 한 번에 반영
+
+    강의실 합계는 executemany UPDATE 한 번으로, 캠퍼스 합계는 변화량의 합으로 갱신합니다.
+
+    Args:
+        deltas_by_room (dict): {강의실 ID 또는 None: 변화량}
+        location (str): 통계 행이 없을 때 사용할 위치 이름
+
+    Returns:
+        LocationStat | None: 통계 행을 새로 만든 경우 해당 행
+    """
+    room_rows = [
+        {'b_id': room_id, 'b_delta': delta}
+        for room_id, delta in deltas_by_room.items()
+        if room_id is not None and delta
+    ]
+    if room_rows:
+        rooms = RoomModel.__table__
+        db.session.execute(
+            update(rooms)
+            .where(rooms.c.id == bindparam('b_id'))
+            .values(
+                total_power_usage=func.coalesce(rooms.c.total_power_usage, 0.0)
+                + bindparam('b_delta')
+            ),
+            room_rows,
+        )
+
+    delta = sum(deltas_by_room.values())
+    if not delta:
+        return None
+
+    updated = LocationStat.query.update(
+        {LocationStat.total_power_usage: LocationStat.total_power_usage + delta},
+        synchronize_session=False,
+    )
+    if updated:
+        return None
+
+    # 통계 행이 없으면 한 번만 전체 합계로 초기화
+    # (디바이스 변경 사항이 flush된 뒤 집계되므로 delta는 이미 반영되어 있음)
+    db.session.flush()
+    stat = LocationStat(current_location=location, total_power_usage=compute_total_power())
+    db.session.add(stat)
+    return stat
+
+
+def get_or_create_location_stat(location=DEFAULT_LOCATION):
+    """
+    위치 통계 행을 조회하고, 없으면 집계 쿼리로 생성
+
+    Args:
+        location (str): 새로 생성할 때 사용할 위치 이름
+
+    Returns:
+        LocationStat: 위치 통계 행
+    """
+    stat = LocationStat.query.first()
+    if not stat:
+        stat = LocationStat(current_location=location, total_power_usage=compute_total_power())
+        db.session.add(stat)
+    return stat
+
+
+def _room_totals_subquery():
+    """강의실별 실제 디바이스 전력 합계 (상관 서브쿼리)"""
+    return (
+        select(func.coalesce(func.sum(Device.power_usage), 0.0))
+        .where(Device.room_id == RoomModel.id)
+        .scalar_subquery()
+    )
+
+
+def check_power_totals():
+    """
+    저장된 합계와 실제 합계의 차이 확인
+
+    Returns:
+        dict: 캠퍼스 합계의 저장된 값, 실제 값, 차이와 합계가 어긋난 강의실 수
+    """
+    stat = LocationStat.query.first()
+    stored = stat.total_power_usage if stat else 0.0
+    actual = compute_total_power()
+    drifted_rooms = db.session.query(func.count(RoomModel.id)).filter(
+        func.abs(func.coalesce(RoomModel.total_power_usage, 0.0) - _room_totals_subquery())
+        > DRIFT_TOLERANCE
+    ).scalar()
+    return {
+        'stored': stored,
+        'actual': actual,
+        'drift': actual - (stored or 0.0),
+        'driftedRooms': drifted_rooms,
+    }
+
+
+def rebuild_power_totals():
+    """
+    실제 합계로 저장된 합계를 다시 계산하여 저장
+
+    증분 업데이트 중 발생한 오차를 바로잡기 위해 주기적으로 실행합니다.
+
+    Returns:
+        dict: 재계산 전 검사 결과
+    """
+    result = check_power_totals()
+    if abs(result['drift']) > DRIFT_TOLERANCE:
+        stat = get_or_create_location_stat()
+        stat.total_power_usage = result['actual']
+    if result['driftedRooms']:
+        db.session.execute(
+            update(RoomModel).values(total_power_usage=_room_totals_subquery()),
+            execution_options={'synchronize_session': False},
+        )
+    db.session.commit()
+    return result
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else 'check'
+    with app.app_context():
+        if command == 'check':
+            result = check_power_totals()
+        elif command == 'rebuild':
+            result = rebuild_power_totals()
+        else:
+            print(f"❌ 알 수 없는 명령어: {command}")
+            return
+
+    print(f"저장된 합계: {result['stored']}")
+    print(f"실제 합계: {result['actual']}")
+    print(f"차이: {result['drift']}")
+    print(f"합계가 어긋난 강의실 수: {result['driftedRooms']}")
+
+
+if __name__ == '__main__':
+    main()
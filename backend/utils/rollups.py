@@ -0,0 +1,303 @@
+"""
+전력 사용량 시계열 집계(rollup) 유틸리티
+
+device_readings에 쌓인 측정값을 분/시/일 단위 구간으로 합산하여
+power_rollups 테이블에 저장하고, 기간별 사용량을 조회하는 함수를 제공합니다.
+
+수집 API는 측정값을 device_readings와 집계 대기열(device_reading_inbox)에 함께 넣고,
+집계 작업은 대기열에서 DELETE ... RETURNING으로 꺼낸 측정값만 반영합니다.
+측정 시각이 오래된 값이 늦게 도착해도 해당 시각의 구간에 그대로 더해지며,
+ID 위치를 기준으로 건너뛰지 않으므로 동시에 수집된 측정값이 ID 순서와 다르게 커밋되어도 빠지지 않습니다.
+추가 전용인 device_readings는 집계 때문에 갱신하지 않습니다. 조회 시에는 요청한 기간을 덮는
+가장 큰 단위의 구간부터 사용하여 읽는 행 수를 최소화합니다.
+
+사용법:
+  python -m utils.rollups                 # 새로 도착한 측정값을 한 번 집계
+  python -m utils.rollups --interval 60   # 60초마다 반복 집계
+"""
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, func, select
+
+from models import db, Device, DeviceReadingInbox, PowerRollup, RollupCursor
+from utils.sql import dialect_insert
+
+# 집계 작업 이름 (rollup_cursors.name)
+CURSOR_NAME = 'power_rollups'
+
+# 한 번에 대기열에서 꺼내는 측정값 수
+FOLD_BATCH_SIZE = 50000
+
+# 캠퍼스 전체 집계에 사용하는 scope_id
+CAMPUS_SCOPE_ID = 0
+
+# 큰 단위부터 나열한 집계 단위
+GRANULARITIES = ('day', 'hour', 'minute')
+
+_STEPS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+
+def truncate(moment, granularity):
+    """
+    시각을 집계 단위의 구간 시작 시각으로 내림
+
+    Args:
+        moment (datetime): 기준 시각
+        granularity (str): 'minute', 'hour', 'day'
+
+    Returns:
+        datetime: 구간 시작 시각
+    """
+    if granularity == 'minute':
+        return moment.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil(moment, granularity):
+    floored = truncate(moment, granularity)
+    return floored if floored == moment else floored + _STEPS[granularity]
+
+
+def _upsert(rows):
+    """
+    구간별 합계를 기존 값에 더하는 집합 단위 UPSERT
+
+    PostgreSQL과 SQLite 모두 INSERT ... ON CONFLICT DO UPDATE를 지원하므로
+    현재 연결된 데이터베이스 방언에 맞는 insert 구문을 사용합니다.
+    """
+    table = PowerRollup.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['scope', 'scope_id', 'granularity', 'bucket_start'],
+        set_={
+            'sample_count': table.c.sample_count + stmt.excluded.sample_count,
+            'sum_watts': table.c.sum_watts + stmt.excluded.sum_watts,
+            'energy_wh': table.c.energy_wh + stmt.excluded.energy_wh,
+        },
+    )
+    db.session.execute(stmt, rows)
+
+
+def fold_new_readings(batch_size=FOLD_BATCH_SIZE):
+    """
+    집계 대기열의 측정값을 집계 테이블에 반영
+
+    대기열 삭제와 집계 결과 갱신을 같은 트랜잭션에서 하므로
+    중간에 실패해도 같은 측정값이 두 번 더해지지 않습니다.
+    커밋된 측정값만 보이므로 늦게 커밋된 측정값은 다음 실행에서 반영됩니다.
+
+    Args:
+        batch_size (int): 한 번에 처리할 최대 측정값 수
+
+    Returns:
+        int: 이번 실행에서 반영한 측정값 수
+    """
+    interval = current_app.config.get('TELEMETRY_INTERVAL_SECONDS', 5)
+    folded = 0
+
+    while True:
+        # 진행 위치 행을 잠가 동시에 실행된 집계 작업이 같은 측정값을 처리하지 않도록 함
+        cursor = db.session.execute(
+            select(RollupCursor).where(RollupCursor.name == CURSOR_NAME).with_for_update()
+        ).scalar_one_or_none()
+        if cursor is None:
+            cursor = RollupCursor(name=CURSOR_NAME, last_reading_id=0)
+            db.session.add(cursor)
+
+        # 대기열에서 한 배치를 꺼내면서 삭제 (한 문장)
+        inbox = DeviceReadingInbox.__table__
+        readings = db.session.execute(
+            delete(inbox)
+            .where(inbox.c.id.in_(select(inbox.c.id).order_by(inbox.c.id).limit(batch_size)))
+            .returning(inbox.c.id, inbox.c.device_id, inbox.c.recorded_at, inbox.c.watts)
+        ).all()
+        if not readings:
+            db.session.commit()
+            return folded
+
+        # 강의실은 집계 시점의 디바이스 설치 위치 기준
+        rooms = dict(db.session.execute(
+            select(Device.id, Device.room_id)
+            .where(Device.id.in_({reading.device_id for reading in readings}))
+        ).all())
+
+        # 메모리에서 (scope, scope_id, 단위, 구간)별로 합산
+        buckets = {}
+        for reading in readings:
+            energy = reading.watts * interval / 3600.0
+            scopes = [
+                ('device', reading.device_id),
+                ('campus', CAMPUS_SCOPE_ID),
+            ]
+            room_id = rooms.get(reading.device_id)
+            if room_id is not None:
+                scopes.append(('room', room_id))
+            for granularity in GRANULARITIES:
+                bucket_start = truncate(reading.recorded_at, granularity)
+                for scope, scope_id in scopes:
+                    key = (scope, scope_id, granularity, bucket_start)
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        buckets[key] = [1, reading.watts, energy]
+                    else:
+                        bucket[0] += 1
+                        bucket[1] += reading.watts
+                        bucket[2] += energy
+
+        _upsert([
+            {
+                'scope': scope,
+                'scope_id': scope_id,
+                'granularity': granularity,
+                'bucket_start': bucket_start,
+                'sample_count': count,
+                'sum_watts': sum_watts,
+                'energy_wh': energy_wh,
+            }
+            for (scope, scope_id, granularity, bucket_start), (count, sum_watts, energy_wh)
+            in buckets.items()
+        ])
+        cursor.last_reading_id = max(cursor.last_reading_id or 0, max(reading.id for reading in readings))
+        db.session.commit()
+        folded += len(readings)
+
+        if len(readings) < batch_size:
+            return folded
+
+
+def plan_buckets(start, end):
+    """
+    조회 기간을 가장 큰 단위의 구간부터 나누어 조회 계획을 생성
+
+    예를 들어 3일 22:30 ~ 6일 01:10은
+    (minute 22:30~23:00), (hour 23:00~4일 00:00), (day 4일~6일),
+    (hour 6일 00:00~01:00), (minute 01:00~01:10)으로 나뉩니다.
+
+    Args:
+        start (datetime): 시작 시각 (포함)
+        end (datetime): 종료 시각 (미포함)
+
+    Returns:
+        list: (단위, 구간 시작 이상, 구간 시작 미만) 튜플 목록
+    """
+    start = truncate(start, 'minute')
+    end = _ceil(end, 'minute')
+    plan = []
+
+    def split(lo, hi, level):
+        if lo >= hi:
+            return
+        granularity = GRANULARITIES[level]
+        if granularity == 'minute':
+            plan.append((granularity, lo, hi))
+            return
+        inner_lo = _ceil(lo, granularity)
+        inner_hi = truncate(hi, granularity)
+        if inner_lo >= inner_hi:
+            split(lo, hi, level + 1)
+            return
+        split(lo, inner_lo, level + 1)
+        plan.append((granularity, inner_lo, inner_hi))
+        split(inner_hi, hi, level + 1)
+
+    split(start, end, 0)
+    return plan
+
+
+def query_usage(scope, scope_id, start, end):
+    """
+    기간 내 전력 사용량 합계를 집계 테이블에서 조회
+
+    Args:
+        scope (str): 'device', 'room', 'campus'
+        scope_id (int): 디바이스/강의실 ID (캠퍼스는 0)
+        start (datetime): 시작 시각 (포함, UTC)
+        end (datetime): 종료 시각 (미포함, UTC)
+
+    Returns:
+        dict: 측정값 수, 평균 전력(W), 전력량(Wh)
+    """
+    samples, sum_watts, energy_wh = 0, 0.0, 0.0
+    for granularity, lo, hi in plan_buckets(start, end):
+        row = db.session.execute(
+            select(
+                func.coalesce(func.sum(PowerRollup.sample_count), 0),
+                func.coalesce(func.sum(PowerRollup.sum_watts), 0.0),
+                func.coalesce(func.sum(PowerRollup.energy_wh), 0.0),
+            ).where(
+                PowerRollup.scope == scope,
+                PowerRollup.scope_id == scope_id,
+                PowerRollup.granularity == granularity,
+                PowerRollup.bucket_start >= lo,
+                PowerRollup.bucket_start < hi,
+            )
+        ).one()
+        samples += row[0]
+        sum_watts += row[1]
+        energy_wh += row[2]
+
+    return {
+        'sampleCount': samples,
+        'averageWatts': sum_watts / samples if samples else 0.0,
+        'energyWh': energy_wh,
+    }
+
+
+def query_series(scope, scope_id, start, end, granularity):
+    """
+    기간 내 구간별 사용량 목록을 조회 (차트용)
+
+    Args:
+        scope (str): 'device', 'room', 'campus'
+        scope_id (int): 디바이스/강의실 ID (캠퍼스는 0)
+        start (datetime): 시작 시각 (포함, UTC)
+        end (datetime): 종료 시각 (미포함, UTC)
+        granularity (str): 'minute', 'hour', 'day'
+
+    Returns:
+        list: 구간별 집계 딕셔너리 목록
+    """
+    rows = PowerRollup.query.filter(
+        PowerRollup.scope == scope,
+        PowerRollup.scope_id == scope_id,
+        PowerRollup.granularity == granularity,
+        PowerRollup.bucket_start >= truncate(start, granularity),
+        PowerRollup.bucket_start < end,
+    ).order_by(PowerRollup.bucket_start.asc()).all()
+    return [r.to_dict() for r in rows]
+
+
+def today_range(now=None):
+    """오늘(UTC) 0시부터 현재까지의 기간"""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    return truncate(now, 'day'), now
+
+
+def main():
+    """명령행 진입점"""
+    from app import app
+
+    interval = None
+    if len(sys.argv) > 2 and sys.argv[1] == '--interval':
+        interval = int(sys.argv[2])
+
+    with app.app_context():
+        while True:
+            folded = fold_new_readings()
+            print(f"집계한 측정값: {folded}개")
+            if interval is None:
+                return
+            time.sleep(interval)
+
+
+if __name__ == '__main__':
+    main()
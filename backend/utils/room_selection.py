@@ -0,0 +1,67 @@
+"""
+사용자별 선택 강의실 유틸리티
+
+홈 화면과 미션 상세 화면은 현재 사용자가 선택한 강의실을 기준으로 디바이스와 위치 정보를 보여줍니다.
+선택 정보는 user_room_selections 테이블에 사용자당 한 행으로 저장합니다.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from models import db, RoomModel, UserRoomSelection
+from utils.current_user import get_current_user_id
+from utils.sql import dialect_insert
+
+
+def get_default_room():
+    """
+    선택 기록이 없는 사용자의 기본 강의실 조회
+
+    Returns:
+        RoomModel | None: 기본키가 가장 작은 강의실 (강의실이 없으면 None)
+    """
+    return RoomModel.query.order_by(RoomModel.id.asc()).first()
+
+
+def get_selected_room(user_id=None):
+    """
+    사용자가 선택한 강의실 조회
+
+    user_id 기본키로 선택 행과 강의실을 한 번의 조인 쿼리로 조회합니다.
+
+    Args:
+        user_id (int | None): 사용자 ID (기본값: 현재 요청의 사용자)
+
+    Returns:
+        RoomModel | None: 선택된 강의실 (강의실이 하나도 없으면 None)
+    """
+    if user_id is None:
+        user_id = get_current_user_id()
+
+    room = db.session.execute(
+        select(RoomModel)
+        .join(UserRoomSelection, UserRoomSelection.room_id == RoomModel.id)
+        .where(UserRoomSelection.user_id == user_id)
+    ).scalar_one_or_none()
+    return room or get_default_room()
+
+
+def select_room_for_user(user_id, room_id):
+    """
+    사용자의 선택 강의실 저장
+
+    사용자당 한 행을 INSERT ... ON CONFLICT DO UPDATE로 저장합니다. 커밋은 호출한 쪽에서 합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        room_id (int): 선택한 강의실 ID
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    stmt = dialect_insert(UserRoomSelection.__table__).values(
+        user_id=user_id, room_id=room_id, selected_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id'],
+        set_={'room_id': stmt.excluded.room_id, 'selected_at': stmt.excluded.selected_at},
+    )
+    db.session.execute(stmt)
@@ -4,6 +4,8 @@
 이 모듈은 데이터베이스 초기화 시 사용할 테스트/개발용 데이터를 정의합니다.
 seed_data() 함수를 호출하면 모든 테이블에 초기 데이터가 삽입됩니다.
 """
+from datetime import datetime, timedelta, timezone
+
 from models import (
     db,
     User,
@@ -16,16 +18,18 @@ from models import (
     RankProgressModel,
     CampusStatModel,
     Mission,
-    PointSummary,
-    WeeklyActivityModel,
-    RecentActivityModel,
+    UserMissionModel,
     ExchangeItemModel,
+    ExchangeCodeModel,
     DonateCategoryModel,
     UserStatModel,
     UserActivityModel,
-    RankingEntryModel,
+    BuildingModel,
     RoomModel,
 )
+from utils.exchange_codes import generate_codes
+from utils.ledger import DONATE, EARN, SPEND, post_entry
+from utils.streaks import seed_bits
 
 # ========== Mock Data ==========
 
@@ -48,6 +52,7 @@ DEVICES = [
         'icon': 'snow',
         'temperature': 23.5,
         'type': 'cooling',
+        'room': '정보문화관 PC34실',
     },
     {
         'id': '2',
@@ -56,6 +61,7 @@ DEVICES = [
         'icon': 'bulb',
         'powerUsage': 1.2,
         'type': 'light',
+        'room': '정보문화관 PC34실',
     },
 ]
 
@@ -75,6 +81,7 @@ SAVINGS_DATA = {
 
 # 캐릭터 진행률
 CHARACTER_PROGRESS = {
+    'completedMissions': 17,  # 레벨 1(10개) + 레벨 2 진행 중 7개
     'currentLevel': 2,
     'nextLevel': 3,
     'progress': 35,
@@ -92,9 +99,7 @@ STATUS_CARDS = [
 
 # 연속 미션 일수
 STREAK_DATA = {
-    'days': 3,
-    'completedDays': [1, 2, 3],
-    'message': '3일 연속 미션 완료했어요!',
+    'days': 3,  # 오늘까지 연속으로 미션을 완료한 일 수
 }
 
 # 랭크 진행률
@@ -180,46 +185,8 @@ POINTS_DATA = {
     'totalDonated': 300,
 }
 
-# 주간 활동
-WEEKLY_ACTIVITIES = [
-    {'day': '월', 'points': 15},
-    {'day': '화', 'points': 30},
-    {'day': '수', 'points': 45},
-    {'day': '목', 'points': 60},
-    {'day': '금', 'points': 75},
-]
-
-# 최근 활동 내역
-RECENT_ACTIVITIES = [
-    {
-        'id': '1',
-        'emoji': '🍽️',
-        'title': '절전 미션 성공!',
-        'date': '2025.11.10 09:43',
-        'points': 50,
-    },
-    {
-        'id': '2',
-        'emoji': '🌍',
-        'title': '공모전 미션 성공!',
-        'date': '2025.11.09 14:22',
-        'points': 100,
-    },
-    {
-        'id': '3',
-        'emoji': '⏰',
-        'title': '콘센트 사용 미션 성공!',
-        'date': '2025.11.08 11:15',
-        'points': 20,
-    },
-    {
-        'id': '4',
-        'emoji': '♻️',
-        'title': '재활용 미션 성공!',
-        'date': '2025.11.07 16:30',
-        'points': 20,
-    },
-]
+# 교환 아이템별로 미리 만들어 둘 교환 코드 수
+EXCHANGE_CODES_PER_ITEM = 50
 
 # 교환 아이템
 EXCHANGE_ITEMS = {
@@ -348,17 +315,18 @@ USER_ACTIVITIES = [
     },
 ]
 
-RANKING_LIST = [
-    {'id': '1', 'rank': 1, 'name': '김환경', 'department': '빅데이터과', 'points': 3450},
-    {'id': '2', 'rank': 2, 'name': '이환경', 'department': '치위생과', 'points': 3333},
-    {'id': '3', 'rank': 3, 'name': '최환경', 'department': '아동보육과', 'points': 3000},
-    {'id': '4', 'rank': 4, 'name': '윤환경', 'department': '산업디자인과', 'points': 2876},
-    {'id': '5', 'rank': 5, 'name': '박환경', 'department': '항공과', 'points': 2777},
-    {'id': '6', 'rank': 6, 'name': '정환경', 'department': '시각미디어과', 'points': 2456},
-    {'id': '7', 'rank': 7, 'name': '강환경', 'department': '세무회계과', 'points': 2345},
-    {'id': '8', 'rank': 8, 'name': '조환경', 'department': '간호과', 'points': 2234},
-    {'id': '9', 'rank': 9, 'name': '신환경', 'department': '물리치료과', 'points': 2123},
-    {'id': '10', 'rank': 10, 'name': '오환경', 'department': '사무행정과', 'points': 2012},
+# 랭킹에 함께 표시될 다른 사용자
+RANKING_USERS = [
+    {'name': '김환경', 'department': '빅데이터과', 'points': 3450},
+    {'name': '이환경', 'department': '치위생과', 'points': 3333},
+    {'name': '최환경', 'department': '아동보육과', 'points': 3000},
+    {'name': '윤환경', 'department': '산업디자인과', 'points': 2876},
+    {'name': '박환경', 'department': '항공과', 'points': 2777},
+    {'name': '정환경', 'department': '시각미디어과', 'points': 2456},
+    {'name': '강환경', 'department': '세무회계과', 'points': 2345},
+    {'name': '조환경', 'department': '간호과', 'points': 2234},
+    {'name': '신환경', 'department': '물리치료과', 'points': 2123},
+    {'name': '오환경', 'department': '사무행정과', 'points': 2012},
 ]
 
 
@@ -378,7 +346,7 @@ def seed_data():
         - 미션 목록
         - 포인트 요약
         - 교환 아이템
-        - 랭킹 정보
+        - 랭킹에 표시될 다른 사용자
         - 강의실 정보
         등
     """
@@ -406,8 +374,38 @@ def seed_data():
     )
     db.session.add(location)
 
-    # 디바이스
+    # 건물 위치 (캠퍼스 지도 좌표, 가까운 빈자리 강의실 탐색에 사용)
+    db.session.add(BuildingModel(name='정보문화관', pos_x=0.0, pos_y=0.0))
+
+    # 강의실 목록
+    rooms_data = [
+        {'name': '정보문화관 PC34실', 'signal_strength': 'B', 'signal_quality': 'strong', 'people_count': 25, 'congestion': '보통', 'is_selected': True, 'capacity': 35, 'building': '정보문화관', 'floor': 3},
+        {'name': '정보문화관 PC33실', 'signal_strength': 'A', 'signal_quality': 'strong', 'people_count': 3, 'congestion': '여유', 'is_selected': False, 'capacity': 35, 'building': '정보문화관', 'floor': 3},
+        {'name': '정보문화관 PC35실', 'signal_strength': 'C', 'signal_quality': 'medium', 'people_count': 30, 'congestion': '혼잡', 'is_selected': False, 'capacity': 35, 'building': '정보문화관', 'floor': 3},
+        {'name': '정보문화관 PC32실', 'signal_strength': 'B', 'signal_quality': 'strong', 'people_count': 15, 'congestion': '여유', 'is_selected': False, 'capacity': 35, 'building': '정보문화관', 'floor': 3},
+        {'name': '정보문화관 PC36실', 'signal_strength': 'D', 'signal_quality': 'weak', 'people_count': 20, 'congestion': '보통', 'is_selected': False, 'capacity': 35, 'building': '정보문화관', 'floor': 3},
+    ]
+    rooms_by_name = {}
+    for r in rooms_data:
+        room = RoomModel(
+            name=r['name'],
+            signal_strength=r['signal_strength'],
+            signal_quality=r['signal_quality'],
+            people_count=r['people_count'],
+            congestion=r['congestion'],
+            is_selected=r['is_selected'],
+            capacity=r['capacity'],
+            building=r['building'],
+            floor=r['floor'],
+        )
+        db.session.add(room)
+        rooms_by_name[r['name']] = room
+    # flush()를 호출하여 room.id를 즉시 생성 (디바이스에서 참조하기 위해)
+    db.session.flush()
+
+    # 디바이스 (설치된 강의실과 연결하고 강의실 전력 합계에 반영)
     for d in DEVICES:
+        room = rooms_by_name[d['room']]
         device = Device(
             name=d['name'],
             status=d['status'],
@@ -415,8 +413,10 @@ def seed_data():
             power_usage=d.get('powerUsage'),
             temperature=d.get('temperature'),
             type=d['type'],
+            room_id=room.id,
         )
         db.session.add(device)
+        room.total_power_usage = (room.total_power_usage or 0) + (d.get('powerUsage') or 0)
 
     # 절약
     savings = SavingsStat(
@@ -429,6 +429,8 @@ def seed_data():
 
     # 캐릭터 진행
     cp = CharacterProgressModel(
+        user_id=user.id,
+        completed_missions=CHARACTER_PROGRESS['completedMissions'],
         current_level=CHARACTER_PROGRESS['currentLevel'],
         next_level=CHARACTER_PROGRESS['nextLevel'],
         progress=CHARACTER_PROGRESS['progress'],
@@ -445,10 +447,14 @@ def seed_data():
         )
 
     # 스트릭
+    # 오늘까지 STREAK_DATA['days']일 연속으로 미션을 완료한 상태로 생성
+    activity_bits, last_active_date = seed_bits(STREAK_DATA['days'])
     streak = StreakModel(
-        days=STREAK_DATA['days'],
-        completed_days=','.join(str(d) for d in STREAK_DATA['completedDays']),
-        message=STREAK_DATA['message'],
+        user_id=user.id,
+        activity_bits=activity_bits,
+        last_active_date=last_active_date,
+        current_streak=STREAK_DATA['days'],
+        longest_streak=STREAK_DATA['days'],
     )
     db.session.add(streak)
 
@@ -470,56 +476,67 @@ def seed_data():
     )
     db.session.add(cs)
 
-    # 미션
+    # 미션 (카탈로그)
+    missions = []
     for m in MISSIONS:
         mission = Mission(
             title=m['title'],
             emoji=m['emoji'],
             category=m['category'],
             points=m['points'],
-            progress=m['progress'],
             total_steps=m['totalSteps'],
-            current_step=m['currentStep'],
-            status=m['status'],
         )
         db.session.add(mission)
+        missions.append(mission)
+    # flush()를 호출하여 mission.id를 즉시 생성 (사용자 미션 상태에서 참조하기 위해)
+    db.session.flush()
 
-    # 포인트 요약
-    ps = PointSummary(
-        current_points=POINTS_DATA['currentPoints'],
-        weekly_increase=POINTS_DATA['weeklyIncrease'],
-        used_points=POINTS_DATA['usedPoints'],
-        total_donated=POINTS_DATA['totalDonated'],
-    )
-    db.session.add(ps)
-
-    # 주간 활동
-    for w in WEEKLY_ACTIVITIES:
-        db.session.add(WeeklyActivityModel(day=w['day'], points=w['points']))
-
-    # 최근 활동
-    for a in RECENT_ACTIVITIES:
+    # 사용자 미션 상태 (시작 전 미션은 행을 만들지 않음)
+    for m, mission in zip(MISSIONS, missions):
+        if m['status'] == 'available':
+            continue
         db.session.add(
-            RecentActivityModel(
-                emoji=a['emoji'],
-                title=a['title'],
-                date=a['date'],
-                points=a['points'],
+            UserMissionModel(
+                user_id=user.id,
+                mission_id=mission.id,
+                status=m['status'],
+                progress=m['progress'],
+                current_step=m['currentStep'],
             )
         )
 
+    # 포인트 원장: 지난주 기록과 이번 주 적립으로 POINTS_DATA와 같은 잔액이 되도록 함
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    last_week = now - timedelta(days=7)
+    earlier_earned = (
+        POINTS_DATA['currentPoints'] + POINTS_DATA['usedPoints']
+        + POINTS_DATA['totalDonated'] - POINTS_DATA['weeklyIncrease']
+    )
+    post_entry(user.id, EARN, earlier_earned, 'seed', created_at=last_week)
+    post_entry(user.id, SPEND, POINTS_DATA['usedPoints'], 'seed', created_at=last_week)
+    post_entry(user.id, DONATE, POINTS_DATA['totalDonated'], 'seed', created_at=last_week)
+    post_entry(user.id, EARN, POINTS_DATA['weeklyIncrease'], 'seed', created_at=now)
+
     # 교환 아이템
+    exchange_items = []
     for category, items in EXCHANGE_ITEMS.items():
         for e in items:
-            db.session.add(
-                ExchangeItemModel(
-                    icon=e['icon'],
-                    title=e['title'],
-                    discount=e.get('discount', ''),
-                    points=e['points'],
-                    category=category,
-                )
+            item = ExchangeItemModel(
+                icon=e['icon'],
+                title=e['title'],
+                discount=e.get('discount', ''),
+                points=e['points'],
+                category=category,
             )
+            db.session.add(item)
+            exchange_items.append(item)
+    # flush()를 호출하여 item.id를 즉시 생성 (교환 코드에서 참조하기 위해)
+    db.session.flush()
+
+    # 교환 코드 재고
+    for item in exchange_items:
+        for code in generate_codes(EXCHANGE_CODES_PER_ITEM):
+            db.session.add(ExchangeCodeModel(item_id=item.id, code=code, created_at=now))
 
     # 기부 카테고리
     for c in DONATE_CATEGORIES:
@@ -553,35 +570,12 @@ def seed_data():
             )
         )
 
-    # 강의실 목록
-    rooms_data = [
-        {'name': '정보문화관 PC34실', 'signal_strength': 'B', 'signal_quality': 'strong', 'people_count': 25, 'congestion': '보통', 'is_selected': True},
-        {'name': '정보문화관 PC33실', 'signal_strength': 'A', 'signal_quality': 'strong', 'people_count': 3, 'congestion': '여유', 'is_selected': False},
-        {'name': '정보문화관 PC35실', 'signal_strength': 'C', 'signal_quality': 'medium', 'people_count': 30, 'congestion': '혼잡', 'is_selected': False},
-        {'name': '정보문화관 PC32실', 'signal_strength': 'B', 'signal_quality': 'strong', 'people_count': 15, 'congestion': '여유', 'is_selected': False},
-        {'name': '정보문화관 PC36실', 'signal_strength': 'D', 'signal_quality': 'weak', 'people_count': 20, 'congestion': '보통', 'is_selected': False},
-    ]
-    for r in rooms_data:
-        room = RoomModel(
-            name=r['name'],
-            signal_strength=r['signal_strength'],
-            signal_quality=r['signal_quality'],
-            people_count=r['people_count'],
-            congestion=r['congestion'],
-            is_selected=r['is_selected'],
-        )
-        db.session.add(room)
-
-    # 랭킹
-    for r in RANKING_LIST:
-        db.session.add(
-            RankingEntryModel(
-                rank=r['rank'],
-                name=r['name'],
-                department=r['department'],
-                points=r['points'],
-            )
-        )
+    # 랭킹에 함께 표시될 다른 사용자와 포인트 적립 기록
+    for r in RANKING_USERS:
+        other = User(name=r['name'], department=r['department'], points=r['points'])
+        db.session.add(other)
+        db.session.flush()
+        post_entry(other.id, EARN, r['points'], 'seed', created_at=last_week)
 
     db.session.commit()
 
@@ -0,0 +1,44 @@
+"""
+데이터베이스 방언별 SQL 구문 유틸리티
+
+PostgreSQL(운영)과 SQLite(로컬 개발/테스트)에서 공통으로 쓰는
+INSERT ... ON CONFLICT 구문과 날짜 계산식을 현재 연결된 방언에 맞게 생성합니다.
+"""
+from sqlalchemy import Integer, cast, func
+
+from models import db
+
+
+def dialect_insert(table):
+    """
+    ON CONFLICT 절을 지원하는 insert 구문 생성
+
+    Args:
+        table: SQLAlchemy Table 또는 모델 클래스
+
+    Returns:
+        Insert: on_conflict_do_update / on_conflict_do_nothing을 사용할 수 있는 insert 구문
+    """
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def days_between(later, earlier):
+    """
+    두 날짜 사이의 일 수 식 (later - earlier)
+
+    PostgreSQL은 date끼리 빼면 정수 일 수가 되고, SQLite는 julianday 차이를 정수로 변환합니다.
+
+    Args:
+        later: 날짜 컬럼 또는 식
+        earlier: 날짜 컬럼 또는 식
+
+    Returns:
+        ColumnElement: 정수 일 수 식 (어느 한쪽이 NULL이면 NULL)
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return later - earlier
+    return cast(func.julianday(later) - func.julianday(earlier), Integer)
@@ -0,0 +1,243 @@
+"""
+연속 미션(스트릭) 비트맵 유틸리티
+
+사용자별 일일 미션 완료 기록을 BIGINT 비트맵 하나로 보관합니다.
+비트 i는 마지막 활동일(last_active_date)로부터 i일 전에 미션을 완료했는지를 나타내며,
+부호 비트를 쓰지 않도록 최근 HISTORY_DAYS일만 보관합니다.
+
+현재 연속 일수와 최장 연속 일수는 기록할 때 함께 갱신해 두므로 보관 기간보다 긴 연속 기록도 정확하게 세고,
+이번 주 완료 요일은 비트 연산으로 계산합니다.
+
+마지막 활동일 이후의 날짜(보통 오늘)를 기록할 때는 비트맵을 날짜 차이만큼 밀고 비트 0을 켜는 계산을
+데이터베이스에서 (activity_bits << gap) | 1로 하는 UPSERT 한 문장으로 처리하므로 행을 읽거나 잠그지 않으며,
+같은 날 두 번째 기록은 갱신 조건에 맞지 않아 쓰기가 없습니다.
+마지막 활동일보다 이전 날짜를 기록(일괄 보정)할 때만 해당 행을 잠가 읽은 뒤 파이썬에서 다시 계산합니다.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import Date, bindparam, case, func, literal, or_, select, update
+
+from models import db, StreakModel, User
+from utils.sql import dialect_insert, days_between
+
+# 보관하는 일 수 (비트 수, BIGINT의 부호 비트 제외)
+HISTORY_DAYS = 62
+_HISTORY_MASK = (1 << HISTORY_DAYS) - 1
+
+# 한 번에 갱신할 수 있는 최대 사용자 수
+MAX_BULK_USERS = 10000
+
+
+def today():
+    """오늘 날짜 (UTC)"""
+    return datetime.now(timezone.utc).date()
+
+
+def trailing_ones(bits):
+    """비트 0부터 연속으로 1인 비트 수"""
+    return (~bits & (bits + 1)).bit_length() - 1
+
+
+def longest_run(bits):
+    """가장 길게 연속된 1 비트 수 (runs & (runs << 1)를 반복할 때마다 모든 구간이 1씩 줄어듦)"""
+    count = 0
+    while bits:
+        bits &= bits << 1
+        count += 1
+    return count
+
+
+def mark_past_day(bits, last_active, current, longest, day):
+    """
+    마지막 활동일보다 이전 날짜를 비트맵에 표시 (일괄 보정용)
+
+    해당 위치의 비트만 켜고, 끊겨 있던 구간이 이어질 수 있으므로 현재 / 최장 연속 일수를 다시 계산합니다.
+    보관 기간보다 이전 날짜는 비트맵에 남지 않으므로 연속 일수에도 반영되지 않습니다.
+
+    Args:
+        bits (int): 현재 비트맵
+        last_active (date): 마지막 활동일 (day보다 나중)
+        current (int): 마지막 활동일까지의 연속 일수
+        longest (int): 저장된 최장 연속 일수
+        day (date): 활동일
+
+    Returns:
+        tuple: (비트맵, 연속 일수, 최장 연속 일수)
+    """
+    offset = (last_active - day).days
+    if offset < HISTORY_DAYS:
+        bits |= 1 << offset
+    current = max(current, trailing_ones(bits))
+    return bits, current, max(longest, current, longest_run(bits))
+
+
+def current_streak(current, last_active, day):
+    """
+    현재 연속 일수
+
+    마지막 활동일이 오늘이나 어제면 저장된 연속 일수, 그보다 오래됐으면 0입니다.
+    """
+    if last_active is None or (day - last_active).days > 1:
+        return 0
+    return current
+
+
+def week_days(bits, last_active, day):
+    """
+    이번 주(월요일 시작)에 미션을 완료한 요일 목록
+
+    Returns:
+        list: ISO 요일 번호 (1=월요일 ~ 7=일요일)
+    """
+    if last_active is None:
+        return []
+    gap = (day - last_active).days
+    weekday = day.weekday()
+    if gap > weekday:
+        return []
+    # 오늘 기준 비트맵에서 월요일~오늘에 해당하는 비트만 남김
+    week = (bits << gap) & ((1 << (weekday + 1)) - 1)
+    return [weekday - i + 1 for i in range(weekday, -1, -1) if week >> i & 1]
+
+
+def streak_summary(streak, day=None):
+    """
+    스트릭 행을 API 응답 형식으로 변환
+
+    Args:
+        streak (StreakModel | None): 스트릭 행
+        day (date | None): 기준 날짜 (기본값: 오늘)
+
+    Returns:
+        dict: days, longestStreak, completedDays, message
+    """
+    day = day or today()
+    if streak is None:
+        bits, last_active, current, longest = 0, None, 0, 0
+    else:
+        bits, last_active = streak.activity_bits or 0, streak.last_active_date
+        current, longest = streak.current_streak or 0, streak.longest_streak or 0
+
+    days = current_streak(current, last_active, day)
+    return {
+        'days': days,
+        'longestStreak': longest,
+        'completedDays': week_days(bits, last_active, day),
+        'message': f'{days}일 연속 미션 완료했어요!' if days else '오늘 미션을 완료하고 연속 기록을 시작해 보세요!',
+    }
+
+
+def get_streak(user_id):
+    """사용자의 스트릭 행 조회 (없으면 None)"""
+    return StreakModel.query.filter_by(user_id=user_id).first()
+
+
+def record_activities(user_ids, day=None):
+    """
+    여러 사용자의 활동일을 한 번에 기록
+
+    1. INSERT ... SELECT ... ON CONFLICT DO UPDATE 한 문장으로 스트릭 행이 없는 사용자는 만들고,
+       마지막 활동일이 day보다 이전인 행은 데이터베이스에서 비트맵을 밀고 연속 일수를 갱신
+    2. day가 오늘보다 이전이면, 마지막 활동일이 day보다 나중인 행만 SELECT ... FOR UPDATE로 읽어
+       다시 계산한 뒤 executemany UPDATE 한 번으로 기록
+
+    존재하지 않는 사용자 ID는 무시합니다. 커밋은 호출한 쪽에서 합니다.
+
+    Args:
+        user_ids (iterable): 사용자 ID 목록
+        day (date | None): 활동일 (기본값: 오늘, 오늘보다 나중이면 안 됨)
+
+    Returns:
+        int: 갱신한 사용자 수
+    """
+    day = day or today()
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+
+    table = StreakModel.__table__
+    gap = days_between(literal(day, Date), table.c.last_active_date)
+    run = case((gap == 1, func.coalesce(table.c.current_streak, 0) + 1), else_=1)
+    longest = func.coalesce(table.c.longest_streak, 0)
+    shifted = (
+        func.coalesce(table.c.activity_bits, 0)
+        .bitwise_lshift(gap)
+        .bitwise_or(1)
+        .bitwise_and(_HISTORY_MASK)
+    )
+    stmt = dialect_insert(table).from_select(
+        ['user_id', 'activity_bits', 'last_active_date', 'current_streak', 'longest_streak'],
+        select(User.id, literal(1), literal(day, Date), literal(1), literal(1))
+        .where(User.id.in_(user_ids)),
+    )
+    updated = db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={
+                # 보관 기간 이상 쉬었으면 (또는 첫 기록이면) 오늘 비트만 남음
+                'activity_bits': case((gap < HISTORY_DAYS, shifted), else_=1),
+                'last_active_date': day,
+                'current_streak': run,
+                'longest_streak': case((run > longest, run), else_=longest),
+            },
+            where=or_(table.c.last_active_date.is_(None), table.c.last_active_date < day),
+        )
+    ).rowcount
+
+    if day >= today():
+        return updated
+
+    # 지난 날짜 보정: 마지막 활동일이 day보다 나중인 행만 잠가서 다시 계산
+    rows = db.session.execute(
+        select(
+            table.c.user_id,
+            table.c.activity_bits,
+            table.c.last_active_date,
+            table.c.current_streak,
+            table.c.longest_streak,
+        )
+        .where(table.c.user_id.in_(user_ids), table.c.last_active_date > day)
+        .order_by(table.c.user_id)
+        .with_for_update()
+    ).all()
+
+    params = []
+    for row in rows:
+        old_bits, old_current, old_longest = row.activity_bits or 0, row.current_streak or 0, row.longest_streak or 0
+        bits, current, longest = mark_past_day(old_bits, row.last_active_date, old_current, old_longest, day)
+        if (bits, current, longest) == (old_bits, old_current, old_longest):
+            continue
+        params.append({
+            'b_user_id': row.user_id,
+            'b_bits': bits,
+            'b_current': current,
+            'b_longest': longest,
+        })
+
+    if params:
+        db.session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam('b_user_id'))
+            .values(
+                activity_bits=bindparam('b_bits'),
+                current_streak=bindparam('b_current'),
+                longest_streak=bindparam('b_longest'),
+            ),
+            params,
+        )
+    return updated + len(params)
+
+
+def record_activity(user_id, day=None):
+    """한 사용자의 활동일 기록 (커밋은 호출한 쪽에서 함)"""
+    return record_activities([user_id], day)
+
+
+def seed_bits(days, day=None):
+    """
+    오늘까지 days일 연속 활동한 비트맵 생성 (시드 데이터용)
+
+    Returns:
+        tuple: (비트맵, 마지막 활동일)
+    """
+    return (1 << min(days, HISTORY_DAYS)) - 1, day or today()
@@ -0,0 +1,195 @@
+"""
+사용자별 미션 진행 상태 유틸리티
+
+미션 카탈로그(missions)는 모든 사용자에게 같고, 진행 상태는 user_missions에 사용자별로 저장합니다.
+미션 목록은 메모리 카탈로그 스냅샷에서 한 페이지를 고른 뒤,
+그 페이지의 미션 ID에 대한 사용자 상태만 한 번의 쿼리로 읽어 합칩니다.
+상태가 없는 미션은 미리 인코딩해 둔 카탈로그 바이트를 그대로 사용합니다.
+"""
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, select, text, update
+
+from models import db, Mission, UserMissionModel, USER_MISSION_STATUS_WHERE
+from utils.catalog_cache import encode_json
+from utils.fields import project
+from utils.sql import dialect_insert
+
+# status= 파라미터로 조회할 수 있는 상태 (상태별 부분 인덱스가 있는 상태)
+USER_MISSION_STATUSES = tuple(USER_MISSION_STATUS_WHERE)
+
+_STATE_COLUMNS = (
+    UserMissionModel.mission_id,
+    UserMissionModel.progress,
+    UserMissionModel.current_step,
+    UserMissionModel.status,
+)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _state(row):
+    return {'progress': row.progress, 'currentStep': row.current_step, 'status': row.status}
+
+
+def get_states(user_id, mission_ids):
+    """
+    여러 미션에 대한 사용자 상태를 한 번의 쿼리로 조회
+
+    Args:
+        user_id (int | None): 사용자 ID
+        mission_ids (iterable): 미션 ID 목록
+
+    Returns:
+        dict: {미션 ID: {'progress', 'currentStep', 'status'}} (상태가 있는 미션만)
+    """
+    mission_ids = list(mission_ids)
+    if user_id is None or not mission_ids:
+        return {}
+    rows = db.session.execute(
+        select(*_STATE_COLUMNS).where(
+            UserMissionModel.user_id == user_id,
+            UserMissionModel.mission_id.in_(mission_ids),
+        )
+    ).all()
+    return {row.mission_id: _state(row) for row in rows}
+
+
+def list_by_status(user_id, status, after_id, limit, category='all'):
+    """
+    상태별 사용자 미션을 미션 ID 순으로 한 페이지 조회
+
+    상태 조건은 부분 인덱스 정의와 같은 조건문을 사용하므로 (user_id, mission_id) 부분 인덱스로 처리됩니다.
+
+    Args:
+        user_id (int | None): 사용자 ID
+        status (str): USER_MISSION_STATUSES 중 하나
+        after_id (int | None): 이전 페이지의 마지막 미션 ID
+        limit (int): 페이지 크기
+        category (str): 미션 카테고리 ('all'이면 전체)
+
+    Returns:
+        tuple: ({미션 ID: 상태} (ID 순), 다음 페이지가 있으면 마지막 미션 ID 아니면 None)
+    """
+    if user_id is None:
+        return {}, None
+    stmt = select(*_STATE_COLUMNS).where(
+        UserMissionModel.user_id == user_id,
+        text(USER_MISSION_STATUS_WHERE[status]),
+    )
+    if after_id is not None:
+        stmt = stmt.where(UserMissionModel.mission_id > after_id)
+    if category != 'all':
+        stmt = stmt.where(
+            UserMissionModel.mission_id.in_(select(Mission.id).where(Mission.category == category))
+        )
+    rows = db.session.execute(
+        stmt.order_by(UserMissionModel.mission_id.asc()).limit(limit + 1)
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    states = {row.mission_id: _state(row) for row in rows}
+    return states, (rows[-1].mission_id if has_more else None)
+
+
+def merge_items(group, mission_ids, states, fields):
+    """
+    카탈로그 항목에 사용자 상태를 합쳐 인코딩된 항목 목록 생성
+
+    Args:
+        group (CatalogGroup): 카탈로그 항목 (fields로 선택된 항목)
+        mission_ids (iterable): 응답할 미션 ID (ID 순)
+        states (dict): {미션 ID: 상태}
+        fields (list): 선택한 필드
+
+    Returns:
+        list: 인코딩된 JSON 항목 목록 (카탈로그에 없는 미션은 제외)
+    """
+    items = []
+    for mission_id in mission_ids:
+        i = bisect_left(group.ids, mission_id)
+        if i == len(group.ids) or group.ids[i] != mission_id:
+            continue
+        state = states.get(mission_id)
+        if state is None:
+            items.append(group.items[i])
+        else:
+            items.append(encode_json(project({**group.dicts[i], **state}, fields)))
+    return items
+
+
+def states_etag_key(user_id, states):
+    """사용자 상태가 반영된 응답의 ETag 구분 값"""
+    return f"{user_id}:{sorted((k, tuple(v.values())) for k, v in states.items())}"
+
+
+def _upsert(user_id, mission_id, values, update_columns):
+    """사용자 미션 행을 INSERT ... ON CONFLICT DO UPDATE로 저장하고 저장된 행 반환"""
+    stmt = dialect_insert(UserMissionModel.__table__).values(
+        user_id=user_id, mission_id=mission_id, **values
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'mission_id'],
+        set_={column: stmt.excluded[column] for column in update_columns},
+    ).returning(*_STATE_COLUMNS)
+    return _state(db.session.execute(stmt).one())
+
+
+def start_mission(user_id, mission_id, deadline=None):
+    """
+    사용자의 미션 시작 (진행률은 유지)
+
+    커밋은 호출한 쪽에서 합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        mission_id (int): 미션 ID
+        deadline (datetime | None): 마감 시각 (UTC)
+
+    Returns:
+        dict: 저장된 상태
+    """
+    return _upsert(
+        user_id,
+        mission_id,
+        {
+            'status': 'in-progress',
+            'progress': 0.0,
+            'current_step': 0,
+            'started_at': _utcnow(),
+            'deadline_at': deadline,
+        },
+        ['status', 'started_at', 'deadline_at'],
+    )
+
+
+def complete_mission(user_id, mission_id):
+    """
+    사용자의 진행 중인 미션 완료 (진행률 100%)
+
+    진행 중이고 마감 시각이 지나지 않은 행만 한 번의 조건부 UPDATE로 완료 상태로 바꾸므로,
+    시작하지 않았거나 이미 완료 / 만료된 미션, 만료 처리 전이라도 마감 시각이 지난 미션은 완료되지 않고
+    같은 미션에 대한 동시 완료 요청도 하나만 성공합니다.
+    커밋은 호출한 쪽에서 합니다.
+
+    Returns:
+        dict | None: 저장된 상태, 완료할 수 없으면 None
+    """
+    now = _utcnow()
+    table = UserMissionModel.__table__
+    row = db.session.execute(
+        update(table)
+        .where(
+            table.c.user_id == user_id,
+            table.c.mission_id == mission_id,
+            text(USER_MISSION_STATUS_WHERE['in-progress']),
+            or_(table.c.deadline_at.is_(None), table.c.deadline_at > now),
+        )
+        .values(status='completed', progress=100, completed_at=now, deadline_at=None)
+        .returning(*_STATE_COLUMNS)
+    ).one_or_none()
+    return _state(row) if row is not None else None
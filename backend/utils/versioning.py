@@ -0,0 +1,140 @@
+"""
+테이블 버전 카운터와 조건부 GET(ETag / Last-Modified) 유틸리티
+
+쓰기 API가 데이터를 바꿀 때마다 해당 테이블의 버전을 1 증가시키고,
+조회 API는 버전만 읽어 ETag를 만듭니다. 클라이언트가 보낸 If-None-Match /
+If-Modified-Since가 현재 버전과 같으면 ORM 객체를 불러오거나 직렬화하지 않고
+바로 304 Not Modified를 반환합니다.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, request
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, TableVersion
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def bump(*names):
+    """
+    테이블 버전 증가
+
+    쓰기 API에서 데이터를 변경한 뒤, 같은 트랜잭션 안에서 호출합니다.
+    커밋은 호출한 쪽에서 합니다.
+
+    Args:
+        *names (str): 버전을 증가시킬 테이블 이름
+    """
+    now = _utcnow()
+    for name in names:
+        updated = db.session.execute(
+            update(TableVersion)
+            .where(TableVersion.name == name)
+            .values(version=TableVersion.version + 1, updated_at=now),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        if updated:
+            continue
+        # 버전 행이 없으면 처음 한 번만 생성 (동시에 생성된 경우 증가로 재시도)
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    insert(TableVersion).values(name=name, version=1, updated_at=now)
+                )
+        except IntegrityError:
+            db.session.execute(
+                update(TableVersion)
+                .where(TableVersion.name == name)
+                .values(version=TableVersion.version + 1, updated_at=now),
+                execution_options={'synchronize_session': False},
+            )
+
+
+def get_versions(names):
+    """
+    테이블 버전 조회
+
+    Args:
+        names (iterable): 테이블 이름 목록
+
+    Returns:
+        dict: {테이블 이름: (버전, 마지막 변경 시각)}, 버전 행이 없으면 (0, None)
+    """
+    rows = db.session.execute(
+        select(TableVersion.name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.name.in_(names))
+    ).all()
+    versions = {name: (0, None) for name in names}
+    for name, version, updated_at in rows:
+        versions[name] = (version, updated_at)
+    return versions
+
+
+def _make_etag(versions):
+    """버전과 쿼리 문자열로 ETag 값 생성 (따옴표 제외)"""
+    parts = [f'{name}:{versions[name][0]}' for name in sorted(versions)]
+    parts.append(request.query_string.decode('utf-8', 'replace'))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def _last_modified(versions):
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    if not stamps:
+        return None
+    return max(stamps).replace(tzinfo=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    """요청의 조건부 헤더가 현재 버전과 일치하는지 확인"""
+    if request.if_none_match:
+        # If-None-Match가 있으면 If-Modified-Since는 무시 (RFC 9110)
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(*names, cache_control='no-cache'):
+    """
+    조건부 GET 데코레이터
+
+    응답 데이터가 의존하는 테이블 이름을 지정하면, 해당 테이블들의 버전으로
+    ETag / Last-Modified 헤더를 붙이고 변경이 없을 때 304를 반환합니다.
+
+    Args:
+        *names (str): 응답이 의존하는 테이블 이름
+        cache_control (str): Cache-Control 헤더 값
+
+    Example:
+        @points_bp.route('/api/points/exchange', methods=['GET'])
+        @conditional('exchange_items', cache_control='public, max-age=60')
+        def get_exchange_items():
+            ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_versions(names)
+            etag = _make_etag(versions)
+            last_modified = _last_modified(versions)
+
+            if _not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator